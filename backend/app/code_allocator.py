@@ -0,0 +1,175 @@
+"""
+세션 코드 할당기 (DB 조회 없는 O(1) 할당)
+
+세션 코드 공간(알파벳 24자 × 숫자 8⁵ = 786,432개)을 지연 셔플된 여유 목록으로
+관리합니다. 위치 [0, used)는 사용 중, [used, size)는 여유 코드이며, 할당은
+여유 구간에서 무작위 위치 하나를 앞으로 바꿔 넣는 Fisher-Yates 한 단계입니다.
+
+- 배열 전체를 만들지 않고, 항등 위치에서 벗어난 항목만 dict에 보관 (메모리는 사용 중 코드 수에 비례)
+- 할당/예약/반환 모두 O(1), 코드 공간이 거의 차도 재시도 없음
+- 앱 시작 시 활성 세션 코드로 초기화하고, sessionEnded 이벤트로 코드 반환
+- 다른 워커가 할당한 코드와 겹칠 수 있으므로 DB 고유 인덱스(idx_session_code_active)가
+  최종 확인을 담당 (충돌 시 해당 코드를 예약 처리하고 다시 할당)
+- 종료된 세션 코드를 다시 쓸 수 없는 DB(migrations.CODE_REUSE_DIALECTS 밖)에서는 코드를 반환하지 않음
+  (반환해도 INSERT가 항상 실패해 할당 재시도만 낭비)
+"""
+
+import random
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import engine
+from .migrations import CODE_REUSE_DIALECTS
+from .models import Session as SessionModel
+from .websocket_manager import SESSION_ENDED, manager
+from .log import get_logger
+
+logger = get_logger("code_allocator")
+
+# 혼동 방지를 위해 0, O, I, 1 제외
+LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+DIGITS = "23456789"
+DIGIT_COUNT = 5
+DIGIT_SPACE = len(DIGITS) ** DIGIT_COUNT
+CODE_SPACE = len(LETTERS) * DIGIT_SPACE
+
+_DIGIT_INDEX = {d: i for i, d in enumerate(DIGITS)}
+_LETTER_INDEX = {c: i for i, c in enumerate(LETTERS)}
+
+
+def encode_code(value: int) -> str:
+    """0 ~ CODE_SPACE-1 정수를 세션 코드로 변환"""
+    letter, rest = divmod(value, DIGIT_SPACE)
+    digits = []
+    for _ in range(DIGIT_COUNT):
+        rest, d = divmod(rest, len(DIGITS))
+        digits.append(DIGITS[d])
+    return LETTERS[letter] + "".join(reversed(digits))
+
+
+def decode_code(code: str) -> Optional[int]:
+    """세션 코드를 정수로 변환 (코드 공간 밖의 커스텀 코드면 None)"""
+    if len(code) != DIGIT_COUNT + 1 or code[0] not in _LETTER_INDEX:
+        return None
+    value = _LETTER_INDEX[code[0]]
+    for ch in code[1:]:
+        d = _DIGIT_INDEX.get(ch)
+        if d is None:
+            return None
+        value = value * len(DIGITS) + d
+    return value
+
+
+class CodeSpaceExhausted(Exception):
+    pass
+
+
+class CodeAllocator:
+    """지연 셔플 여유 목록 기반 코드 할당기"""
+
+    def __init__(self, size: int = CODE_SPACE, rng: Optional[random.Random] = None, reuse_codes: bool = True):
+        self.size = size
+        # False면 sessionEnded에도 코드를 반환하지 않음 (종료된 세션 코드를 DB가 다시 받지 않는 경우)
+        self.reuse_codes = reuse_codes
+        self.used = 0
+        # 위치 -> 값, 값 -> 위치 (항등이면 항목 없음)
+        self._value_at: Dict[int, int] = {}
+        self._position_of: Dict[int, int] = {}
+        self._random = rng or random.SystemRandom()
+        self.loaded = False
+
+    def _get(self, position: int) -> int:
+        return self._value_at.get(position, position)
+
+    def _set(self, position: int, value: int):
+        if position == value:
+            self._value_at.pop(position, None)
+            self._position_of.pop(value, None)
+        else:
+            self._value_at[position] = value
+            self._position_of[value] = position
+
+    def _swap(self, a: int, b: int):
+        if a == b:
+            return
+        va, vb = self._get(a), self._get(b)
+        self._set(a, vb)
+        self._set(b, va)
+
+    def allocate(self) -> str:
+        """사용 중이 아닌 코드 하나를 무작위로 할당"""
+        if self.used >= self.size:
+            raise CodeSpaceExhausted("사용 가능한 세션 코드가 없습니다")
+        position = self._random.randrange(self.used, self.size)
+        self._swap(self.used, position)
+        value = self._get(self.used)
+        self.used += 1
+        return encode_code(value)
+
+    def reserve(self, code: str) -> bool:
+        """특정 코드를 사용 중으로 표시 (이미 사용 중이면 False, 코드 공간 밖이면 True)"""
+        value = decode_code(code)
+        if value is None or value >= self.size:
+            return True
+        position = self._position_of.get(value, value)
+        if position < self.used:
+            return False
+        self._swap(position, self.used)
+        self.used += 1
+        return True
+
+    def release(self, code: str):
+        """코드를 여유 목록으로 반환"""
+        value = decode_code(code)
+        if value is None or value >= self.size:
+            return
+        position = self._position_of.get(value, value)
+        if position >= self.used:
+            return
+        self.used -= 1
+        self._swap(position, self.used)
+        if self.used == 0:
+            # 모두 반환되면 순서 정보는 의미가 없으므로 비움
+            self._value_at.clear()
+            self._position_of.clear()
+
+    def is_used(self, code: str) -> bool:
+        value = decode_code(code)
+        if value is None or value >= self.size:
+            return False
+        return self._position_of.get(value, value) < self.used
+
+    def reset(self, codes: Iterable[str] = ()):
+        self.used = 0
+        self._value_at.clear()
+        self._position_of.clear()
+        for code in codes:
+            self.reserve(code)
+
+    async def load(self, db: AsyncSession):
+        """활성 세션 코드로 초기화 (앱 시작 시 한 번, 코드를 다시 쓸 수 없는 DB면 종료된 세션 코드도 사용 중)"""
+        query = select(SessionModel.code)
+        if self.reuse_codes:
+            query = query.where(SessionModel.ended_at.is_(None))
+        result = await db.execute(query)
+        self.reset(row[0] for row in result.all())
+        self.loaded = True
+        logger.info("🔢 세션 코드 할당기 준비: 사용 중 %d / %d", self.used, self.size)
+
+    def on_event(self, session_code: str, message: dict):
+        """ConnectionManager 리스너: 종료된 세션의 코드 반환"""
+        if message.get("event") == SESSION_ENDED and self.reuse_codes:
+            self.release(session_code)
+
+    def stats(self) -> dict:
+        return {
+            "used": self.used,
+            "free": self.size - self.used,
+            "tracked_swaps": len(self._value_at),
+            "reuse_codes": self.reuse_codes,
+        }
+
+
+# 전역 인스턴스
+code_allocator = CodeAllocator(reuse_codes=engine.dialect.name in CODE_REUSE_DIALECTS)
+manager.add_listener(code_allocator.on_event)
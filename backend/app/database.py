@@ -1,11 +1,18 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from .log import get_logger
+from .metrics import timed_pool_class
 
 load_dotenv()
 
+logger = get_logger("db")
+
 # SQL 로그 출력 제어
 SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
 
@@ -17,7 +24,7 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL and (DATABASE_URL.startswith('postgresql://') or DATABASE_URL.startswith('postgres://')):
     DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
     DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql+asyncpg://', 1)
-    print(f"✅ PostgreSQL 사용 (Render.com)")
+    logger.info("✅ PostgreSQL 사용 (Render.com)")
 
 if not DATABASE_URL:
     # Cloudways MySQL 자동 감지
@@ -29,7 +36,7 @@ if not DATABASE_URL:
     # MySQL 연결 시도 (Cloudways 기본)
     if mysql_password:
         DATABASE_URL = f"mysql+aiomysql://{mysql_user}:{mysql_password}@{mysql_host}/{mysql_database}"
-        print(f"✅ MySQL 사용: {mysql_user}@{mysql_host}/{mysql_database}")
+        logger.info("✅ MySQL 사용: %s@%s/%s", mysql_user, mysql_host, mysql_database)
     else:
         # 로컬 개발 환경: SQLite 폴백
         BASE_DIR = Path(__file__).parent.parent
@@ -37,32 +44,126 @@ if not DATABASE_URL:
         DATA_DIR.mkdir(exist_ok=True)
         DB_PATH = DATA_DIR / "classkit.db"
         DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
-        print(f"⚠️ 로컬 개발 모드: SQLite 사용 ({DB_PATH})")
+        logger.warning("⚠️ 로컬 개발 모드: SQLite 사용 (%s)", DB_PATH)
+
+# SQLite 프로필
+# - production (기본값): 연결마다 WAL / synchronous=NORMAL / mmap / cache / busy_timeout 적용,
+#   쓰기는 전용 연결 1개(write_engine)로 직렬화하고 읽기는 연결 풀(engine)에서 처리
+# - legacy: 예전 기본 설정 (롤백 저널, synchronous=FULL, 연결 풀 없음)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # 음수는 KiB 단위 (64MB)
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "5"))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# 메모리 DB는 연결마다 별도 DB가 되므로 튜닝 대상에서 제외
+SQLITE_TUNED = (
+    IS_SQLITE
+    and SQLITE_PROFILE == "production"
+    and ":memory:" not in DATABASE_URL
+    and "mode=memory" not in DATABASE_URL
+    and not DATABASE_URL.endswith("://")
+    and not DATABASE_URL.endswith(":///")
+)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+# 연결 풀 (checkout 대기 시간을 /metrics에 기록)
+_QueuePool = timed_pool_class(AsyncAdaptedQueuePool)
 
 # Async engine 생성
-if "sqlite" in DATABASE_URL:
-    # SQLite (로컬 개발)
+if SQLITE_TUNED:
+    # 읽기 풀 (여러 연결이 WAL 스냅샷으로 동시에 읽음)
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=SQL_ECHO,
+        poolclass=_QueuePool,
+        pool_size=SQLITE_READ_POOL_SIZE,
+        max_overflow=SQLITE_READ_POOL_SIZE,
+    )
+    # 전용 쓰기 연결 (쓰기 잠금 경합 대신 풀 대기열에서 순서대로 처리)
+    write_engine = create_async_engine(
+        DATABASE_URL,
+        echo=SQL_ECHO,
+        poolclass=_QueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    for _engine in (engine, write_engine):
+        event.listen(_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    logger.info(
+        "✅ SQLite production 프로필: WAL, synchronous=%s, 읽기 풀 %d + 쓰기 연결 1",
+        SQLITE_PRAGMAS["synchronous"], SQLITE_READ_POOL_SIZE
+    )
+elif IS_SQLITE:
+    # SQLite (legacy 프로필 / 메모리 DB)
     engine = create_async_engine(
         DATABASE_URL,
         echo=SQL_ECHO
     )
+    write_engine = engine
 else:
     # MySQL/PostgreSQL (프로덕션)
     engine = create_async_engine(
         DATABASE_URL,
         echo=SQL_ECHO,
+        poolclass=_QueuePool,
         pool_size=20,
         max_overflow=10,
         pool_pre_ping=True,
         pool_recycle=3600
     )
+    write_engine = engine
+
+_WRITING = "classkit_writing"
+
+class RoutingSession(Session):
+    """
+    읽기/쓰기 연결 분리 세션 (SQLite production 프로필)
+    
+    flush와 INSERT/UPDATE/DELETE는 쓰기 연결로 보내고, 한 번 쓰기 연결을 쓴
+    트랜잭션은 끝날 때까지 쓰기 연결에서 읽음 (커밋 전 변경 내용이 보이도록).
+    """
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get(_WRITING) or self._flushing or isinstance(clause, UpdateBase):
+            self.info[_WRITING] = True
+            return write_engine.sync_engine
+        return engine.sync_engine
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITING, None)
 
 # Async session
-async_session = sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+if write_engine is engine:
+    async_session = sessionmaker(
+        engine, 
+        class_=AsyncSession, 
+        expire_on_commit=False
+    )
+else:
+    async_session = sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False
+    )
+
+async def dispose_engines():
+    """모든 엔진의 연결 정리 (CLI 종료 시)"""
+    await engine.dispose()
+    if write_engine is not engine:
+        await write_engine.dispose()
 
 Base = declarative_base()
 
@@ -0,0 +1,98 @@
+"""
+세션별 이벤트 로그 (재연결 시 놓친 이벤트 다시 보내기)
+
+와이파이가 잠깐 끊겼다 붙으면 반 전체 위젯/소켓이 한꺼번에 재연결합니다. 세션 브로드캐스트마다
+세션 안에서 1씩 커지는 seq를 붙여 고정 크기 로그에 보관하고, 클라이언트가 마지막으로 받은 seq를
+?since=로 알려 주면 그 뒤의 이벤트만 batch 프레임 하나로 다시 보냅니다.
+
+- 로그는 세션별로 만들 때마다 새 log_id를 받음. 클라이언트는 connected 이벤트의 log를 ?log=로 함께 보냄
+- log_id가 다르면(서버 재시작, 다른 워커로 연결, LRU로 밀려난 로그) 또는 놓친 구간이 로그보다 오래되면 resync
+- seq는 워커마다 따로 매김 (pub/sub으로 받은 다른 워커의 이벤트도 이 워커의 순서대로 기록)
+- 하트비트 ping, 요청 응답(reply)처럼 소켓 하나에만 가는 프레임은 기록하지 않음
+- 세션이 종료되면 로그 해제
+
+환경변수:
+    WS_EVENT_LOG_SIZE: 세션별 보관 이벤트 수 (기본값 200, 0이면 비활성화)
+    WS_EVENT_LOG_MAX_SESSIONS: 로그를 유지할 최대 세션 수 (기본값 1000)
+"""
+
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional
+
+
+class SessionEventLog:
+    """한 세션의 최근 이벤트 (seq 오름차순)"""
+
+    def __init__(self, capacity: int):
+        self.log_id = uuid.uuid4().hex[:12]
+        self.events: Deque[dict] = deque(maxlen=capacity)
+        self.seq = 0
+
+    def append(self, message: dict) -> dict:
+        self.seq += 1
+        stamped = {**message, "seq": self.seq}
+        self.events.append(stamped)
+        return stamped
+
+    def since(self, seq: int) -> Optional[List[dict]]:
+        """seq 이후 이벤트 (로그에서 이미 밀려난 이벤트가 있으면 None)"""
+        if seq > self.seq:
+            return None
+        first = self.events[0]["seq"] if self.events else self.seq + 1
+        if seq < first - 1:
+            return None
+        # 로그 크기가 작으므로 뒤에서부터 세어 잘라냄
+        return list(self.events)[len(self.events) - (self.seq - seq):]
+
+
+class EventLog:
+    """세션 코드 → SessionEventLog"""
+
+    def __init__(self, capacity: int = 200, max_sessions: int = 1000):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self._logs: "OrderedDict[str, SessionEventLog]" = OrderedDict()
+        self.replayed = 0
+        self.resyncs = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def get(self, session_code: str) -> SessionEventLog:
+        """세션 로그 조회 (없으면 새 log_id로 생성)"""
+        log = self._logs.get(session_code)
+        if log is None:
+            log = self._logs[session_code] = SessionEventLog(self.capacity)
+            while len(self._logs) > self.max_sessions:
+                self._logs.popitem(last=False)
+        self._logs.move_to_end(session_code)
+        return log
+
+    def append(self, session_code: str, message: dict) -> dict:
+        """이벤트를 기록하고 seq를 붙인 사본 반환"""
+        if not self.enabled:
+            return message
+        return self.get(session_code).append(message)
+
+    def replay(self, session_code: str, log_id: Optional[str], since: int) -> Optional[List[dict]]:
+        """since 이후 놓친 이벤트 (이어 받을 수 없으면 None = resync)"""
+        log = self._logs.get(session_code)
+        events = log.since(since) if log is not None and log.log_id == log_id else None
+        if events is None:
+            self.resyncs += 1
+        else:
+            self.replayed += len(events)
+        return events
+
+    def drop(self, session_code: str):
+        self._logs.pop(session_code, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.capacity,
+            "sessions": len(self._logs),
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+        }
@@ -0,0 +1,143 @@
+"""
+WebSocket 하트비트 (타이머 휠)
+
+와이파이가 끊긴 폰은 FIN을 보내지 못해 소켓이 반쯤 열린 채로 남습니다. 이런 소켓도
+세션 인원(최대 50명)에 포함되고 브로드캐스트마다 송신 큐에 프레임이 쌓입니다.
+
+소켓마다 타이머 태스크를 두지 않고, 프로세스에 하나뿐인 타이머 휠이 tick마다 슬롯 하나만 확인합니다.
+
+- 수신 프레임은 client.last_seen만 갱신 (휠 조작 없음)
+- 슬롯에 도착한 소켓이 interval 동안 조용했으면 ping 이벤트를 보내고 timeout 뒤 슬롯에 다시 넣음
+- ping 이후에도 수신이 없으면 죽은 소켓으로 판정
+- 그 사이 수신이 있었으면 마지막 수신 시각 + interval 슬롯으로 미룸 (활발한 소켓은 ping 없음)
+
+tick마다 드는 비용은 그 슬롯에 든 소켓 수에 비례하므로, 소켓 N개를 interval/tick개 슬롯에
+나눠서 확인하는 셈입니다 (10k 소켓, 25초 주기, 1초 tick이면 tick당 약 400개).
+"""
+
+import asyncio
+import math
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+from .log import get_logger
+
+logger = get_logger("heartbeat")
+
+# (ping 보낼 소켓, 죽은 소켓) -> None
+SweepCallback = Callable[[List[Any], List[Any]], Awaitable[None]]
+
+
+class HeartbeatWheel:
+    """하트비트 대상 소켓의 타이머 휠
+
+    소켓 객체에 last_seen, ping_sent_at, heartbeat_slot 속성을 기록합니다.
+    """
+
+    def __init__(self, interval: float = 25.0, timeout: float = 20.0, tick: float = 1.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.tick = tick
+        size = math.ceil(max(interval, timeout, tick) / tick) + 1
+        self.slots: List[Set[Any]] = [set() for _ in range(size)]
+        self.position = 0
+        self._task: Optional[asyncio.Task] = None
+        self.pings_sent = 0
+        self.reaped = 0
+        self.last_sweep_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self.slots)
+
+    def add(self, client: Any, now: float):
+        """새 소켓 등록 (interval 뒤 첫 확인)"""
+        client.last_seen = now
+        client.ping_sent_at = None
+        client.heartbeat_slot = None
+        if self.enabled:
+            self._schedule(client, self.interval)
+
+    def remove(self, client: Any):
+        slot = getattr(client, "heartbeat_slot", None)
+        if slot is not None:
+            self.slots[slot].discard(client)
+            client.heartbeat_slot = None
+
+    def _schedule(self, client: Any, delay: float):
+        ticks = min(len(self.slots) - 1, max(1, math.ceil(delay / self.tick)))
+        slot = (self.position + ticks) % len(self.slots)
+        self.slots[slot].add(client)
+        client.heartbeat_slot = slot
+
+    def advance(self, now: float):
+        """휠을 한 칸 돌리고 (ping 보낼 소켓, 죽은 소켓) 반환"""
+        self.position = (self.position + 1) % len(self.slots)
+        due = self.slots[self.position]
+        self.slots[self.position] = set()
+
+        to_ping, dead = [], []
+        for client in due:
+            client.heartbeat_slot = None
+            if client.ping_sent_at is not None:
+                if client.last_seen < client.ping_sent_at:
+                    dead.append(client)
+                    continue
+                client.ping_sent_at = None
+            idle = now - client.last_seen
+            if idle < self.interval:
+                self._schedule(client, self.interval - idle)
+            else:
+                client.ping_sent_at = now
+                to_ping.append(client)
+                self._schedule(client, self.timeout)
+        self.pings_sent += len(to_ping)
+        self.reaped += len(dead)
+        return to_ping, dead
+
+    def start(self, on_sweep: SweepCallback):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(on_sweep))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, on_sweep: SweepCallback):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            started = loop.time()
+            to_ping, dead = [], []
+            # 이벤트 루프가 밀렸으면 밀린 칸을 한 번에 처리
+            while next_tick <= started:
+                pinged, reaped = self.advance(started)
+                to_ping += pinged
+                dead += reaped
+                next_tick += self.tick
+            if to_ping or dead:
+                try:
+                    await on_sweep(to_ping, dead)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("⚠️ 하트비트 처리 실패: %s", e)
+            self.last_sweep_ms = (loop.time() - started) * 1000
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "sockets": len(self),
+            "pings_sent": self.pings_sent,
+            "reaped": self.reaped,
+            "last_sweep_ms": round(self.last_sweep_ms, 3),
+        }
@@ -0,0 +1,218 @@
+"""
+문제 대량 가져오기 (CSV / JSONL 스트리밍)
+
+파일을 한 줄씩 읽어 설정한 크기만큼 모은 뒤 배치 INSERT(executemany) 한 번으로
+저장하므로, 파일 크기와 관계없이 메모리 사용량이 일정합니다.
+문제 내용 해시(content_hash)에 고유 인덱스가 있어 같은 파일을 다시
+가져와도 이미 있는 문제는 건너뜁니다.
+
+사용법:
+    cd backend
+    python -m app.import_problems data/problems.csv
+    python -m app.import_problems bank.jsonl --batch-size 5000
+    cat bank.jsonl | python -m app.import_problems - --format jsonl
+"""
+
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from sqlalchemy import insert
+
+try:
+    from .database import dispose_engines, write_engine
+    from .models import Problem
+    from .problem_bank import problem_bank
+except ImportError:
+    from app.database import dispose_engines, write_engine
+    from app.models import Problem
+    from app.problem_bank import problem_bank
+
+OPTIONAL_FIELDS = ("hint", "word", "meaning", "example", "example_ko")
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def content_hash(row: dict) -> str:
+    """문제 식별 필드 기준 해시 (힌트/예문 변경은 같은 문제로 취급)"""
+    key = "\x1f".join([
+        row["type"], row["grade"], str(row["difficulty"]),
+        row["question"], row["answer"]
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def normalize_row(raw: dict) -> Optional[dict]:
+    """입력 행을 problems 테이블 행으로 변환 (필수 값이 없으면 None)"""
+    try:
+        row = {
+            "type": str(raw["type"]).strip(),
+            "grade": str(raw["grade"]).strip(),
+            "difficulty": int(raw["difficulty"]),
+            "question": str(raw["question"]).strip(),
+            "answer": str(raw["answer"]).strip(),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(row[field] for field in ("type", "grade", "question", "answer")):
+        return None
+    for field in OPTIONAL_FIELDS:
+        value = raw.get(field)
+        row[field] = str(value).strip() if value not in (None, "") else None
+    row["content_hash"] = content_hash(row)
+    row["id"] = str(uuid.uuid4())
+    row["class_id"] = None
+    return row
+
+
+def iter_csv(stream: io.TextIOBase) -> Iterator[dict]:
+    yield from csv.DictReader(stream)
+
+
+def iter_jsonl(stream: io.TextIOBase) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # 깨진 줄은 invalid로 집계
+            yield {}
+
+
+def _insert_ignore(dialect_name: str):
+    """중복 해시는 건너뛰는 INSERT 문"""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(Problem).on_conflict_do_nothing(index_elements=["content_hash"])
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(Problem).on_conflict_do_nothing(index_elements=["content_hash"])
+    if dialect_name == "mysql":
+        return insert(Problem).prefix_with("IGNORE")
+    raise ValueError(f"지원하지 않는 데이터베이스: {dialect_name}")
+
+
+async def _flush(batch: List[dict], stats: ImportStats):
+    # 같은 문장을 executemany로 실행 (배치마다 거대한 다중 VALUES 문을 컴파일하지 않음)
+    async with write_engine.begin() as conn:
+        result = await conn.execute(_insert_ignore(write_engine.dialect.name), batch)
+    inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+    stats.inserted += inserted
+    stats.duplicates += len(batch) - inserted
+
+
+async def import_rows(
+    rows: Iterable[dict],
+    batch_size: int = 1000,
+    progress_every: int = 100000,
+) -> ImportStats:
+    """행 스트림을 배치 단위로 저장
+
+    다음 배치를 읽고 변환하는 동안 이전 배치의 INSERT가 진행되도록
+    저장 작업을 최대 하나까지 겹쳐 실행합니다 (메모리에는 배치 2개까지만 유지).
+    """
+    stats = ImportStats()
+    started = time.perf_counter()
+    batch: List[dict] = []
+    seen = set()  # 배치 안의 중복 해시
+    pending: Optional[asyncio.Task] = None
+
+    for raw in rows:
+        stats.read += 1
+        row = normalize_row(raw)
+        if row is None:
+            stats.invalid += 1
+            continue
+        if row["content_hash"] in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(row["content_hash"])
+        batch.append(row)
+
+        if len(batch) >= batch_size:
+            if pending is not None:
+                await pending
+            pending = asyncio.create_task(_flush(batch, stats))
+            batch = []
+            seen.clear()
+            # 저장 태스크가 시작될 기회를 줌
+            await asyncio.sleep(0)
+        if progress_every and stats.read % progress_every == 0:
+            elapsed = time.perf_counter() - started
+            print(f"  ... {stats.read:,}행 처리 ({stats.read / elapsed:,.0f}행/초)")
+
+    if pending is not None:
+        await pending
+    if batch:
+        await _flush(batch, stats)
+
+    stats.elapsed = time.perf_counter() - started
+    if stats.inserted:
+        problem_bank.bump()
+    return stats
+
+
+async def import_file(path: str, file_format: Optional[str] = None, batch_size: int = 1000) -> ImportStats:
+    """CSV/JSONL 파일 가져오기 ('-'이면 표준 입력)"""
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    reader = iter_jsonl if file_format == "jsonl" else iter_csv
+
+    if path == "-":
+        return await import_rows(reader(sys.stdin), batch_size=batch_size)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return await import_rows(reader(f), batch_size=batch_size)
+
+
+def print_stats(stats: ImportStats):
+    print("[OK] 문제 가져오기 완료")
+    print(f"  - 읽은 행: {stats.read:,}")
+    print(f"  - 추가: {stats.inserted:,}")
+    print(f"  - 중복 건너뜀: {stats.duplicates:,}")
+    print(f"  - 잘못된 행: {stats.invalid:,}")
+    print(f"  - 소요 시간: {stats.elapsed:.2f}초 ({stats.rows_per_second:,.0f}행/초)")
+
+
+async def main(args):
+    try:
+        from .init_db import create_tables
+    except ImportError:
+        from app.init_db import create_tables
+    try:
+        await create_tables()
+        stats = await import_file(args.path, file_format=args.format, batch_size=args.batch_size)
+        print_stats(stats)
+    finally:
+        # 풀에 남은 SQLite 연결 스레드가 종료를 막지 않도록 (오류 시에도)
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="문제 대량 가져오기 (CSV / JSONL)")
+    parser.add_argument("path", nargs="?", default=str(Path(__file__).parent.parent / "data" / "problems.csv"),
+                        help="가져올 파일 경로 ('-'이면 표준 입력)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="파일 형식 (기본값: 확장자로 판단)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="INSERT 한 번에 저장할 행 수")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,42 @@
+"""
+로깅 설정
+
+print 대신 classkit.* 로거를 사용합니다. 요청/브로드캐스트마다 찍히던 로그는
+DEBUG 레벨이므로 기본 설정(INFO)에서는 출력되지 않습니다.
+
+환경변수:
+    LOG_LEVEL: DEBUG | INFO | WARNING | ERROR | OFF (기본값 INFO)
+"""
+
+import logging
+import os
+import sys
+from typing import Optional
+
+ROOT_LOGGER = "classkit"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def setup_logging(level: Optional[str] = None):
+    """classkit 로거 레벨/핸들러 설정 (여러 번 호출해도 핸들러는 하나)"""
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+
+    if level in ("OFF", "NONE"):
+        root.setLevel(logging.CRITICAL + 1)
+        return
+
+    root.setLevel(getattr(logging, level, logging.INFO))
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """classkit.<name> 로거"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+setup_logging()
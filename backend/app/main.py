@@ -1,12 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
-from .database import engine
+from .database import engine, write_engine, async_session, dispose_engines
+from .websocket_manager import manager
+from .pubsub import InProcessBackend
+from .session_cache import session_cache
+from .problem_bank import problem_bank
+from .message_writer import message_writer
+from .message_buffer import message_buffer
+from .speech_pool import speech_pool
+from .session_sweeper import session_sweeper
+from .message_archive import message_archive
+from .code_allocator import code_allocator
+from .static_files import STATIC_MEMORY_MAX, AssetStore
+from .rate_limit import rate_limit_stats
+from .ws_deflate import configure as configure_ws_deflate
+from .log import get_logger
+from .metrics import METRICS_ENABLED, MetricsMiddleware, instrument_engine, registry
 from .routes import websocket, sessions, messages, problems, conversation
 from .init_db import create_tables
 from pathlib import Path
+import time
+
+logger = get_logger("main")
 
 app = FastAPI(title="Class Widget API")
 
@@ -19,15 +36,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 라우트별 지연 시간 / SQL 계측 (METRICS_ENABLED=false면 끔)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    instrument_engine(write_engine)
+
+# WebSocket permessage-deflate 압축 수준/창 크기 (ws_deflate.py 참조)
+configure_ws_deflate()
+
 # 시작 시 DB 초기화
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 서버 시작 중...")
+    logger.info("🚀 서버 시작 중...")
+    started = time.perf_counter()
     try:
         await create_tables()
-        print("✅ 데이터베이스 초기화 완료")
+        logger.info("✅ 데이터베이스 초기화 완료")
+    except Exception as e:
+        logger.warning("⚠️ 데이터베이스 초기화 경고: %s", e)
+    
+    try:
+        async with async_session() as db:
+            await problem_bank.load(db)
+    except Exception as e:
+        logger.warning("⚠️ 문제 은행 로드 실패 (첫 요청 시 재시도): %s", e)
+    
+    try:
+        async with async_session() as db:
+            await code_allocator.load(db)
+    except Exception as e:
+        logger.warning("⚠️ 세션 코드 할당기 초기화 실패 (DB 고유 인덱스로만 확인): %s", e)
+    
+    try:
+        await manager.start()
+        logger.info("✅ 브로드캐스트 백엔드 시작: %s", manager.backend.name)
     except Exception as e:
-        print(f"⚠️ 데이터베이스 초기화 경고: {e}")
+        logger.warning("⚠️ 브로드캐스트 백엔드 연결 실패, 이 워커 내에서만 전송합니다: %s", e)
+        manager.backend = InProcessBackend()
+    
+    await message_writer.start()
+    if message_writer.enabled:
+        logger.info("✅ 메시지 지연 저장(write-behind) 활성화")
+    
+    # GPT 발화 풀 미리 채우기 (백그라운드)
+    await speech_pool.start()
+    
+    # 정적 파일 목록 (해시/압축은 백그라운드 스레드에서)
+    for store in static_stores:
+        store.start()
+    
+    # 만료 세션 정리 (주기 실행)
+    await session_sweeper.start()
+    await message_archive.start()
+    logger.info("✅ 서버 시작 완료 (%.0fms)", (time.perf_counter() - started) * 1000)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 대기 중인 메시지를 먼저 저장
+    await session_sweeper.stop()
+    await message_archive.stop()
+    await message_writer.stop()
+    await manager.stop()
+    await speech_pool.stop()
+    # 풀에 남은 DB 연결 정리 (SQLite 연결 스레드가 프로세스 종료를 막지 않도록)
+    await dispose_engines()
 
 # 라우터 등록
 app.include_router(websocket.router)
@@ -36,8 +109,8 @@ app.include_router(messages.router, prefix="/api")
 app.include_router(problems.router, prefix="/api")
 app.include_router(conversation.router, prefix="/api")
 
-# Health check 엔드포인트 (최우선)
-@app.get("/health")
+# Health check 엔드포인트 (최우선, 로드밸런서가 HEAD로 확인하기도 함)
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
     try:
         # DB 연결 확인
@@ -46,7 +119,17 @@ async def health_check():
         return {
             "status": "healthy", 
             "version": "0.4.0",
-            "database": "connected"
+            "database": "connected",
+            "session_cache": session_cache.stats(),
+            "websocket": manager.stats(),
+            "message_writer": message_writer.stats(),
+            "message_buffer": message_buffer.stats(),
+            "session_sweeper": session_sweeper.stats(),
+            "message_archive": message_archive.stats(),
+            "code_allocator": code_allocator.stats(),
+            "problem_bank": problem_bank.stats(),
+            "static_files": {store.url_prefix: store.stats() for store in static_stores},
+            "rate_limit": rate_limit_stats()
         }
     except Exception as e:
         return {
@@ -56,50 +139,62 @@ async def health_check():
             "error": str(e)
         }
 
-# 위젯(교사용) 정적 파일 서빙
+# Prometheus 메트릭 (워커별 값)
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# 위젯(교사용) 정적 파일 서빙 (앱 시작 시 목록 생성, static_files.py 참조)
+# HEAD도 받음 (헬스 체크 / CDN이 HEAD로 확인)
+STATIC_METHODS = ["GET", "HEAD"]
+static_stores = []
 widget_path = Path(__file__).parent.parent.parent / "widget"
 if widget_path.exists():
-    # 위젯 정적 파일 마운트
-    app.mount("/widget", StaticFiles(directory=str(widget_path), html=True), name="widget")
+    widget_assets = AssetStore(widget_path, url_prefix="/", memory_max=STATIC_MEMORY_MAX)
+    static_stores.append(widget_assets)
     
     # 루트 경로로 위젯 index.html 서빙
-    @app.get("/")
-    async def serve_widget_root():
+    @app.api_route("/", methods=STATIC_METHODS)
+    async def serve_widget_root(request: Request):
         """루트 경로에서 위젯(교사용) 제공"""
-        return FileResponse(widget_path / "index.html", media_type="text/html")
+        return await widget_assets.response(request, "index.html")
+    
+    @app.api_route("/widget", methods=STATIC_METHODS)
+    @app.api_route("/widget/{file_path:path}", methods=STATIC_METHODS)
+    async def serve_widget(request: Request, file_path: str = ""):
+        """위젯 폴더 파일 서빙 (폴더 경로는 index.html)"""
+        return await widget_assets.response(request, file_path, index="index.html")
     
     # 위젯의 정적 파일들 (src, assets 등) 서빙
-    @app.get("/src/{file_path:path}")
-    async def serve_widget_src(file_path: str):
+    @app.api_route("/src/{file_path:path}", methods=STATIC_METHODS)
+    async def serve_widget_src(request: Request, file_path: str):
         """위젯 src 폴더 파일 서빙"""
-        file = widget_path / "src" / file_path
-        if file.exists() and file.is_file():
-            return FileResponse(file)
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Not found")
+        return await widget_assets.response(request, f"src/{file_path}")
     
-    @app.get("/assets/{file_path:path}")
-    async def serve_widget_assets(file_path: str):
+    @app.api_route("/assets/{file_path:path}", methods=STATIC_METHODS)
+    async def serve_widget_assets(request: Request, file_path: str):
         """위젯 assets 폴더 파일 서빙"""
-        file = widget_path / "assets" / file_path
-        if file.exists() and file.is_file():
-            return FileResponse(file)
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Not found")
+        return await widget_assets.response(request, f"assets/{file_path}")
 
 # 모바일 PWA 정적 파일 서빙 (학생용)
 mobile_path = Path(__file__).parent.parent.parent / "mobile"
 if mobile_path.exists():
-    # 모바일 앱 정적 파일 마운트
-    app.mount("/mobile", StaticFiles(directory=str(mobile_path), html=True), name="mobile")
+    mobile_assets = AssetStore(mobile_path, url_prefix="/mobile/", memory_max=STATIC_MEMORY_MAX)
+    static_stores.append(mobile_assets)
+    
+    @app.api_route("/mobile", methods=STATIC_METHODS)
+    @app.api_route("/mobile/{file_path:path}", methods=STATIC_METHODS)
+    async def serve_mobile_files(request: Request, file_path: str = ""):
+        """모바일 앱 정적 파일 서빙 (폴더 경로는 index.html)"""
+        return await mobile_assets.response(request, file_path, index="index.html")
     
-    @app.get("/{session_code}")
-    async def serve_mobile(session_code: str):
+    @app.api_route("/{session_code}", methods=STATIC_METHODS)
+    async def serve_mobile(request: Request, session_code: str):
         """세션 코드로 모바일 페이지 접속"""
         if len(session_code) == 6 and session_code[0].isalpha() and session_code[1:].isdigit():
-            return FileResponse(mobile_path / "index.html", media_type="text/html")
+            return await mobile_assets.response(request, "index.html")
         # API 경로가 아니면 404
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Not found")
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+"""
+종료된 세션의 메시지 보관 (세션별 gzip JSONL)
+
+학년 내내 운영하면 messages 테이블과 idx_messages_session_time 인덱스가 계속
+커지므로, 종료 후 일정 기간이 지난 세션의 메시지를 세션별 압축 파일로 옮기고
+테이블에서는 배치 단위로 삭제합니다.
+
+- 파일: <MESSAGE_ARCHIVE_DIR>/<세션 ID 앞 2자리>/<세션 ID>.jsonl.gz (오래된 순)
+- 임시 파일에 모두 쓴 뒤 이름을 바꾸고, 그 다음에 행을 삭제 (중간에 중단돼도 유실 없음)
+- 조회한 페이지를 바로 임시 파일에 이어 쓰므로 메모리는 세션 크기가 아닌 배치 크기에 비례
+- GET /api/messages는 보관 파일이 있는 세션을 파일에서 읽어 같은 형식으로 응답
+
+사용법:
+    cd backend
+    python -m app.message_archive --older-than-days 7
+
+환경변수:
+    MESSAGE_ARCHIVE_DIR: 보관 디렉터리 (기본값 backend/data/archive)
+    MESSAGE_ARCHIVE_AFTER_DAYS: 종료 후 보관까지 대기 일수 (기본값 7)
+    MESSAGE_ARCHIVE_INTERVAL: 앱 안에서 주기 실행할 간격(초, 기본값 0 = 실행 안 함)
+    MESSAGE_ARCHIVE_BATCH: 조회/삭제 배치 크기 (기본값 1000)
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, List, Optional, Set, Tuple
+from sqlalchemy import delete, select
+
+try:
+    from .database import async_session
+    from .models import Message as MessageModel, Session as SessionModel
+    from .log import get_logger
+except ImportError:
+    from app.database import async_session
+    from app.models import Message as MessageModel, Session as SessionModel
+    from app.log import get_logger
+
+logger = get_logger("message_archive")
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+
+
+def page_messages(
+    messages: List[dict],
+    limit: int,
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+) -> List[dict]:
+    """오래된 순 메시지 목록에서 커서 페이지 추출 (최신순 반환, get_recent_messages와 같은 규칙)"""
+    if before or since:
+        cursor = before or since
+        position = next((i for i, m in enumerate(messages) if m["id"] == cursor), None)
+        if position is None:
+            return []
+        if since:
+            return list(reversed(messages[position + 1:position + 1 + limit]))
+        return list(reversed(messages[max(0, position - limit):position]))
+    return list(reversed(messages[-limit:]))
+
+
+@dataclass
+class ArchiveStats:
+    sessions: int = 0
+    messages: int = 0
+
+
+class MessageArchive:
+    """세션별 메시지 보관 파일 쓰기/읽기"""
+
+    def __init__(
+        self,
+        directory: Path,
+        after_days: float = 7,
+        interval: float = 0,
+        batch_size: int = 1000,
+        cache_size: int = 32,
+    ):
+        self.directory = Path(directory)
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        # 보관 파일은 바뀌지 않으므로 최근에 읽은 세션은 메모리에 유지
+        self._cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.archived_sessions = 0
+        self.archived_messages = 0
+        self.reads = 0
+
+    def path_for(self, session_id: str) -> Path:
+        return self.directory / session_id[:2] / f"{session_id}.jsonl.gz"
+
+    def exists(self, session_id: str) -> bool:
+        return session_id in self._cache or self.path_for(session_id).exists()
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+
+    def _read_file(self, path: Path) -> List[dict]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def read(self, session_id: str) -> Optional[List[dict]]:
+        """보관된 메시지 (오래된 순), 보관 파일이 없으면 None"""
+        messages = self._cache.get(session_id)
+        if messages is not None:
+            self._cache.move_to_end(session_id)
+            return messages
+        path = self.path_for(session_id)
+        if not path.exists():
+            return None
+        messages = await asyncio.to_thread(self._read_file, path)
+        self.reads += 1
+        self._cache[session_id] = messages
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return messages
+
+    async def get_messages(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> Optional[List[dict]]:
+        """보관 파일에서 커서 페이지 조회 (보관되지 않은 세션이면 None)"""
+        messages = await self.read(session_id)
+        if messages is None:
+            return None
+        return page_messages(messages, limit, before=before, since=since)
+
+    # ------------------------------------------------------------------
+    # 보관
+    # ------------------------------------------------------------------
+
+    async def _fetch_page(self, session_id: str, after: Optional[str]) -> List[MessageModel]:
+        async with async_session() as db:
+            query = select(MessageModel).where(MessageModel.session_id == session_id)
+            if after is not None:
+                # 커서 시각은 DB 값 그대로 비교 (query_messages와 같은 방식)
+                message_id = after
+                created_at = (
+                    select(MessageModel.created_at)
+                    .where(MessageModel.id == message_id)
+                    .scalar_subquery()
+                )
+                query = query.where(
+                    (MessageModel.created_at > created_at)
+                    | ((MessageModel.created_at == created_at) & (MessageModel.id > message_id))
+                )
+            result = await db.execute(
+                query.order_by(MessageModel.created_at.asc(), MessageModel.id.asc()).limit(self.batch_size)
+            )
+            return list(result.scalars().all())
+
+    def _open_temp(self, path: Path) -> Tuple[Path, IO[str], Set[str]]:
+        """임시 파일을 열고 기존 보관 파일을 줄 단위로 복사 (스레드에서 실행)
+
+        이전 실행이 파일만 쓰고 삭제 전에 중단됐으면 기존 내용에 이어서 씁니다.
+        기존 메시지는 중복 확인용 ID만 메모리에 둡니다.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        out = gzip.open(tmp_path, "wt", encoding="utf-8")
+        seen: Set[str] = set()
+        try:
+            if path.exists():
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            seen.add(json.loads(line)["id"])
+                            out.write(line if line.endswith("\n") else line + "\n")
+        except BaseException:
+            self._discard(out, tmp_path)
+            raise
+        return tmp_path, out, seen
+
+    @staticmethod
+    def _write_page(out: IO[str], messages: List[dict], seen: Set[str]):
+        for message in messages:
+            if message["id"] not in seen:
+                out.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _commit_temp(out: IO[str], tmp_path: Path, path: Path):
+        out.close()
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _discard(out: IO[str], tmp_path: Path):
+        out.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    async def _delete_through(self, session_id: str, last_id: str):
+        """보관 파일에 들어간 마지막 메시지까지 배치 단위로 삭제 (오래된 순)"""
+        while True:
+            async with async_session() as db:
+                # 커서 시각은 DB 값 그대로 비교 (_fetch_page와 같은 방식)
+                created_at = (
+                    select(MessageModel.created_at)
+                    .where(MessageModel.id == last_id)
+                    .scalar_subquery()
+                )
+                result = await db.execute(
+                    select(MessageModel.id)
+                    .where(
+                        MessageModel.session_id == session_id,
+                        (MessageModel.created_at < created_at)
+                        | ((MessageModel.created_at == created_at) & (MessageModel.id <= last_id))
+                    )
+                    .order_by(MessageModel.created_at.asc(), MessageModel.id.asc())
+                    .limit(self.batch_size)
+                )
+                ids = list(result.scalars().all())
+                if not ids:
+                    return
+                await db.execute(
+                    delete(MessageModel)
+                    .where(MessageModel.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            if len(ids) < self.batch_size:
+                return
+
+    async def archive_session(self, session_id: str) -> int:
+        """세션 메시지를 파일로 옮기고 테이블에서 삭제, 옮긴 메시지 수 반환"""
+        # 파일 읽기/압축/쓰기는 스레드에서 (이벤트 루프를 막지 않음), 페이지마다 바로 이어 씀
+        path = self.path_for(session_id)
+        tmp_path, out, seen = await asyncio.to_thread(self._open_temp, path)
+        count = 0
+        after = None
+        try:
+            while True:
+                rows = await self._fetch_page(session_id, after)
+                if not rows:
+                    break
+                page = [
+                    {
+                        "id": str(row.id),
+                        "nickname": row.nickname,
+                        "avatar_id": row.avatar_id,
+                        "content": row.content,
+                        "created_at": row.created_at.isoformat() if row.created_at else None
+                    }
+                    for row in rows
+                ]
+                await asyncio.to_thread(self._write_page, out, page, seen)
+                count += len(rows)
+                after = rows[-1].id
+                if len(rows) < self.batch_size:
+                    break
+            await asyncio.to_thread(self._commit_temp, out, tmp_path, path)
+        except BaseException:
+            await asyncio.to_thread(self._discard, out, tmp_path)
+            raise
+
+        # 파일이 완성된 뒤에만 삭제
+        if after is not None:
+            await self._delete_through(session_id, after)
+
+        self._cache.pop(session_id, None)
+        return count
+
+    async def archive_ended(self, older_than: Optional[timedelta] = None, max_sessions: Optional[int] = None) -> ArchiveStats:
+        """종료 후 older_than이 지난 세션 중 메시지가 남아 있는 세션을 모두 보관"""
+        cutoff = datetime.now() - (older_than if older_than is not None else timedelta(days=self.after_days))
+        stats = ArchiveStats()
+        while max_sessions is None or stats.sessions < max_sessions:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(SessionModel.id)
+                    .where(
+                        SessionModel.ended_at.is_not(None),
+                        SessionModel.ended_at < cutoff,
+                        select(MessageModel.id).where(MessageModel.session_id == SessionModel.id).exists()
+                    )
+                    .limit(100)
+                )
+                session_ids = [str(row[0]) for row in result.all()]
+            if not session_ids:
+                break
+            for session_id in session_ids:
+                count = await self.archive_session(session_id)
+                stats.sessions += 1
+                stats.messages += count
+                logger.debug("📦 세션 메시지 보관: %s (%d개)", session_id, count)
+
+        self.archived_sessions += stats.sessions
+        self.archived_messages += stats.messages
+        if stats.sessions:
+            logger.info("📦 메시지 보관 완료: 세션 %d개, 메시지 %d개", stats.sessions, stats.messages)
+        return stats
+
+    # ------------------------------------------------------------------
+    # 주기 실행
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.archive_ended()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ 메시지 보관 실패: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "archived_sessions": self.archived_sessions,
+            "archived_messages": self.archived_messages,
+            "reads": self.reads,
+            "cached_sessions": len(self._cache),
+        }
+
+
+# 전역 인스턴스
+message_archive = MessageArchive(
+    directory=Path(os.getenv("MESSAGE_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR),
+    after_days=float(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "7")),
+    interval=float(os.getenv("MESSAGE_ARCHIVE_INTERVAL", "0")),
+    batch_size=int(os.getenv("MESSAGE_ARCHIVE_BATCH", "1000")),
+)
+
+
+async def main(args):
+    try:
+        from .database import dispose_engines
+    except ImportError:
+        from app.database import dispose_engines
+    try:
+        stats = await message_archive.archive_ended(
+            older_than=timedelta(days=args.older_than_days),
+            max_sessions=args.max_sessions,
+        )
+    finally:
+        await dispose_engines()
+    print("[OK] 메시지 보관 완료")
+    print(f"  - 세션: {stats.sessions:,}")
+    print(f"  - 메시지: {stats.messages:,}")
+    print(f"  - 보관 위치: {message_archive.directory}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="종료된 세션의 메시지를 압축 파일로 보관")
+    parser.add_argument("--older-than-days", type=float, default=message_archive.after_days,
+                        help="종료 후 이 기간이 지난 세션만 보관")
+    parser.add_argument("--max-sessions", type=int, default=None, help="이번 실행에서 보관할 최대 세션 수")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,256 @@
+"""
+세션별 최근 메시지 링 버퍼
+
+위젯 새로고침/재연결 때마다 GET /api/messages가 DB를 조회하지 않도록
+세션마다 최근 메시지를 고정 크기 버퍼에 보관합니다.
+
+- 처음 조회할 때 DB에서 최근 메시지로 채움 (이후 버퍼는 최신 구간을 빠짐없이 보관)
+- newMessage 브로드캐스트(다른 워커에서 온 것 포함)를 받아 버퍼에 추가
+- 버퍼보다 오래된 페이지만 DB에서 조회
+- 지연 저장(MESSAGE_WRITE_BEHIND) 중인 메시지는 DB에 없으므로 채울 때 message_writer의 저장 대기 행을 합침
+- 같은 세션의 첫 조회가 동시에 오면 버퍼 하나를 한 번만 채움 (나머지는 채우기가 끝날 때까지 대기)
+
+환경변수:
+    MESSAGE_BUFFER_SIZE: 세션별 보관 메시지 수 (기본값 100)
+    MESSAGE_BUFFER_MAX_SESSIONS: 버퍼를 유지할 최대 세션 수 (기본값 1000)
+"""
+
+import asyncio
+import os
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Message as MessageModel
+from .message_writer import message_writer
+from .websocket_manager import SESSION_ENDED, manager
+
+
+def message_to_dict(message: MessageModel) -> dict:
+    return {
+        "id": str(message.id),
+        "nickname": message.nickname,
+        "avatar_id": message.avatar_id,
+        "content": message.content,
+        "created_at": message.created_at
+    }
+
+
+def _row_to_dict(row: dict) -> dict:
+    """message_writer의 저장 대기 행 -> 버퍼 메시지"""
+    return {
+        "id": row["id"],
+        "nickname": row["nickname"],
+        "avatar_id": row["avatar_id"],
+        "content": row["content"],
+        "created_at": row["created_at"]
+    }
+
+
+class SessionBuffer:
+    """한 세션의 최근 메시지 (오래된 순)"""
+
+    def __init__(self, session_id: str, capacity: int):
+        self.session_id = session_id
+        self.messages: Deque[dict] = deque(maxlen=capacity)
+        self.ids: Dict[str, dict] = {}
+        # DB에서 채우기 전(또는 채우는 중)에는 버퍼를 신뢰하지 않음
+        self.primed = False
+        self.pending: List[dict] = []
+        # 채우기(DB 조회)는 한 번에 하나만
+        self.lock = asyncio.Lock()
+        # True면 세션의 모든 메시지가 버퍼 안에 있음 (DB 조회 불필요)
+        self.has_all = False
+
+    def append(self, message: dict):
+        if message["id"] in self.ids:
+            return
+        if not self.primed:
+            self.pending.append(message)
+            return
+        if len(self.messages) == self.messages.maxlen:
+            oldest = self.messages[0]
+            self.ids.pop(oldest["id"], None)
+            self.has_all = False
+        self.messages.append(message)
+        self.ids[message["id"]] = message
+
+    def position(self, message_id: str) -> Optional[int]:
+        message = self.ids.get(message_id)
+        if message is None:
+            return None
+        # 버퍼 크기가 작으므로 선형 탐색으로 충분
+        for i, m in enumerate(self.messages):
+            if m is message:
+                return i
+        return None
+
+
+class MessageBuffer:
+    """세션 코드 → SessionBuffer"""
+
+    def __init__(self, capacity: int = 100, max_sessions: int = 1000):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self._buffers: "OrderedDict[str, SessionBuffer]" = OrderedDict()
+        self.hits = 0
+        self.db_reads = 0
+
+    async def get(self, db: AsyncSession, session_code: str, session_id: str) -> SessionBuffer:
+        """세션 버퍼 조회 (없거나 다른 세션의 버퍼면 DB에서 채움)"""
+        buffer = self._buffers.get(session_code)
+        if buffer is None or buffer.session_id != session_id:
+            # 바로 등록해서 동시에 온 첫 조회들이 같은 버퍼를 채우기 기다림
+            buffer = SessionBuffer(session_id, self.capacity)
+            self._buffers[session_code] = buffer
+            while len(self._buffers) > self.max_sessions:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(session_code)
+        if buffer.primed:
+            return buffer
+
+        async with buffer.lock:
+            if not buffer.primed:
+                await self._prime(db, buffer)
+        return buffer
+
+    async def _prime(self, db: AsyncSession, buffer: SessionBuffer):
+        """DB 최근 메시지 + 저장 대기 메시지로 버퍼 채우기
+
+        저장 대기 행을 DB 조회보다 먼저 복사하므로, 조회 도중 저장된 행은 DB 결과에 들어 있고
+        복사 이후 제출된 행은 브로드캐스트로 pending에 들어옵니다 (빠지는 메시지 없음, 중복은 ID로 제거).
+        """
+        unflushed = [_row_to_dict(row) for row in message_writer.unflushed(buffer.session_id)]
+        # 채우는 동안 도착한 메시지는 pending에 모였다가 뒤에 붙음
+        result = await db.execute(
+            select(MessageModel)
+            .where(MessageModel.session_id == buffer.session_id)
+            .order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
+            .limit(self.capacity)
+        )
+        rows = [message_to_dict(m) for m in reversed(result.scalars().all())]
+        self.db_reads += 1
+
+        # 저장 대기 메시지는 모두 DB 결과보다 새로우므로 has_all은 DB 결과 기준 (넘치면 append가 False로 바꿈)
+        buffer.has_all = len(rows) < self.capacity
+        if unflushed:
+            merged = {m["id"]: m for m in rows + unflushed}
+            rows = sorted(merged.values(), key=lambda m: (m["created_at"] or datetime.min, m["id"]))
+        buffer.primed = True
+        for message in rows + buffer.pending:
+            buffer.append(message)
+        buffer.pending = []
+
+    def on_event(self, session_code: str, message: dict):
+        """ConnectionManager 리스너: newMessage를 해당 세션 버퍼에 추가, 세션 종료 시 버퍼 해제"""
+        if message.get("event") == SESSION_ENDED:
+            self.invalidate(session_code)
+            return
+        if message.get("event") != "newMessage":
+            return
+        buffer = self._buffers.get(session_code)
+        payload = message.get("payload") or {}
+        if buffer is None or "id" not in payload:
+            return
+        created_at = payload.get("timestamp")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        buffer.append({
+            "id": payload["id"],
+            "nickname": payload.get("nickname"),
+            "avatar_id": payload.get("avatar_id"),
+            "content": payload.get("content"),
+            "created_at": created_at
+        })
+
+    def invalidate(self, session_code: str):
+        self._buffers.pop(session_code, None)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._buffers),
+            "hits": self.hits,
+            "db_reads": self.db_reads,
+        }
+
+
+async def query_messages(
+    db: AsyncSession,
+    session_id: str,
+    limit: int,
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+) -> List[dict]:
+    """DB에서 커서 기준 메시지 조회 (최신순)
+
+    커서는 메시지 ID이며 (created_at, id) 순서로 비교합니다.
+    since가 있으면 커서 바로 다음 메시지부터 limit개를 반환합니다.
+    """
+    query = select(MessageModel).where(MessageModel.session_id == session_id)
+    cursor_id = before or since
+    if cursor_id:
+        # 커서 시각은 DB 값 그대로 비교 (저장 형식 차이로 인한 불일치 방지)
+        cursor_time = (
+            select(MessageModel.created_at)
+            .where(MessageModel.id == cursor_id, MessageModel.session_id == session_id)
+            .scalar_subquery()
+        )
+        if before:
+            query = query.where(
+                (MessageModel.created_at < cursor_time)
+                | ((MessageModel.created_at == cursor_time) & (MessageModel.id < cursor_id))
+            )
+        else:
+            query = query.where(
+                (MessageModel.created_at > cursor_time)
+                | ((MessageModel.created_at == cursor_time) & (MessageModel.id > cursor_id))
+            )
+
+    if since:
+        query = query.order_by(MessageModel.created_at.asc(), MessageModel.id.asc())
+    else:
+        query = query.order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
+
+    result = await db.execute(query.limit(limit))
+    messages = [message_to_dict(m) for m in result.scalars().all()]
+    if since:
+        messages.reverse()
+    return messages
+
+
+async def get_recent_messages(
+    db: AsyncSession,
+    session_code: str,
+    session_id: str,
+    limit: int,
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+) -> List[dict]:
+    """버퍼 우선 메시지 조회 (최신순), 버퍼로 부족하면 DB 조회"""
+    buffer = await message_buffer.get(db, session_code, session_id)
+    messages = list(buffer.messages)
+
+    if since:
+        pos = buffer.position(since)
+        if pos is not None:
+            message_buffer.hits += 1
+            return list(reversed(messages[pos + 1:pos + 1 + limit]))
+    elif before:
+        pos = buffer.position(before)
+        if pos is not None and (pos >= limit or buffer.has_all):
+            message_buffer.hits += 1
+            return list(reversed(messages[max(0, pos - limit):pos]))
+    elif len(messages) >= limit or buffer.has_all:
+        message_buffer.hits += 1
+        return list(reversed(messages[-limit:]))
+
+    return await query_messages(db, session_id, limit, before=before, since=since)
+
+
+# 전역 인스턴스
+message_buffer = MessageBuffer(
+    capacity=int(os.getenv("MESSAGE_BUFFER_SIZE", "100")),
+    max_sessions=int(os.getenv("MESSAGE_BUFFER_MAX_SESSIONS", "1000")),
+)
+manager.add_listener(message_buffer.on_event)
@@ -0,0 +1,172 @@
+"""
+메시지 지연 저장 (write-behind + group commit)
+
+MESSAGE_WRITE_BEHIND=true이면 create_message가 메시지 ID와 시각을 앱에서
+정해 바로 브로드캐스트하고, DB 저장은 백그라운드 flusher에 맡깁니다.
+flusher는 일정 시간(ms) 또는 일정 개수마다 모아서 다중 행 INSERT 한 번과
+커밋 한 번으로 저장합니다. SQLite처럼 커밋마다 fsync가 발생하는 환경에서
+메시지 처리량이 크게 늘어납니다.
+
+- 큐가 가득 차면 submit()이 대기하여 요청 속도를 DB 속도에 맞춤 (backpressure)
+- 앱 종료 시 stop()이 남은 메시지를 모두 저장한 뒤 종료
+- 저장 전 메시지는 브로드캐스트는 됐지만 DB에 없으므로, 세션별로 unflushed()에서 조회 가능
+  (message_buffer가 DB에서 버퍼를 채울 때 합침)
+
+환경변수:
+    MESSAGE_WRITE_BEHIND: true | false (기본값 false)
+    MESSAGE_FLUSH_INTERVAL_MS: 최대 대기 시간(ms, 기본값 50)
+    MESSAGE_FLUSH_BATCH: 한 번에 저장할 최대 행 수 (기본값 200)
+    MESSAGE_QUEUE_SIZE: 저장 대기 큐 크기 (기본값 5000)
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+from sqlalchemy import insert
+from .database import async_session
+from .models import Message as MessageModel
+from .log import get_logger
+
+logger = get_logger("message_writer")
+
+_STOP = object()
+
+
+class MessageWriter:
+    """메시지 배치 저장기"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        flush_interval: float = 0.05,
+        max_batch: int = 200,
+        max_queue: int = 5000,
+        max_retries: int = 3,
+    ):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # session_id -> {메시지 ID: 행} (submit부터 저장 완료/포기까지)
+        self._unflushed: Dict[str, Dict[str, dict]] = {}
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.dropped_rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """flusher 태스크 시작 (앱 시작 시 호출)"""
+        if not self.enabled or self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 메시지를 모두 저장하고 종료 (앱 종료 시 호출)"""
+        if not self.running:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, row: dict):
+        """저장할 메시지 행 추가 (큐가 가득 차면 자리가 날 때까지 대기)"""
+        self._unflushed.setdefault(row["session_id"], {})[row["id"]] = row
+        try:
+            await self.queue.put(row)
+        except BaseException:
+            # 대기 중 요청이 취소되면 저장도 브로드캐스트도 되지 않음
+            self._forget([row])
+            raise
+    
+    def unflushed(self, session_id: str) -> List[dict]:
+        """세션의 아직 저장되지 않은 메시지 행 (오래된 순)"""
+        rows = self._unflushed.get(session_id)
+        if not rows:
+            return []
+        return sorted(rows.values(), key=lambda row: (row["created_at"], row["id"]))
+    
+    def _forget(self, batch: List[dict]):
+        for row in batch:
+            rows = self._unflushed.get(row["session_id"])
+            if rows is None:
+                continue
+            rows.pop(row["id"], None)
+            if not rows:
+                del self._unflushed[row["session_id"]]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self.queue.get()
+            if row is _STOP:
+                break
+
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+        # 종료 신호 이후 남은 행 저장
+        rest = []
+        while not self.queue.empty():
+            row = self.queue.get_nowait()
+            if row is not _STOP:
+                rest.append(row)
+        for i in range(0, len(rest), self.max_batch):
+            await self._flush(rest[i:i + self.max_batch])
+
+    async def _flush(self, batch: List[dict]):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with async_session() as db:
+                    await db.execute(insert(MessageModel).values(batch))
+                    await db.commit()
+                self.flushed_rows += len(batch)
+                self.flushed_batches += 1
+                self._forget(batch)
+                return
+            except Exception as e:
+                logger.warning("⚠️ 메시지 일괄 저장 실패 (%d/%d, %d개): %s", attempt, self.max_retries, len(batch), e)
+                await asyncio.sleep(0.1 * attempt)
+        self.dropped_rows += len(batch)
+        self._forget(batch)
+        logger.error("❌ 메시지 %d개 저장 포기", len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "unflushed_sessions": len(self._unflushed),
+            "flushed_rows": self.flushed_rows,
+            "flushed_batches": self.flushed_batches,
+            "dropped_rows": self.dropped_rows,
+        }
+
+
+# 전역 인스턴스
+message_writer = MessageWriter(
+    enabled=os.getenv("MESSAGE_WRITE_BEHIND", "false").lower() == "true",
+    flush_interval=int(os.getenv("MESSAGE_FLUSH_INTERVAL_MS", "50")) / 1000,
+    max_batch=int(os.getenv("MESSAGE_FLUSH_BATCH", "200")),
+    max_queue=int(os.getenv("MESSAGE_QUEUE_SIZE", "5000")),
+)
@@ -0,0 +1,309 @@
+"""
+Prometheus 텍스트 형식 메트릭
+
+외부 라이브러리 없이 Counter / Gauge / Histogram을 메모리에 보관하고
+/metrics 요청 시 텍스트 형식(0.0.4)으로 출력합니다. 값은 워커(프로세스)별입니다.
+
+수집 항목:
+    - 라우트별 요청 지연 시간 (MetricsMiddleware)
+    - SQL 문 실행 수/시간, 오류 수 (engine 이벤트)
+    - 커넥션 풀 checkout 대기 시간
+    - WebSocket 세션/소켓 수, 브로드캐스트 fan-out 시간
+
+환경변수:
+    METRICS_ENABLED: false면 /metrics와 요청/SQL 계측을 끔 (기본값 true)
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 초 단위 기본 버킷 (1ms ~ 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """HELP/TYPE 줄을 뺀 샘플 줄 목록"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """현재 값 (set으로 기록하거나, 출력 시 func을 호출해서 읽음)"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        func: Optional[Callable[[], object]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.func = func
+
+    def set(self, value: float, *labelvalues: str):
+        self._values[labelvalues] = value
+
+    def set_function(self, func: Callable[[], object]):
+        """출력 시 호출할 함수 (숫자, 또는 라벨 튜플 -> 값 dict 반환)"""
+        self.func = func
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        if self.func is not None:
+            result = self.func()
+            if isinstance(result, dict):
+                values.update(result)
+            else:
+                values[()] = result
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> [버킷별 개수(+Inf 포함), 합계]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = [[0] * (len(self.buckets) + 1), 0.0]
+            self._values[labelvalues] = state
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *labelvalues: str) -> "_Timer":
+        """with 블록 실행 시간 기록"""
+        return _Timer(self, labelvalues)
+
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram: Histogram, labelvalues: LabelValues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+# 전역 레지스트리와 메트릭
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "classkit_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status"),
+))
+sql_statement_duration = registry.register(Histogram(
+    "classkit_sql_statement_duration_seconds", "SQL statement execution time by verb",
+    ("verb",),
+))
+sql_errors = registry.register(Counter(
+    "classkit_sql_errors_total", "SQL statements that raised an error", ("verb",),
+))
+pool_checkout_wait = registry.register(Histogram(
+    "classkit_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+ws_sessions = registry.register(Gauge(
+    "classkit_ws_sessions", "Sessions with at least one WebSocket on this worker",
+))
+ws_sockets = registry.register(Gauge(
+    "classkit_ws_sockets", "Open WebSocket connections on this worker",
+))
+ws_evictions = registry.register(Counter(
+    "classkit_ws_evictions_total", "WebSockets closed for being slow or broken", ("reason",),
+))
+broadcast_fanout_duration = registry.register(Histogram(
+    "classkit_broadcast_fanout_seconds", "Time to serialize and enqueue one broadcast to local sockets",
+    buckets=(0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05),
+))
+broadcast_recipients = registry.register(Histogram(
+    "classkit_broadcast_recipients", "Local sockets reached per broadcast",
+    buckets=(0, 1, 5, 10, 20, 30, 40, 50),
+))
+
+
+def _statement_verb(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "CREATE", "ALTER") else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("classkit_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("classkit_query_start")
+    if stack:
+        sql_statement_duration.observe(time.perf_counter() - stack.pop(), _statement_verb(statement))
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        stack = context.connection.info.get("classkit_query_start")
+        if stack:
+            stack.pop()
+    sql_errors.inc(_statement_verb(context.statement or ""))
+
+
+def timed_pool_class(pool_class: type) -> type:
+    """checkout(Pool.connect) 대기 시간을 측정하는 풀 하위 클래스
+
+    풀 이벤트에는 "checkout 시작"이 없으므로 엔진을 만들 때 poolclass로 이 클래스를 넘깁니다
+    (database.py). engine.dispose()가 만드는 새 풀도 같은 클래스를 사용합니다.
+    METRICS_ENABLED=false면 원래 클래스를 그대로 반환합니다.
+    """
+    if not METRICS_ENABLED:
+        return pool_class
+
+    class TimedPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                pool_checkout_wait.observe(time.perf_counter() - started)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진에 SQL 계측 연결 (AsyncEngine이면 sync_engine 사용, 풀 대기는 timed_pool_class)"""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """라우트 템플릿(/api/sessions/{code}) 기준 요청 지연 시간 기록 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 매칭된 라우트가 없으면(정적 파일, 404) 경로별 시계열이 늘어나지 않도록 하나로 묶음
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "other"
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], path, status[0])
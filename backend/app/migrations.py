@@ -0,0 +1,295 @@
+"""
+버전 기반 스키마 마이그레이션
+
+schema_version 테이블에 적용된 마이그레이션 번호를 기록하고, 앱 시작 시에는
+최신 번호만 조회합니다. 스키마가 최신이면 쿼리 한 번으로 끝나므로
+(create_all, 컬럼 조회, 인덱스 생성을 매번 실행하지 않음) 콜드 스타트가 빨라집니다.
+
+- 마이그레이션은 번호 순서대로 실행되며, 컬럼/인덱스 존재 여부를 inspector로
+  확인하므로 버전 테이블이 없던 기존 DB에도 안전하게 다시 적용됩니다.
+- SQLite / PostgreSQL / MySQL 차이(부분 인덱스, 제약 삭제 방식)는 각 마이그레이션에서 처리
+- 새 스키마 변경은 MIGRATIONS 끝에 함수를 추가 (이미 배포된 번호는 수정하지 않음)
+- 워커 여러 개가 동시에 시작해도 한 워커만 적용 (PostgreSQL advisory lock, MySQL GET_LOCK,
+  SQLite BEGIN IMMEDIATE). 잠금을 얻은 뒤 버전을 다시 읽으므로 나머지 워커는 그냥 지나감
+"""
+
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+try:
+    from .database import Base
+    from . import models
+    from .log import get_logger
+except ImportError:
+    from app.database import Base
+    from app import models
+    from app.log import get_logger
+
+logger = get_logger("migrations")
+
+# 종료된 세션의 코드를 다시 쓸 수 있는 DB (활성 세션끼리만 고유한 인덱스를 만들 수 있음)
+# - SQLite / PostgreSQL: 부분 인덱스 (WHERE ended_at IS NULL)
+# - MySQL: 부분 인덱스 대신 active_code 생성 컬럼의 고유 인덱스 (v6)
+CODE_REUSE_DIALECTS = {"sqlite", "postgresql", "mysql"}
+
+# 워커 간 마이그레이션 잠금 (PostgreSQL advisory lock 키, MySQL GET_LOCK 이름/대기 시간)
+MIGRATION_LOCK_KEY = 0x636B6D67  # "ckmg"
+MIGRATION_LOCK_NAME = "classkit_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+# ---------------------------------------------------------------------------
+# 도우미
+# ---------------------------------------------------------------------------
+
+async def _columns(conn: AsyncConnection, table: str) -> List[str]:
+    return await conn.run_sync(lambda sync_conn: [c["name"] for c in inspect(sync_conn).get_columns(table)])
+
+
+async def _index_names(conn: AsyncConnection, table: str) -> List[str]:
+    def read(sync_conn):
+        inspector = inspect(sync_conn)
+        names = [i["name"] for i in inspector.get_indexes(table)]
+        names += [c["name"] for c in inspector.get_unique_constraints(table) if c.get("name")]
+        return names
+    return await conn.run_sync(read)
+
+
+async def _add_columns(conn: AsyncConnection, table: str, columns: List[tuple]):
+    existing = set(await _columns(conn, table))
+    for name, column_type in columns:
+        if name not in existing:
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+            logger.info("[MIGRATION] %s 테이블에 '%s' 컬럼 추가됨", table, name)
+
+
+async def _create_index(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    columns: str,
+    unique: bool = False,
+    where: Optional[str] = None,
+):
+    """인덱스 생성 (MySQL은 부분 인덱스가 없으므로 WHERE 없이 생성, 고유 인덱스면 의미가 달라지므로 주의)"""
+    if name in await _index_names(conn, table):
+        return
+    dialect = conn.dialect.name
+    unique_sql = "UNIQUE " if unique else ""
+    if dialect == "mysql":
+        await conn.execute(text(f"CREATE {unique_sql}INDEX {name} ON {table}({columns})"))
+        return
+    where_sql = f" WHERE {where}" if where else ""
+    await conn.execute(text(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table}({columns}){where_sql}"))
+
+
+# ---------------------------------------------------------------------------
+# 마이그레이션 (번호 순서대로 적용)
+# ---------------------------------------------------------------------------
+
+async def _initial_tables(conn: AsyncConnection):
+    """모델 기준 테이블 생성 (이미 있는 테이블은 건너뜀)"""
+    await conn.run_sync(Base.metadata.create_all)
+
+
+async def _session_problem_columns(conn: AsyncConnection):
+    """sessions: 세션 문제, 학생 명단"""
+    await _add_columns(conn, "sessions", [("problems", "JSON"), ("student_names", "JSON")])
+
+
+async def _problem_detail_columns(conn: AsyncConnection):
+    """problems: 힌트/단어 정보, 가져오기 중복 방지 해시"""
+    await _add_columns(conn, "problems", [
+        ("hint", "TEXT"), ("word", "TEXT"), ("meaning", "TEXT"),
+        ("example", "TEXT"), ("example_ko", "TEXT"), ("content_hash", "CHAR(64)")
+    ])
+
+
+async def _base_indexes(conn: AsyncConnection):
+    """기본 인덱스 (ERD.md 참조)"""
+    # MySQL은 부분 인덱스가 없어 일단 세션 코드 전체에 고유 인덱스 (v6에서 active_code 인덱스로 교체)
+    await _create_index(conn, "idx_session_code_active", "sessions", "code", unique=True, where="ended_at IS NULL")
+    await _create_index(conn, "idx_messages_session_time", "messages", "session_id, created_at DESC")
+    await _create_index(conn, "idx_problems_content_hash", "problems", "content_hash", unique=True)
+    await _create_index(conn, "idx_problems_grade_difficulty", "problems", "grade, difficulty, type")
+
+
+async def _session_code_reuse(conn: AsyncConnection):
+    """예전 스키마의 UNIQUE(code) 제거 (활성 세션 고유성은 idx_session_code_active가 담당)
+
+    만료 세션 정리용 인덱스도 함께 추가합니다.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        result = await conn.execute(text("PRAGMA index_list(sessions)"))
+        unique_indexes = [row[1] for row in result.fetchall() if row[3] == "u"]
+        has_code_unique = False
+        for name in unique_indexes:
+            info = await conn.execute(text(f"PRAGMA index_info('{name}')"))
+            if [row[2] for row in info.fetchall()] == ["code"]:
+                has_code_unique = True
+        if has_code_unique:
+            # SQLite는 제약을 지울 수 없으므로 테이블 재생성 후 데이터 복사
+            from sqlalchemy.schema import CreateTable
+            create_sql = str(CreateTable(models.Session.__table__).compile(dialect=conn.dialect))
+            create_sql = create_sql.replace("CREATE TABLE sessions", "CREATE TABLE sessions_new", 1)
+            columns = ", ".join(column.name for column in models.Session.__table__.columns)
+            await conn.execute(text(create_sql))
+            await conn.execute(text(f"INSERT INTO sessions_new ({columns}) SELECT {columns} FROM sessions"))
+            await conn.execute(text("DROP TABLE sessions"))
+            await conn.execute(text("ALTER TABLE sessions_new RENAME TO sessions"))
+            # 재생성으로 사라진 인덱스 복구
+            await _create_index(conn, "idx_session_code_active", "sessions", "code", unique=True, where="ended_at IS NULL")
+            logger.info("[MIGRATION] sessions.code 고유 제약 제거 (테이블 재생성)")
+    elif dialect == "postgresql":
+        await conn.execute(text("ALTER TABLE sessions DROP CONSTRAINT IF EXISTS sessions_code_key"))
+
+    await _create_index(conn, "idx_sessions_active_expires", "sessions", "expires_at", where="ended_at IS NULL")
+
+
+async def _mysql_active_code(conn: AsyncConnection):
+    """MySQL: 활성 세션 코드 고유성을 생성 컬럼 인덱스로 (종료된 세션 코드 재사용)
+
+    ended_at이 NULL일 때만 code 값을 갖는 active_code 생성 컬럼에 고유 인덱스를 두면
+    (고유 인덱스는 NULL 중복을 허용) 다른 DB의 부분 인덱스와 같습니다. 이 마이그레이션 전에는
+    code 전체 고유 인덱스 때문에 만료 정리된 세션의 커스텀 코드로 다시 만들면 409가 났습니다.
+    MySQL 5.7 / MariaDB 10.2 이상이 필요합니다.
+    """
+    if conn.dialect.name != "mysql":
+        return
+    if "active_code" not in await _columns(conn, "sessions"):
+        await conn.execute(text(
+            "ALTER TABLE sessions ADD COLUMN active_code CHAR(6) "
+            "GENERATED ALWAYS AS (IF(ended_at IS NULL, code, NULL)) STORED"
+        ))
+        logger.info("[MIGRATION] sessions 테이블에 'active_code' 생성 컬럼 추가됨")
+
+    def code_unique_indexes(sync_conn):
+        # 예전 스키마의 UNIQUE(code)와 v4의 idx_session_code_active (둘 다 code 전체)
+        inspector = inspect(sync_conn)
+        names = {i["name"] for i in inspector.get_indexes("sessions") if i.get("unique") and i["column_names"] == ["code"]}
+        names |= {c["name"] for c in inspector.get_unique_constraints("sessions") if c["column_names"] == ["code"]}
+        return names
+
+    for name in await conn.run_sync(code_unique_indexes):
+        await conn.execute(text(f"DROP INDEX `{name}` ON sessions"))
+        logger.info("[MIGRATION] sessions.code 전체 고유 인덱스 제거: %s", name)
+    await _create_index(conn, "idx_session_code_active", "sessions", "active_code", unique=True)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial_tables", _initial_tables),
+    Migration(2, "session_problem_columns", _session_problem_columns),
+    Migration(3, "problem_detail_columns", _problem_detail_columns),
+    Migration(4, "base_indexes", _base_indexes),
+    Migration(5, "session_code_reuse", _session_code_reuse),
+    Migration(6, "mysql_active_code", _mysql_active_code),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+async def current_version(engine: AsyncEngine) -> int:
+    """적용된 최신 마이그레이션 번호 (버전 테이블이 없으면 0)"""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(func.max(schema_version.c.version)))
+            return result.scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+@asynccontextmanager
+async def _locked_transaction(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """다른 워커의 마이그레이션이 끝날 때까지 기다린 뒤 트랜잭션 시작"""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        # pysqlite는 DDL 앞에 BEGIN을 보내지 않으므로 직접 BEGIN IMMEDIATE (쓰기 잠금, busy_timeout만큼 대기)
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                await conn.exec_driver_sql("ROLLBACK")
+                raise
+            await conn.exec_driver_sql("COMMIT")
+        return
+
+    async with engine.begin() as conn:
+        if dialect == "postgresql":
+            # 트랜잭션 잠금: 커밋/롤백 시 자동 해제
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            yield conn
+        elif dialect == "mysql":
+            # MySQL DDL은 암묵적으로 커밋되므로 트랜잭션이 아닌 연결 단위 잠금
+            result = await conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT}
+            )
+            if result.scalar() != 1:
+                raise RuntimeError(f"마이그레이션 잠금을 {MIGRATION_LOCK_TIMEOUT}초 안에 얻지 못했습니다")
+            try:
+                yield conn
+            finally:
+                await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+        else:
+            yield conn
+
+
+async def migrate(engine: AsyncEngine) -> int:
+    """필요한 마이그레이션만 적용하고 적용한 개수 반환 (최신이면 쿼리 한 번)"""
+    version = await current_version(engine)
+    if version >= LATEST_VERSION:
+        logger.debug("[OK] 스키마 최신 (v%d)", version)
+        return 0
+
+    started = time.perf_counter()
+    try:
+        async with _locked_transaction(engine) as conn:
+            await conn.run_sync(_metadata.create_all)
+            # 잠금을 기다리는 동안 다른 워커가 적용했을 수 있으므로 다시 확인
+            version = (await conn.execute(select(func.max(schema_version.c.version)))).scalar() or 0
+            pending = [m for m in MIGRATIONS if m.version > version]
+            for migration in pending:
+                await migration.apply(conn)
+                await conn.execute(schema_version.insert().values(version=migration.version, name=migration.name))
+                logger.info("[MIGRATION] v%d %s 적용", migration.version, migration.name)
+    except IntegrityError:
+        # 잠금을 지원하지 않는 DB에서 다른 워커가 같은 번호를 먼저 기록한 경우
+        if await current_version(engine) < LATEST_VERSION:
+            raise
+        logger.info("[OK] 다른 워커가 스키마를 v%d로 올렸습니다", LATEST_VERSION)
+        return 0
+    if not pending:
+        logger.debug("[OK] 다른 워커가 스키마를 v%d로 올렸습니다", version)
+        return 0
+
+    logger.info(
+        "[OK] 스키마 v%d → v%d (%d개, %.0fms)",
+        version, LATEST_VERSION, len(pending), (time.perf_counter() - started) * 1000
+    )
+    return len(pending)
@@ -1,8 +1,27 @@
 from sqlalchemy import Column, String, Integer, Boolean, Text, ForeignKey, TIMESTAMP, CHAR, JSON
 from sqlalchemy.sql import func
+from datetime import datetime, timedelta
 import uuid
 from .database import Base
 
+_last_message_time = datetime.min
+
+def message_timestamp() -> datetime:
+    """
+    메시지 created_at (앱 시계 UTC, 마이크로초)
+    
+    즉시 저장과 지연 저장(message_writer)이 같은 시계를 써야 before/since 커서와
+    메시지 버퍼 병합에서 두 경로의 순서가 어긋나지 않습니다. DB server_default는
+    DB 서버 시계(MySQL은 세션 시간대, 초 단위)라 섞이면 경계에서 순서가 바뀝니다.
+    프로세스 안에서는 시계가 뒤로 가도(NTP 보정) 값이 줄지 않습니다.
+    """
+    global _last_message_time
+    now = datetime.utcnow()
+    if now <= _last_message_time:
+        now = _last_message_time + timedelta(microseconds=1)
+    _last_message_time = now
+    return now
+
 class School(Base):
     __tablename__ = "schools"
     
@@ -24,7 +43,7 @@ class Session(Base):
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     class_id = Column(String(36), ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
-    code = Column(CHAR(6), nullable=False, unique=True)  # 알파벳1 + 숫자5
+    code = Column(CHAR(6), nullable=False)  # 알파벳1 + 숫자5, 활성 세션끼리만 고유 (idx_session_code_active, MySQL은 active_code 생성 컬럼)
     problems = Column(JSON, nullable=True)  # 세션에 사용할 문제 3개
     student_names = Column(JSON, nullable=True)  # 학생 명단 (검증용)
     started_at = Column(TIMESTAMP, server_default=func.now())
@@ -41,6 +60,12 @@ class Problem(Base):
     type = Column(String(20), nullable=False)  # vocabulary, proverb, math
     difficulty = Column(Integer, nullable=False)  # 1-5
     grade = Column(String(10), nullable=False)
+    hint = Column(Text, nullable=True)
+    word = Column(Text, nullable=True)  # vocabulary 전용
+    meaning = Column(Text, nullable=True)
+    example = Column(Text, nullable=True)
+    example_ko = Column(Text, nullable=True)
+    content_hash = Column(CHAR(64), nullable=True)  # 중복 가져오기 방지 (import_problems)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 class Message(Base):
@@ -51,7 +76,8 @@ class Message(Base):
     nickname = Column(String(20), nullable=False)
     avatar_id = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    # ORM으로 넣는 행도 앱 시계 사용 (server_default는 SQL로 직접 넣는 경우만)
+    created_at = Column(TIMESTAMP, default=message_timestamp, server_default=func.now())
     moderated = Column(Boolean, default=False)
 
 class Log(Base):
@@ -0,0 +1,280 @@
+"""
+메모리 문제 은행
+
+시작 시 problems 테이블의 선택용 컬럼(id, grade, type, difficulty)만 읽어
+(grade, type, difficulty) 조합별 ID 목록으로 색인합니다. 조건에 맞는 랜덤 선택이
+메모리에서 끝나므로 문제 요청마다 ORDER BY random() 쿼리를 실행하지 않아도 됩니다.
+
+- 문제 본문/정답은 선택된 ID로 기본 키 조회 (최근 조회한 문제는 LRU 캐시)
+- UUID 형식 ID는 16바이트로 묶어 보관 (100만 행 기준 워커당 약 20MB)
+- 조건을 생략한 필터(학년 전체 등)는 해당하는 조합 목록을 크기 비례로 골라 선택
+
+갱신 시점:
+- 이 프로세스에서 Problem 행을 추가/수정/삭제해 커밋하면 다음 요청 시 재로드
+- bump()로 버전을 올리면 다음 요청 시 재로드
+- 다른 프로세스(시드 스크립트 등)의 변경은 PROBLEM_BANK_CHECK_INTERVAL초마다
+  행 수와 최근 생성 시각을 비교해 감지
+
+환경변수:
+    PROBLEM_BANK_CHECK_INTERVAL: 외부 변경 확인 주기(초, 기본값 60, 0이면 확인 안 함)
+    PROBLEM_BANK_CACHE_SIZE: 본문/정답을 보관할 최근 문제 수 (기본값 2048)
+"""
+
+import asyncio
+import os
+import random
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+from .models import Problem as ProblemModel
+from .utils.text import compile_answers
+from .log import get_logger
+
+logger = get_logger("problem_bank")
+
+# (grade, type, difficulty) - None은 해당 조건 없음(전체)
+IndexKey = Tuple[Optional[str], Optional[str], Optional[int]]
+
+LOAD_BATCH = 10000
+
+
+def _matches(key: IndexKey, group_key: IndexKey) -> bool:
+    return all(want is None or want == have for want, have in zip(key, group_key))
+
+
+def _uuid_str(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _uuid_bytes(problem_id: str) -> Optional[bytes]:
+    """표준 형식(소문자, 하이픈 포함) UUID면 16바이트, 아니면 None (uuid.UUID보다 빠름)"""
+    if len(problem_id) != 36:
+        return None
+    try:
+        raw = bytes.fromhex(problem_id.replace("-", ""))
+    except ValueError:
+        return None
+    return raw if _uuid_str(raw) == problem_id else None
+
+
+class _IdGroup:
+    """한 (grade, type, difficulty) 조합의 문제 ID 목록
+
+    표준 UUID 문자열은 16바이트로 묶어 bytearray에 두고 (문자열 객체 + 리스트 포인터보다 약 6배 작음),
+    그 밖의 ID(샘플/가져오기 ID 등)만 문자열 목록으로 보관합니다.
+    """
+
+    __slots__ = ("packed", "others")
+
+    def __init__(self):
+        self.packed = bytearray()
+        self.others: List[str] = []
+
+    def add(self, problem_id: str):
+        raw = _uuid_bytes(problem_id)
+        if raw is not None:
+            self.packed += raw
+        else:
+            self.others.append(problem_id)
+
+    def __len__(self) -> int:
+        return len(self.packed) // 16 + len(self.others)
+
+    def __getitem__(self, position: int) -> str:
+        packed_count = len(self.packed) // 16
+        if position < packed_count:
+            return _uuid_str(self.packed[position * 16:position * 16 + 16])
+        return self.others[position - packed_count]
+
+
+class ProblemBank:
+    """(grade, type, difficulty) 색인 문제 은행"""
+
+    def __init__(self, check_interval: float = 60.0, cache_size: int = 2048):
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self._groups: Dict[IndexKey, _IdGroup] = {}
+        self._count = 0
+        # 필터 → (해당 조합 목록, 누적 크기), 재로드 시 비움
+        self._filters: Dict[IndexKey, Tuple[List[_IdGroup], List[int]]] = {}
+        # ID → 응답/정답 확인용 문제 (LRU)
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        # 변경 감지: version이 loaded_version보다 크면 재로드 필요
+        self.version = 0
+        self.loaded_version = -1
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+        self.db_reads = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_version >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def bump(self):
+        """문제 데이터 변경 알림 (다음 요청 시 재로드)"""
+        self.version += 1
+
+    async def _read_fingerprint(self, db: AsyncSession) -> tuple:
+        result = await db.execute(
+            select(func.count(ProblemModel.id), func.max(ProblemModel.created_at))
+        )
+        return tuple(result.one())
+
+    async def load(self, db: AsyncSession):
+        """problems 테이블의 선택용 컬럼을 배치로 읽어 색인 재구성"""
+        version = self.version
+        fingerprint = await self._read_fingerprint(db)
+        result = await db.stream(
+            select(ProblemModel.id, ProblemModel.grade, ProblemModel.type, ProblemModel.difficulty)
+            .execution_options(yield_per=LOAD_BATCH)
+        )
+
+        groups: Dict[IndexKey, _IdGroup] = {}
+        count = 0
+        async for rows in result.partitions():
+            for problem_id, grade, type, difficulty in rows:
+                group = groups.get((grade, type, difficulty))
+                if group is None:
+                    group = groups[(grade, type, difficulty)] = _IdGroup()
+                group.add(str(problem_id))
+                count += 1
+
+        # 완성된 색인으로 한 번에 교체
+        self._groups = groups
+        self._count = count
+        self._filters = {}
+        self._cache.clear()
+        self._fingerprint = fingerprint
+        self._checked_at = time.monotonic()
+        self.loaded_version = version
+        logger.info("📚 문제 은행 로드 완료: %d개 (조합 %d개)", count, len(groups))
+
+    async def ensure_fresh(self, db: AsyncSession):
+        """필요할 때만 재로드 (버전 변경 또는 외부 변경 감지)"""
+        if self.loaded and self.version == self.loaded_version:
+            if not self.check_interval or time.monotonic() - self._checked_at < self.check_interval:
+                return
+            self._checked_at = time.monotonic()
+            if await self._read_fingerprint(db) == self._fingerprint:
+                return
+            self.bump()
+
+        async with self._lock:
+            # 대기 중 다른 요청이 이미 재로드했으면 생략
+            if self.loaded and self.version == self.loaded_version:
+                return
+            await self.load(db)
+
+    def _candidates(self, key: IndexKey) -> Tuple[List[_IdGroup], List[int]]:
+        candidates = self._filters.get(key)
+        if candidates is None:
+            matched = [group for group_key, group in self._groups.items() if _matches(key, group_key)]
+            candidates = self._filters[key] = (matched, list(accumulate(len(group) for group in matched)))
+        return candidates
+
+    def pick_id(
+        self,
+        grade: Optional[str] = None,
+        type: Optional[str] = None,
+        difficulty: Optional[int] = None,
+    ) -> Optional[str]:
+        """조건에 맞는 문제 ID 하나를 랜덤 선택 (모든 문제가 같은 확률)"""
+        groups, totals = self._candidates((grade or None, type or None, difficulty or None))
+        if not totals or not totals[-1]:
+            return None
+        position = random.randrange(totals[-1])
+        index = bisect_right(totals, position)
+        return groups[index][position - (totals[index - 1] if index else 0)]
+
+    async def get(self, db: AsyncSession, problem_id: str) -> Optional[dict]:
+        """ID로 문제 조회 (캐시에 없으면 기본 키 조회)"""
+        entry = self._cache.get(problem_id)
+        if entry is not None:
+            self._cache.move_to_end(problem_id)
+            return entry
+        problem = await db.get(ProblemModel, problem_id)
+        self.db_reads += 1
+        if problem is None:
+            return None
+        entry = {
+            "id": str(problem.id),
+            "type": problem.type,
+            "question": problem.question,
+            "answer": problem.answer,
+            "difficulty": problem.difficulty,
+            "grade": problem.grade,
+            "hint": problem.hint,
+            "word": problem.word,
+            "meaning": problem.meaning,
+            "example": problem.example,
+            "example_ko": problem.example_ko,
+            # 정규화된 정답 집합 (정답 확인용, 응답에는 포함하지 않음)
+            "accepted": compile_answers(problem.answer),
+        }
+        self._cache[problem_id] = entry
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    async def pick(
+        self,
+        db: AsyncSession,
+        grade: Optional[str] = None,
+        type: Optional[str] = None,
+        difficulty: Optional[int] = None,
+    ) -> Optional[dict]:
+        """조건에 맞는 문제 하나를 랜덤 선택 (재로드 전에 삭제된 문제면 다시 선택)"""
+        for _ in range(3):
+            problem_id = self.pick_id(grade=grade, type=type, difficulty=difficulty)
+            if problem_id is None:
+                return None
+            problem = await self.get(db, problem_id)
+            if problem is not None:
+                return problem
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "problems": self._count,
+            "groups": len(self._groups),
+            "cached": len(self._cache),
+            "db_reads": self.db_reads,
+        }
+
+
+# 전역 인스턴스
+problem_bank = ProblemBank(
+    check_interval=float(os.getenv("PROBLEM_BANK_CHECK_INTERVAL", "60")),
+    cache_size=int(os.getenv("PROBLEM_BANK_CACHE_SIZE", "2048")),
+)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _detect_problem_writes(session, flush_context):
+    """Problem 행 변경 여부 기록 (커밋 후 반영)"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, ProblemModel):
+            session.info["problems_changed"] = True
+            return
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _bump_on_commit(session):
+    """Problem 변경이 커밋되면 문제 은행 버전 증가"""
+    if session.info.pop("problems_changed", False):
+        problem_bank.bump()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("problems_changed", None)
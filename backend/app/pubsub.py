@@ -0,0 +1,360 @@
+"""
+WebSocket 브로드캐스트용 Pub/Sub 백엔드
+
+uvicorn 워커가 여러 개일 때 한 워커에서 발생한 이벤트를 다른 워커의
+WebSocket에도 전달하기 위한 계층입니다. 각 워커는 자기 프로세스에 연결된
+소켓에만 전송하고, 나머지 워커에는 공유 버스를 통해 이벤트를 알립니다.
+
+환경변수:
+    BROADCAST_BACKEND: memory(기본값) | redis
+    BROADCAST_URL: redis://[:password@]host:port 또는 unix:///path/to/bus.sock
+    BROADCAST_CHANNEL: 구독 채널 이름 (기본값 classkit:broadcast)
+
+로컬 브로커 실행 (Redis 대신 사용 가능):
+    python -m app.pubsub --path /tmp/classkit-bus.sock
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import unquote, urlparse
+
+from .log import get_logger
+
+logger = get_logger("pubsub")
+
+# (session_code, message) -> 로컬 소켓 전송
+DeliverHandler = Callable[[str, dict], Awaitable[None]]
+
+DEFAULT_CHANNEL = "classkit:broadcast"
+
+
+class PubSubBackend:
+    """브로드캐스트 백엔드 기본 클래스 (프로세스 내 전용)"""
+
+    name = "memory"
+
+    async def start(self, handler: DeliverHandler):
+        """다른 워커에서 온 메시지를 handler로 전달하기 시작"""
+        self.handler = handler
+
+    async def publish(self, session_code: str, message: dict):
+        """다른 워커에 메시지 전파 (프로세스 내 백엔드는 전파할 곳이 없음)"""
+
+    async def stop(self):
+        """연결 정리"""
+
+
+InProcessBackend = PubSubBackend
+
+
+# ---------------------------------------------------------------------------
+# RESP (Redis 프로토콜) 최소 구현
+# ---------------------------------------------------------------------------
+
+class RespError(Exception):
+    """Redis 오류 응답"""
+
+
+def encode_command(*args) -> bytes:
+    """명령을 RESP 배열로 인코딩"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """RESP 응답 하나 읽기"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("pub/sub 연결이 끊어졌습니다")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RespError(f"알 수 없는 응답: {line!r}")
+
+
+async def open_connection(url: str):
+    """redis:// 또는 unix:// URL로 스트림 연결"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        reader, writer = await asyncio.open_unix_connection(parsed.path)
+    elif parsed.scheme in ("redis", "tcp"):
+        reader, writer = await asyncio.open_connection(
+            parsed.hostname or "localhost", parsed.port or 6379
+        )
+    else:
+        raise ValueError(f"지원하지 않는 BROADCAST_URL: {url}")
+
+    if parsed.password:
+        args = ["AUTH"]
+        if parsed.username:
+            args.append(unquote(parsed.username))
+        args.append(unquote(parsed.password))
+        writer.write(encode_command(*args))
+        await writer.drain()
+        await read_reply(reader)
+    return reader, writer
+
+
+class RedisBackend(PubSubBackend):
+    """Redis 프로토콜 기반 워커 간 브로드캐스트
+
+    실제 Redis 서버와 `python -m app.pubsub` 로컬 브로커 모두에 연결됩니다.
+    발행 전용 연결과 구독 전용 연결을 따로 사용합니다.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str = DEFAULT_CHANNEL, reconnect_delay: float = 1.0):
+        self.url = url
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        # 자기 자신이 발행한 메시지는 이미 로컬로 전달했으므로 무시
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.handler: Optional[DeliverHandler] = None
+        self._pub: Optional[tuple] = None
+        self._pub_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    async def start(self, handler: DeliverHandler):
+        self.handler = handler
+        self._listener = asyncio.create_task(self._listen())
+        # 첫 구독이 완료될 때까지 대기 (연결 실패 시 예외 전파)
+        subscribed = asyncio.create_task(self._subscribed.wait())
+        done, _ = await asyncio.wait(
+            [self._listener, subscribed],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if self._listener in done:
+            subscribed.cancel()
+            self._listener.result()
+
+    async def _listen(self):
+        first = True
+        while True:
+            try:
+                reader, writer = await open_connection(self.url)
+            except OSError:
+                if first:
+                    raise
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            first = False
+            try:
+                writer.write(encode_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                await read_reply(reader)
+                self._subscribed.set()
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        await self._dispatch(reply[2])
+            except asyncio.CancelledError:
+                writer.close()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError, RespError) as e:
+                logger.warning("⚠️ pub/sub 구독 연결 끊김, 재연결 시도: %s", e)
+                writer.close()
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _dispatch(self, data: bytes):
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            return
+        if envelope.get("o") == self.worker_id or self.handler is None:
+            return
+        try:
+            await self.handler(envelope["s"], envelope["m"])
+        except Exception as e:
+            logger.exception("❌ pub/sub 메시지 전달 오류: %s", e)
+
+    async def publish(self, session_code: str, message: dict):
+        data = json.dumps(
+            {"o": self.worker_id, "s": session_code, "m": message},
+            ensure_ascii=False,
+            default=str,
+        )
+        async with self._pub_lock:
+            for attempt in range(2):
+                try:
+                    if self._pub is None:
+                        self._pub = await open_connection(self.url)
+                    reader, writer = self._pub
+                    writer.write(encode_command("PUBLISH", self.channel, data))
+                    await writer.drain()
+                    await read_reply(reader)
+                    return
+                except (OSError, ConnectionError, asyncio.IncompleteReadError):
+                    self._close_pub()
+                    if attempt:
+                        raise
+
+    def _close_pub(self):
+        if self._pub is not None:
+            self._pub[1].close()
+            self._pub = None
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        self._close_pub()
+
+
+def create_backend(kind: Optional[str] = None, url: Optional[str] = None) -> PubSubBackend:
+    """환경변수 설정에 맞는 백엔드 생성"""
+    kind = (kind or os.getenv("BROADCAST_BACKEND", "memory")).lower()
+    if kind in ("memory", "inprocess", ""):
+        return InProcessBackend()
+    if kind == "redis":
+        url = url or os.getenv("BROADCAST_URL", "redis://localhost:6379")
+        return RedisBackend(url, channel=os.getenv("BROADCAST_CHANNEL", DEFAULT_CHANNEL))
+    raise ValueError(f"지원하지 않는 BROADCAST_BACKEND: {kind}")
+
+
+# ---------------------------------------------------------------------------
+# 로컬 브로커 (Redis 대체용)
+# ---------------------------------------------------------------------------
+
+class PubSubBroker:
+    """SUBSCRIBE / UNSUBSCRIBE / PUBLISH / PING만 지원하는 Redis 호환 브로커
+
+    Redis를 띄울 수 없는 단일 서버 설치나 테스트에서 Unix 소켓으로 사용합니다.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self._handle, path=path)
+        return self.server
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+        self.subscribers.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        channels: Set[str] = set()
+        try:
+            while True:
+                try:
+                    command = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR invalid command\r\n")
+                    await writer.drain()
+                    continue
+                name = command[0].decode().upper()
+                args = [arg.decode() for arg in command[1:]]
+                if name == "SUBSCRIBE":
+                    for channel in args:
+                        channels.add(channel)
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(encode_array([b"subscribe", channel, len(channels)]))
+                elif name == "UNSUBSCRIBE":
+                    for channel in args or list(channels):
+                        channels.discard(channel)
+                        self._remove(channel, writer)
+                        writer.write(encode_array([b"unsubscribe", channel, len(channels)]))
+                elif name == "PUBLISH" and len(command) == 3:
+                    writer.write(b":%d\r\n" % self._publish(args[0], command[2]))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif name == "AUTH":
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name.encode())
+                await writer.drain()
+        finally:
+            for channel in channels:
+                self._remove(channel, writer)
+            writer.close()
+
+    def _publish(self, channel: str, data: bytes) -> int:
+        writers = self.subscribers.get(channel, ())
+        frame = encode_array([b"message", channel, data])
+        for writer in list(writers):
+            if writer.is_closing():
+                self._remove(channel, writer)
+                continue
+            writer.write(frame)
+        return len(writers)
+
+    def _remove(self, channel: str, writer: asyncio.StreamWriter):
+        writers = self.subscribers.get(channel)
+        if writers is not None:
+            writers.discard(writer)
+            if not writers:
+                del self.subscribers[channel]
+
+
+def encode_array(items: List) -> bytes:
+    """브로커 푸시 메시지 인코딩 (bulk string / 정수 혼합 배열)"""
+    parts = [b"*%d\r\n" % len(items)]
+    for item in items:
+        if isinstance(item, int):
+            parts.append(b":%d\r\n" % item)
+        else:
+            if isinstance(item, str):
+                item = item.encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(item), item))
+    return b"".join(parts)
+
+
+async def run_broker(path: str):
+    broker = PubSubBroker()
+    server = await broker.start(path)
+    logger.info("📡 pub/sub 브로커 시작: unix://%s", path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ClassKit 로컬 pub/sub 브로커")
+    parser.add_argument("--path", default="/tmp/classkit-bus.sock", help="Unix 소켓 경로")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_broker(args.path))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,207 @@
+"""
+요청 속도 제한 (토큰 버킷, 부하 차단)
+
+학생 한 명의 폰이 /api/problems/check나 /api/messages를 연타하면 요청마다 DB 조회와
+50명 브로드캐스트가 일어나 같은 서버의 모든 교실이 느려집니다. 세션 코드별, 학생별
+(X-Client-Id 헤더 → IP 순) 토큰 버킷으로 초과 요청을 DB에 닿기 전에 429로 돌려보냅니다.
+
+- 버킷은 (토큰 수, 마지막 갱신 시각) 한 쌍, 요청 시점에 경과 시간만큼 채움 (O(1), 타이머 없음)
+- 학생 버킷을 먼저 확인하고, 세션 버킷에서 막히면 학생 토큰은 돌려줌
+- 429 응답에는 다음 토큰까지 남은 시간을 Retry-After(초)로 표시
+- 가득 찬 버킷은 없는 버킷과 같으므로 키가 많아지면 가득 찬 것부터 정리
+- 워커별 메모리 값이므로 워커 N개면 실제 허용량은 최대 N배
+- 학생 버킷 키에 요청 본문의 닉네임은 쓰지 않음. 제한은 정답 토큰/명단 검증보다 먼저 실행되므로,
+  닉네임으로 나누면 남의 닉네임으로 잘못된 요청을 보내 그 학생의 한도를 소진시킬 수 있고,
+  닉네임을 바꿔 가며 보내면 학생 제한을 우회해 세션 버킷(반 전체 한도)을 소진시킬 수 있음
+
+학교 와이파이는 학생 폰들이 공인 IP 하나를 공유(NAT)하므로 모바일 앱이 기기별 임의 ID를
+X-Client-Id 헤더로 보냅니다. 헤더가 없을 때만 request.client IP를 쓰며, 리버스 프록시
+뒤에서는 uvicorn --forwarded-allow-ips(FORWARDED_ALLOW_IPS)에 프록시 주소를 지정해야 합니다.
+
+환경변수 ("횟수/초", 0이면 해당 제한 끔):
+    RATE_LIMIT_ENABLED: false면 모든 제한 끔 (기본값 true)
+    RATE_LIMIT_CHECK_STUDENT: 학생별 정답 확인 (기본값 30/60)
+    RATE_LIMIT_CHECK_SESSION: 세션별 정답 확인 (기본값 600/60)
+    RATE_LIMIT_MESSAGE_STUDENT: 학생별 메시지 (기본값 10/60)
+    RATE_LIMIT_MESSAGE_SESSION: 세션별 메시지 (기본값 200/60)
+"""
+
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from .log import get_logger
+from .metrics import Counter, registry
+
+logger = get_logger("rate_limit")
+
+requests_shed = registry.register(Counter(
+    "classkit_rate_limited_total", "Requests rejected with 429 by rate limiting", ("route", "scope"),
+))
+
+
+class TokenBucketLimiter:
+    """키별 토큰 버킷 (capacity개까지 모이고 초당 rate개씩 채워짐)"""
+
+    def __init__(self, capacity: float, period: float, max_keys: int = 100000):
+        self.capacity = capacity
+        self.rate = capacity / period if period > 0 else 0.0
+        self.max_keys = max_keys
+        # key -> (남은 토큰, 마지막 갱신 시각(monotonic))
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self.allowed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_spec(cls, spec: str) -> Optional["TokenBucketLimiter"]:
+        """"횟수/초" 형식 설정 파싱 (0이나 빈 값이면 None = 제한 없음)"""
+        count, _, period = spec.partition("/")
+        count = float(count or 0)
+        if count <= 0:
+            return None
+        return cls(count, float(period or 1))
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """토큰 하나 사용, 허용이면 0, 거부면 다음 토큰까지 남은 초"""
+        now = time.monotonic() if now is None else now
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate if self.rate else math.inf
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            self._evict(now)
+        self._buckets[key] = (tokens - 1, now)
+        self.allowed += 1
+        return 0.0
+
+    def refund(self, key: str):
+        """acquire한 토큰 돌려주기 (다른 제한에 막혀 요청이 처리되지 않은 경우)"""
+        entry = self._buckets.get(key)
+        if entry is not None:
+            self._buckets[key] = (min(self.capacity, entry[0] + 1), entry[1])
+            self.allowed -= 1
+
+    def _evict(self, now: float):
+        # 다시 가득 찬 버킷은 지워도 동작이 같음
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate >= self.capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+        while len(self._buckets) >= self.max_keys:
+            self._buckets.pop(next(iter(self._buckets)))
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def student_key(client_id: Optional[str], host: Optional[str]) -> str:
+    """학생 버킷 키 (클라이언트 ID > IP)"""
+    if client_id:
+        return "c:" + client_id[:64]
+    return "ip:" + (host or "unknown")
+
+
+class RateLimit:
+    """
+    라우트 의존성: 요청 본문의 세션 코드와 X-Client-Id 헤더(없으면 IP)로 버킷 확인
+
+    FastAPI가 본문 검증을 위해 이미 파싱한 JSON(request.json() 캐시)을 읽으므로
+    추가 파싱 비용이 없습니다. 본문이 잘못됐으면 그대로 통과시켜 422 검증에 맡깁니다.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        session_field: str,
+        student: Optional[TokenBucketLimiter],
+        session: Optional[TokenBucketLimiter],
+        enabled: bool = True,
+    ):
+        self.route = route
+        self.session_field = session_field
+        self.student = student
+        self.session = session
+        self.enabled = enabled
+
+    async def __call__(self, request: Request):
+        if not self.enabled or (self.student is None and self.session is None):
+            return
+        try:
+            body = await request.json()
+        except ValueError:
+            return
+        if not isinstance(body, dict):
+            return
+        code = str(body.get(self.session_field) or "")
+        self.check(code, student_key(
+            request.headers.get("x-client-id"), request.client.host if request.client else None
+        ))
+
+    def check(self, code: str, student_key: str):
+        """버킷 확인 (초과면 429 HTTPException)"""
+        if not self.enabled:
+            return
+        student_key = f"{code}|{student_key}"
+        if self.student is not None:
+            retry_after = self.student.acquire(student_key)
+            if retry_after:
+                self._reject("student", code, retry_after)
+        if self.session is not None:
+            retry_after = self.session.acquire(code)
+            if retry_after:
+                if self.student is not None:
+                    self.student.refund(student_key)
+                self._reject("session", code, retry_after)
+
+    def _reject(self, scope: str, code: str, retry_after: float):
+        requests_shed.inc(self.route, scope)
+        logger.debug("🚦 요청 제한 (%s, %s): %s, %.1f초 후 재시도", self.route, scope, code, retry_after)
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def stats(self) -> dict:
+        return {
+            "student": self.student.stats() if self.student else None,
+            "session": self.session.stats() if self.session else None,
+        }
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# 전역 인스턴스 (라우트에서 dependencies=[Depends(...)]로 사용)
+check_rate_limit = RateLimit(
+    "check",
+    session_field="session_code",
+    student=TokenBucketLimiter.from_spec(os.getenv("RATE_LIMIT_CHECK_STUDENT", "30/60")),
+    session=TokenBucketLimiter.from_spec(os.getenv("RATE_LIMIT_CHECK_SESSION", "600/60")),
+    enabled=RATE_LIMIT_ENABLED,
+)
+message_rate_limit = RateLimit(
+    "message",
+    session_field="code",
+    student=TokenBucketLimiter.from_spec(os.getenv("RATE_LIMIT_MESSAGE_STUDENT", "10/60")),
+    session=TokenBucketLimiter.from_spec(os.getenv("RATE_LIMIT_MESSAGE_SESSION", "200/60")),
+    enabled=RATE_LIMIT_ENABLED,
+)
+
+
+def rate_limit_stats() -> dict:
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "check": check_rate_limit.stats(),
+        "message": message_rate_limit.stats(),
+    }
@@ -3,17 +3,18 @@
 GPT API를 사용하여 유머, 속담, 격려말 등을 생성합니다.
 """
 
-from fastapi import APIRouter, HTTPException
-import openai
+from fastapi import APIRouter
 import os
-from typing import Optional
+from ..speech_pool import speech_pool
+from ..log import get_logger
 
 router = APIRouter()
+logger = get_logger("conversation")
 
 # OpenAI API 키 설정
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
-    print("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. GPT 기능이 비활성화됩니다.")
+    logger.warning("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. GPT 기능이 비활성화됩니다.")
 
 @router.get("/generate-speech")
 async def generate_speech(
@@ -23,6 +24,8 @@ async def generate_speech(
     """
     자연스러운 발화 생성
     
+    GPT 발화는 백그라운드에서 미리 생성된 풀에서 꺼내므로 API 호출을 기다리지 않습니다.
+    
     Args:
         context: 발화 맥락 (classroom: 교실, break: 쉬는시간, etc.)
         category: 카테고리 (humor: 유머, proverb: 속담, encouragement: 격려)
@@ -31,45 +34,12 @@ async def generate_speech(
         생성된 발화 텍스트
     """
     
-    # OpenAI API 키가 없으면 샘플 발화 반환
-    if not OPENAI_API_KEY:
+    # 풀이 비어 있으면 (API 키 없음, 보충 중, API 오류) 샘플 발화 반환
+    generated_text = speech_pool.take(category)
+    if generated_text is None:
         return generate_sample_speech(category)
     
-    try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        # 카테고리별 프롬프트 설정 (응원과 격려 중심)
-        prompts = {
-            "humor": "초등학생들을 응원하는 따뜻하고 긍정적인 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
-            "proverb": "초등학생들을 격려하는 속담이나 따뜻한 격려의 말을 한 문장으로 생성해주세요. 30자 이내로 작성해주세요.",
-            "encouragement": "친구들을 응원하는 따뜻하고 친근한 한 문장을 생성해주세요. 30자 이내로 작성해주세요.",
-            "weather": "오늘 날씨에 대해 친구들을 응원하는 따뜻한 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
-            "quote": "친구들을 격려하는 따뜻한 한 문장을 생성해주세요. 30자 이내로 작성해주세요.",
-            "math": "공부를 하는 친구들을 응원하는 따뜻한 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
-            "study": "열심히 공부하는 친구들을 응원하는 따뜻하고 격려하는 한 문장을 생성해주세요. 30자 이내로 작성해주세요."
-        }
-        
-        prompt = prompts.get(category, prompts["humor"])
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 친구들을 응원하고 격려하는 따뜻한 초등학교 학생입니다. 항상 따뜻하고 긍정적인 말만 합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0.8
-        )
-        
-        generated_text = response.choices[0].message.content.strip()
-        
-        print(f"🤖 GPT 발화 생성: {generated_text}")
-        return {"text": generated_text, "source": "gpt"}
-        
-    except Exception as e:
-        print(f"❌ GPT API 호출 오류: {e}")
-        # 오류 시 샘플 발화 반환
-        return generate_sample_speech(category)
+    return {"text": generated_text, "source": "gpt"}
 
 
 def generate_sample_speech(category: str) -> dict:
@@ -136,7 +106,7 @@ def generate_sample_speech(category: str) -> dict:
     import random
     selected = random.choice(samples.get(category, samples["humor"]))
     
-    print(f"📝 샘플 발화 생성 ({category}): {selected}")
+    logger.debug("📝 샘플 발화 생성 (%s): %s", category, selected)
     return {"text": selected, "source": "sample"}
 
 
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
+import uuid
 from ..database import get_db
-from ..models import Message as MessageModel, Session as SessionModel
+from ..models import Message as MessageModel, Session as SessionModel, message_timestamp
 from ..websocket_manager import manager
+from ..session_cache import session_cache
+from ..message_writer import message_writer
+from ..message_buffer import get_recent_messages
+from ..message_archive import message_archive
 from ..utils.token import verify_answer_token
+from ..rate_limit import message_rate_limit
+from ..log import get_logger
+
+logger = get_logger("messages")
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
@@ -24,12 +34,16 @@ class MessageResponse(BaseModel):
     content: str
     created_at: datetime
 
-@router.post("", response_model=MessageResponse, status_code=201)
+@router.post("", response_model=MessageResponse, status_code=201, dependencies=[Depends(message_rate_limit)])
 async def create_message(
     data: MessageCreate,
     db: AsyncSession = Depends(get_db)
 ):
     """학생 메시지 생성 (정답 검증 필수)"""
+    return await publish_message(db, data)
+
+async def publish_message(db: AsyncSession, data: MessageCreate) -> MessageResponse:
+    """메시지 검증, 저장, 브로드캐스트 (REST / WebSocket 공용)"""
     
     # 정답 토큰 검증 (샘플 토큰은 허용)
     if not data.answer_token.startswith('sample-token-'):
@@ -40,37 +54,64 @@ async def create_message(
                 detail="정답을 먼저 맞혀야 메시지를 보낼 수 있습니다"
             )
     else:
-        print(f"🎮 샘플 토큰 허용: {data.answer_token}")
+        logger.debug("🎮 샘플 토큰 허용: %s", data.answer_token)
     
-    # 세션 검증
-    result = await db.execute(
-        select(SessionModel).where(
-            SessionModel.code == data.code,
-            SessionModel.ended_at.is_(None),
-            SessionModel.expires_at > datetime.now()
-        )
-    )
-    session = result.scalar_one_or_none()
+    # 세션 검증 (활성 세션 캐시)
+    session = await session_cache.get_active(db, data.code)
     
     if not session:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
     
     # 학생명단 검증 (명단이 있을 경우만)
-    if session.student_names and len(session.student_names) > 0:
-        if data.nickname not in session.student_names:
-            print(f"⚠️ 등록되지 않은 학생명: {data.nickname} (명단: {session.student_names})")
+    if session.roster:
+        if not session.is_on_roster(data.nickname):
+            logger.info("⚠️ 등록되지 않은 학생명: %s (명단 %d명)", data.nickname, len(session.roster))
             raise HTTPException(
                 status_code=403,
                 detail=f"학생명단에 등록되지 않은 이름입니다. 등록된 학생명: {', '.join(session.student_names[:5])}{'...' if len(session.student_names) > 5 else ''}"
             )
-        print(f"✅ 학생명 검증 통과: {data.nickname}")
+        logger.debug("✅ 학생명 검증 통과: %s", data.nickname)
+    
+    # 지연 저장 모드: 앱에서 ID/시각을 정하고 바로 브로드캐스트, 저장은 flusher가 담당
+    # (시각은 즉시 저장과 같은 message_timestamp, 커서/버퍼 병합 순서 일치)
+    if message_writer.enabled:
+        message_id = str(uuid.uuid4())
+        created_at = message_timestamp()
+        await message_writer.submit({
+            "id": message_id,
+            "session_id": session.id,
+            "nickname": data.nickname,
+            "avatar_id": data.avatar_id,
+            "content": data.content,
+            "created_at": created_at,
+            "moderated": False
+        })
+        await manager.broadcast(data.code, {
+            "event": "newMessage",
+            "payload": {
+                "id": message_id,
+                "nickname": data.nickname,
+                "avatar_id": data.avatar_id,
+                "content": data.content,
+                "timestamp": created_at.isoformat()
+            }
+        })
+        return MessageResponse(
+            id=message_id,
+            nickname=data.nickname,
+            avatar_id=data.avatar_id,
+            content=data.content,
+            created_at=created_at
+        )
     
     # 메시지 생성
     message = MessageModel(
         session_id=session.id,
         nickname=data.nickname,
         avatar_id=data.avatar_id,
-        content=data.content
+        content=data.content,
+        # 같은 초에 들어온 메시지도 순서가 유지되도록 앱에서 마이크로초까지 기록
+        created_at=message_timestamp()
     )
     
     db.add(message)
@@ -81,13 +122,14 @@ async def create_message(
     broadcast_message = {
         "event": "newMessage",
         "payload": {
+            "id": str(message.id),
             "nickname": message.nickname,
             "avatar_id": message.avatar_id,
             "content": message.content,
             "timestamp": message.created_at.isoformat()
         }
     }
-    print(f"📤 WebSocket 브로드캐스트: {data.code} → {message.nickname}: {message.content}")
+    logger.debug("📤 WebSocket 브로드캐스트: %s → %s: %s", data.code, message.nickname, message.content)
     await manager.broadcast(data.code, broadcast_message)
     
     return MessageResponse(
@@ -101,40 +143,40 @@ async def create_message(
 @router.get("")
 async def get_messages(
     session_code: str,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="이 메시지 ID보다 오래된 메시지"),
+    since: Optional[str] = Query(None, description="이 메시지 ID 이후의 새 메시지"),
     db: AsyncSession = Depends(get_db)
 ):
-    """세션의 최근 메시지 조회"""
+    """세션의 최근 메시지 조회 (최신순, 메시지 ID 커서 페이지네이션)"""
     
-    # 세션 찾기
+    # 세션 찾기 (종료된 세션의 코드가 재사용될 수 있으므로 가장 최근 세션)
     result = await db.execute(
-        select(SessionModel).where(SessionModel.code == session_code)
+        select(SessionModel)
+        .where(SessionModel.code == session_code)
+        .order_by(SessionModel.started_at.desc())
+        .limit(1)
     )
     session = result.scalar_one_or_none()
     
     if not session:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
     
-    # 메시지 조회 (최근순)
-    result = await db.execute(
-        select(MessageModel)
-        .where(MessageModel.session_id == session.id)
-        .order_by(MessageModel.created_at.desc())
-        .limit(limit)
+    # 보관된 세션은 보관 파일에서 조회
+    if session.ended_at is not None:
+        messages = await message_archive.get_messages(str(session.id), limit, before=before, since=since)
+        if messages is not None:
+            return {
+                "messages": messages,
+                "count": len(messages)
+            }
+    
+    # 최근 구간은 링 버퍼, 그보다 오래된 페이지만 DB 조회
+    messages = await get_recent_messages(
+        db, session_code, str(session.id), limit, before=before, since=since
     )
-    messages = result.scalars().all()
     
     return {
-        "messages": [
-            {
-                "id": str(m.id),
-                "nickname": m.nickname,
-                "avatar_id": m.avatar_id,
-                "content": m.content,
-                "created_at": m.created_at
-            }
-            for m in messages
-        ],
+        "messages": messages,
         "count": len(messages)
     }
-
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 from pydantic import BaseModel, Field
-from datetime import datetime
 import random
 from ..database import get_db
-from ..models import Problem as ProblemModel, Session as SessionModel
+from ..problem_bank import problem_bank
+from ..session_cache import session_cache
 from ..utils.token import create_answer_token
+from ..utils.text import normalize_answer
+from ..rate_limit import check_rate_limit
+from ..log import get_logger
+
+logger = get_logger("problems")
 
 router = APIRouter(prefix="/problems", tags=["problems"])
 
@@ -24,40 +28,30 @@ async def get_next_problem(
     db: AsyncSession = Depends(get_db)
 ):
     """다음 문제 조회 (세션의 문제 중 랜덤 또는 DB에서 랜덤)"""
+    return await pick_problem(db, code, grade, difficulty, type)
+
+async def pick_problem(
+    db: AsyncSession,
+    code: str = None,
+    grade: str = None,
+    difficulty: int = 3,
+    type: str = None
+) -> dict:
+    """세션 문제 또는 문제 은행에서 문제 하나 선택 (REST / WebSocket 공용)"""
     
     # 세션 코드가 있으면 세션의 문제 중 랜덤으로 반환
     if code:
-        result = await db.execute(
-            select(SessionModel).where(
-                SessionModel.code == code,
-                SessionModel.ended_at.is_(None),
-                SessionModel.expires_at > datetime.now()
-            )
-        )
-        session = result.scalar_one_or_none()
+        session = await session_cache.get_active(db, code)
         
         if session and session.problems:
             # 세션에 저장된 문제 중 랜덤으로 선택
             problem = random.choice(session.problems)
-            print(f"📚 세션 문제 반환: {problem.get('id', 'sample')}")
+            logger.debug("📚 세션 문제 반환: %s", problem.get('id', 'sample'))
             return problem
     
-    # 세션 문제가 없으면 DB에서 랜덤으로 조회 (기존 로직)
-    query = select(ProblemModel)
-    
-    # 필터링
-    if grade:
-        query = query.where(ProblemModel.grade == grade)
-    if type:
-        query = query.where(ProblemModel.type == type)
-    if difficulty:
-        query = query.where(ProblemModel.difficulty == difficulty)
-    
-    # 랜덤 정렬
-    query = query.order_by(func.random()).limit(1)
-    
-    result = await db.execute(query)
-    problem = result.scalar_one_or_none()
+    # 세션 문제가 없으면 문제 은행에서 랜덤으로 선택
+    await problem_bank.ensure_fresh(db)
+    problem = await problem_bank.pick(db, grade=grade, type=type, difficulty=difficulty)
     
     if not problem:
         raise HTTPException(
@@ -66,57 +60,51 @@ async def get_next_problem(
         )
     
     return {
-        "id": str(problem.id),
-        "type": problem.type,
-        "question": problem.question,
-        "difficulty": problem.difficulty,
-        "grade": problem.grade
+        "id": problem["id"],
+        "type": problem["type"],
+        "question": problem["question"],
+        "difficulty": problem["difficulty"],
+        "grade": problem["grade"],
+        "hint": problem["hint"],
+        "word": problem["word"],
+        "meaning": problem["meaning"],
+        "example": problem["example"],
+        "example_ko": problem["example_ko"]
     }
 
-@router.post("/check")
+@router.post("/check", dependencies=[Depends(check_rate_limit)])
 async def check_answer(
     data: ProblemCheck,
     db: AsyncSession = Depends(get_db)
 ):
     """정답 확인 및 토큰 발급"""
+    return await evaluate_answer(db, data)
+
+async def evaluate_answer(db: AsyncSession, data: ProblemCheck) -> dict:
+    """정답 확인 및 토큰 발급 (REST / WebSocket 공용)"""
     
-    correct_answer = None
+    accepted = None
     
-    # 1. 세션의 문제인지 확인
-    session_result = await db.execute(
-        select(SessionModel).where(
-            SessionModel.code == data.session_code,
-            SessionModel.ended_at.is_(None),
-            SessionModel.expires_at > datetime.now()
-        )
-    )
-    session = session_result.scalar_one_or_none()
+    # 1. 세션의 문제인지 확인 (세션 캐시에 미리 만든 problem_id -> 정답 집합 맵)
+    session = await session_cache.get_active(db, data.session_code)
     
-    if session and session.problems:
-        # 세션 문제에서 찾기
-        for problem in session.problems:
-            if problem.get('id') == data.problem_id:
-                correct_answer = problem.get('answer')
-                print(f"✅ 세션 문제 정답 체크: {data.problem_id}")
-                break
+    if session and session.answers:
+        accepted = session.answers.get(data.problem_id)
+        if accepted is not None:
+            logger.debug("✅ 세션 문제 정답 체크: %s", data.problem_id)
     
-    # 2. 세션 문제가 아니면 DB에서 조회
-    if correct_answer is None:
-        result = await db.execute(
-            select(ProblemModel).where(ProblemModel.id == data.problem_id)
-        )
-        problem = result.scalar_one_or_none()
+    # 2. 세션 문제가 아니면 문제 은행에서 조회
+    if accepted is None:
+        await problem_bank.ensure_fresh(db)
+        problem = await problem_bank.get(db, data.problem_id)
         
         if not problem:
             raise HTTPException(status_code=404, detail="문제를 찾을 수 없습니다")
         
-        correct_answer = problem.answer
-    
-    # 정답 비교 (대소문자 무시, 공백 제거)
-    user_answer = data.answer.strip().lower()
-    correct_answer_clean = correct_answer.strip().lower()
+        accepted = problem["accepted"]
     
-    is_correct = user_answer == correct_answer_clean
+    # 정답 비교 (NFKC, 공백 정리, 대소문자 무시, 복수 정답 허용)
+    is_correct = normalize_answer(data.answer) in accepted
     
     # 정답일 경우 토큰 발급
     answer_token = None
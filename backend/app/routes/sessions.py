@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
-import random
+import csv
+import io
 import string
 import os
 from ..database import get_db
 from ..models import Session as SessionModel, Class as ClassModel, School as SchoolModel
+from ..session_cache import session_cache
+from ..code_allocator import CodeSpaceExhausted, code_allocator
+from ..log import get_logger
+from ..utils.text import dedupe_names
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
+logger = get_logger("sessions")
 
 class SessionCreate(BaseModel):
     class_id: Optional[str] = None  # 없으면 자동 생성
@@ -18,6 +25,10 @@ class SessionCreate(BaseModel):
     problems: Optional[List[Dict[str, Any]]] = None  # 세션에 사용할 문제 3개
     student_names: Optional[List[str]] = None  # 학생 명단 (검증용)
 
+class RosterUpload(BaseModel):
+    student_names: List[str]
+    append: bool = False  # True면 기존 명단에 추가, False면 교체
+
 class SessionResponse(BaseModel):
     id: str
     code: str
@@ -26,17 +37,8 @@ class SessionResponse(BaseModel):
     expires_at: datetime
     qr_url: str
 
-def generate_session_code() -> str:
-    """6자리 세션 코드 생성 (알파벳 1자리 + 숫자 5자리)"""
-    # 알파벳 1자리 (영대문자, 혼동 방지를 위해 0, O, I, 1 제외)
-    letters = 'ABCDEFGHJKLMNPQRSTUVWXYZ'
-    letter = random.choice(letters)
-    
-    # 숫자 5자리 (0, 1 제외하여 혼동 방지)
-    digits = '23456789'
-    numbers = ''.join(random.choices(digits, k=5))
-    
-    return letter + numbers
+# 랜덤 코드 할당 재시도 횟수 (다른 워커와 같은 코드를 할당한 경우)
+MAX_CODE_ATTEMPTS = 5
 
 @router.post("", response_model=SessionResponse)
 async def create_session(
@@ -69,7 +71,7 @@ async def create_session(
             db.add(default_school)
             await db.commit()
             await db.refresh(default_school)
-            print("✅ Default School 자동 생성")
+            logger.info("✅ Default School 자동 생성")
         
         # 기본 클래스 생성
         class_row = ClassModel(
@@ -80,13 +82,13 @@ async def create_session(
         db.add(class_row)
         await db.commit()
         await db.refresh(class_row)
-        print("✅ Default Class 자동 생성")
+        logger.info("✅ Default Class 자동 생성")
     
     # 2️⃣ 세션 코드 생성 또는 사용
     if data.code:
         # 커스텀 세션 코드 사용 (교사 로그인)
         code = data.code
-        print(f"📌 커스텀 세션 코드 사용: {code}")
+        logger.debug("📌 커스텀 세션 코드 사용: %s", code)
         
         # 중복 체크 (활성 세션만)
         result = await db.execute(
@@ -102,20 +104,21 @@ async def create_session(
             existing_session.expires_at = datetime.now() + timedelta(hours=4)
             if data.problems:
                 existing_session.problems = data.problems
-                print(f"📚 세션 문제 업데이트: {len(data.problems)}개")
+                logger.debug("📚 세션 문제 업데이트: %d개", len(data.problems))
             if data.student_names:
                 existing_session.student_names = data.student_names
-                print(f"👥 세션 학생명단 업데이트: {len(data.student_names)}명")
+                logger.debug("👥 세션 학생명단 업데이트: %d명", len(data.student_names))
             await db.commit()
             await db.refresh(existing_session)
-            print(f"♻️ 기존 세션 재사용 (만료 시간 연장): {code}")
+            session_cache.invalidate(code)
+            logger.info("♻️ 기존 세션 재사용 (만료 시간 연장): %s", code)
             
             # 환경변수에서 도메인 가져오기 (로컬 개발 환경 자동 감지)
             domain = os.getenv('DOMAIN_URL')
             if not domain:
                 # 로컬 개발 환경: localhost 사용
                 domain = 'http://localhost:5173'
-                print(f"🏠 로컬 개발 모드: {domain}")
+                logger.debug("🏠 로컬 개발 모드: %s", domain)
             
             # QR URL: 모바일 페이지 경로 (학생용)
             mobile_url = f"{domain}/mobile/?code={existing_session.code}"
@@ -129,48 +132,54 @@ async def create_session(
                 qr_url=mobile_url
             )
     else:
-        # 랜덤 세션 코드 생성
-        max_attempts = 10
-        for _ in range(max_attempts):
-            code = generate_session_code()
-            
-            # 중복 체크
-            result = await db.execute(
-                select(SessionModel).where(
-                    SessionModel.code == code,
-                    SessionModel.ended_at.is_(None)
-                )
-            )
-            if not result.scalar_one_or_none():
-                break
-        else:
-            raise HTTPException(status_code=500, detail="세션 코드 생성 실패")
+        # 랜덤 세션 코드는 할당기에서 받음 (DB 조회 없음, 중복은 INSERT 시 고유 인덱스로 최종 확인)
+        code = None
     
     # 3️⃣ 세션 생성
     expires_at = datetime.now() + timedelta(hours=4)  # 4시간 유효
-    session = SessionModel(
-        class_id=class_row.id,
-        code=code,
-        problems=data.problems if data.problems else None,
-        student_names=data.student_names if data.student_names else None,
-        expires_at=expires_at
-    )
+    class_id = class_row.id
+    for _ in range(MAX_CODE_ATTEMPTS):
+        try:
+            session_code = code or code_allocator.allocate()
+        except CodeSpaceExhausted:
+            raise HTTPException(status_code=503, detail="사용 가능한 세션 코드가 없습니다")
+        
+        session = SessionModel(
+            class_id=class_id,
+            code=session_code,
+            problems=data.problems if data.problems else None,
+            student_names=data.student_names if data.student_names else None,
+            expires_at=expires_at
+        )
+        db.add(session)
+        try:
+            await db.commit()
+            break
+        except IntegrityError:
+            await db.rollback()
+            if code:
+                raise HTTPException(status_code=409, detail="이미 사용 중인 세션 코드입니다")
+            # 다른 워커가 이미 쓰고 있는 코드: 사용 중으로 남겨 두고 다시 할당
+            logger.debug("🔁 세션 코드 충돌, 다시 할당: %s", session_code)
+    else:
+        raise HTTPException(status_code=500, detail="세션 코드 생성 실패")
     
-    db.add(session)
-    await db.commit()
+    if code:
+        code_allocator.reserve(code)
     await db.refresh(session)
+    session_cache.invalidate(session.code)
     
     if data.problems:
-        print(f"✅ 세션 생성 완료 (문제 {len(data.problems)}개 포함): {session.code}")
+        logger.info("✅ 세션 생성 완료 (문제 %d개 포함): %s", len(data.problems), session.code)
     else:
-        print(f"✅ 세션 생성 완료: {session.code}")
+        logger.info("✅ 세션 생성 완료: %s", session.code)
     
     # 환경변수에서 도메인 가져오기 (로컬 개발 환경 자동 감지)
     domain = os.getenv('DOMAIN_URL')
     if not domain:
         # 로컬 개발 환경: localhost 사용
         domain = 'http://localhost:5173'
-        print(f"🏠 로컬 개발 모드: {domain}")
+        logger.debug("🏠 로컬 개발 모드: %s", domain)
     
     # QR URL: 모바일 페이지 경로 (학생용)
     mobile_url = f"{domain}/mobile/?code={session.code}"
@@ -188,22 +197,74 @@ async def create_session(
 async def get_session(code: str, db: AsyncSession = Depends(get_db)):
     """세션 코드 검증"""
     
+    session = await session_cache.get_active(db, code)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+    
+    return {
+        "id": session.id,
+        "code": session.code,
+        "valid": True,
+        "expires_at": session.expires_at
+    }
+
+ROSTER_HEADERS = {"name", "names", "student_name", "student_names", "nickname", "이름", "학생명", "학생 이름"}
+
+def parse_roster_text(body: str) -> List[str]:
+    """텍스트/CSV 명단 파싱 (한 줄에 한 명, CSV면 첫 번째 열, 머리글 줄은 건너뜀)"""
+    names = []
+    for i, row in enumerate(csv.reader(io.StringIO(body))):
+        if not row:
+            continue
+        name = row[0].strip()
+        if i == 0 and name.lower() in ROSTER_HEADERS:
+            continue
+        names.append(name)
+    return names
+
+@router.put("/{code}/roster")
+async def upload_roster(code: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    학생 명단 일괄 등록 (학교 전체 명단 등 대량 업로드용)
+    
+    - application/json: {"student_names": [...], "append": false}
+    - text/plain, text/csv: 한 줄에 한 명 (CSV는 첫 번째 열), ?append=true로 추가 모드
+    
+    정규화(NFKC, 공백 정리, 대소문자 무시) 기준으로 중복을 제거해 저장합니다.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            data = RosterUpload.model_validate_json(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"명단 형식 오류: {e}")
+        names, append = data.student_names, data.append
+    else:
+        body = (await request.body()).decode("utf-8-sig", errors="replace")
+        names = parse_roster_text(body)
+        append = request.query_params.get("append", "false").lower() == "true"
+    
     result = await db.execute(
         select(SessionModel).where(
             SessionModel.code == code,
-            SessionModel.ended_at.is_(None),
-            SessionModel.expires_at > datetime.now()
+            SessionModel.ended_at.is_(None)
         )
     )
     session = result.scalar_one_or_none()
-    
     if not session:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
     
+    previous = list(session.student_names or []) if append else []
+    student_names, duplicates = dedupe_names(previous + names)
+    session.student_names = student_names or None
+    await db.commit()
+    session_cache.invalidate(code)
+    logger.info("👥 학생명단 일괄 등록: %s (%d명, 중복 %d명)", code, len(student_names), duplicates)
+    
     return {
-        "id": str(session.id),
-        "code": session.code,
-        "valid": True,
-        "expires_at": session.expires_at
+        "code": code,
+        "count": len(student_names),
+        "added": len(student_names) - len(dedupe_names(previous)[0]),
+        "duplicates": duplicates
     }
-
@@ -1,44 +1,54 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..websocket_manager import manager
+from ..ws_protocol import FrameHandler
+from ..ws_codec import negotiate
+from ..log import get_logger
 
 router = APIRouter()
+logger = get_logger("websocket")
 
 @router.websocket("/ws/{session_code}")
 async def websocket_endpoint(websocket: WebSocket, session_code: str):
-    """WebSocket 연결 엔드포인트"""
+    """WebSocket 연결 엔드포인트 (요청 프레임 형식은 ws_protocol 참조)"""
     
-    # 연결
-    connected = await manager.connect(websocket, session_code)
+    # 연결 (?batch=1이면 묶음 프레임 수신)
+    # 서브프로토콜 classkit.msgpack.v1이면 compact 바이너리 프레임 (ws_codec 참조)
+    batching = websocket.query_params.get("batch", "").lower() in ("1", "true")
+    # 재연결이면 ?since=<마지막으로 받은 seq>&log=<connected의 log>로 놓친 이벤트만 받음 (event_log 참조)
+    since = websocket.query_params.get("since", "")
+    connected = await manager.connect(
+        websocket, session_code,
+        batching=batching,
+        subprotocol=negotiate(websocket.scope.get("subprotocols", [])),
+        since=int(since) if since.isdigit() else None,
+        log_id=websocket.query_params.get("log")
+    )
     
     if not connected:
         return
     
+    # 요청 속도 제한용 학생 키 (위젯은 ?client_id=로 기기별 ID 전달, 없으면 소켓별 키)
+    handler = FrameHandler(session_code, client_id=websocket.query_params.get("client_id"))
+    
     try:
-        # 메시지 수신 루프
+        # 요청 처리 루프 (소켓별로 순서대로 처리, 응답은 요청한 소켓에만 전송)
         while True:
-            data = await websocket.receive_text()
-            
-            # 클라이언트로부터 받은 메시지를 같은 세션의 모든 클라이언트에게 브로드캐스트
-            # (실제로는 여기서 데이터베이스에 저장하고 검증해야 함)
-            await manager.broadcast(session_code, {
-                "event": "echo",
-                "payload": {"message": data}
-            })
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            manager.touch(websocket, session_code)
+            if message.get("text") is not None:
+                reply = await handler.handle(message["text"])
+            else:
+                reply = handler.reject_binary()
+            if reply is not None:
+                manager.send(websocket, session_code, reply)
             
     except WebSocketDisconnect:
-        # 연결 해제
-        manager.disconnect(websocket, session_code)
-        
-        # 남은 사용자들에게 알림
-        await manager.broadcast(session_code, {
-            "event": "statsUpdate",
-            "payload": {
-                "user_count": manager.get_session_user_count(session_code)
-            }
-        })
+        # 연결 해제 후 남은 사용자들에게 알림 (하트비트 등으로 이미 정리된 소켓은 제외)
+        if manager.disconnect(websocket, session_code):
+            await manager.broadcast_user_count(session_code)
     except Exception as e:
-        print(f"WebSocket error: {e}")
-        manager.disconnect(websocket, session_code)
-
-
-
+        logger.warning("WebSocket error: %s", e)
+        if manager.disconnect(websocket, session_code):
+            await manager.broadcast_user_count(session_code)
@@ -0,0 +1,163 @@
+"""
+활성 세션 캐시 (세션 코드 기준)
+
+메시지 전송, 정답 확인, 문제 조회, 세션 검증이 모두 같은 활성 세션 조회
+쿼리를 실행하므로, 조회 결과를 TTL 동안 메모리에 보관합니다.
+
+- 세션의 expires_at이 지나면 캐시에서도 즉시 제거
+- create_session이 기존 세션을 연장/수정하면 invalidate()로 무효화
+- 다른 워커에서 수정된 내용은 최대 TTL만큼 늦게 반영됨
+- 학생 명단은 정규화된 집합(roster)으로 한 번만 변환해 두고, TTL로 다시 읽을 때
+  명단이 그대로면 이전 집합을 재사용 (명단 크기와 관계없이 O(1) 조회)
+- 세션 문제도 problem_id -> 정규화된 정답 집합(answers)으로 한 번만 변환 (정답 확인은 dict 조회 한 번)
+
+환경변수:
+    SESSION_CACHE_TTL: 캐시 유지 시간(초, 기본값 30, 0이면 비활성화)
+    SESSION_CACHE_MAX_SIZE: 최대 캐시 세션 수 (기본값 10000)
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Session as SessionModel
+from .utils.text import compile_answer_map, compile_roster, normalize_name
+
+
+@dataclass
+class CachedSession:
+    """캐시에 보관하는 세션 스냅샷 (DB 세션과 분리된 읽기 전용 값)"""
+    id: str
+    code: str
+    class_id: str
+    problems: Optional[List[Dict[str, Any]]]
+    student_names: Optional[List[str]]
+    started_at: Optional[datetime]
+    expires_at: datetime
+    # 정규화된 학생 명단 (명단이 없으면 None = 검증 안 함)
+    roster: Optional[FrozenSet[str]] = None
+    # problem_id -> 정규화된 정답 집합 (정답 + alternates)
+    answers: Optional[Dict[str, FrozenSet[str]]] = None
+
+    @classmethod
+    def from_model(cls, session: SessionModel, previous: Optional["CachedSession"] = None) -> "CachedSession":
+        student_names = session.student_names
+        if not student_names:
+            roster = None
+        elif previous is not None and previous.id == str(session.id) and previous.student_names == student_names:
+            # 명단이 바뀌지 않았으면 정규화 집합 재사용
+            roster = previous.roster
+        else:
+            roster = compile_roster(student_names)
+        problems = session.problems
+        if previous is not None and previous.id == str(session.id) and previous.problems == problems:
+            answers = previous.answers
+        else:
+            answers = compile_answer_map(problems)
+        return cls(
+            id=str(session.id),
+            code=session.code,
+            class_id=str(session.class_id),
+            problems=problems,
+            student_names=student_names,
+            started_at=session.started_at,
+            expires_at=session.expires_at,
+            roster=roster,
+            answers=answers,
+        )
+
+    def is_on_roster(self, nickname: str) -> bool:
+        """학생명단 검증 (명단이 없으면 항상 통과)"""
+        return self.roster is None or normalize_name(nickname) in self.roster
+
+
+class SessionCache:
+    """활성 세션 TTL 캐시"""
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        # code -> (세션 스냅샷, 캐시 만료 시각(monotonic))
+        self._entries: Dict[str, Tuple[CachedSession, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_active(self, db: AsyncSession, code: str) -> Optional[CachedSession]:
+        """활성 세션 조회 (캐시 우선, 없으면 DB)"""
+        entry = self._entries.get(code)
+        previous = None
+        if entry is not None:
+            cached, deadline = entry
+            if time.monotonic() < deadline and cached.expires_at > datetime.now():
+                self.hits += 1
+                return cached
+            del self._entries[code]
+            previous = cached
+
+        self.misses += 1
+        result = await db.execute(
+            select(SessionModel).where(
+                SessionModel.code == code,
+                SessionModel.ended_at.is_(None),
+                SessionModel.expires_at > datetime.now()
+            )
+        )
+        session = result.scalar_one_or_none()
+        if session is None:
+            return None
+
+        cached = CachedSession.from_model(session, previous)
+        self._store(cached)
+        return cached
+
+    def _store(self, cached: CachedSession):
+        if self.ttl <= 0:
+            return
+        if cached.code not in self._entries and len(self._entries) >= self.max_size:
+            self.purge_expired()
+            if len(self._entries) >= self.max_size:
+                # 가장 오래 전에 캐시된 항목 제거
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[cached.code] = (cached, time.monotonic() + self.ttl)
+
+    def invalidate(self, code: str):
+        """세션 캐시 무효화 (세션 수정/종료 시 호출)"""
+        if self._entries.pop(code, None) is not None:
+            self.invalidations += 1
+
+    def purge_expired(self) -> int:
+        """만료된 항목 일괄 제거"""
+        now = datetime.now()
+        deadline = time.monotonic()
+        expired = [
+            code for code, (cached, until) in self._entries.items()
+            if until <= deadline or cached.expires_at <= now
+        ]
+        for code in expired:
+            del self._entries[code]
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """히트/미스 통계"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 전역 인스턴스
+session_cache = SessionCache(
+    ttl=float(os.getenv("SESSION_CACHE_TTL", "30")),
+    max_size=int(os.getenv("SESSION_CACHE_MAX_SIZE", "10000")),
+)
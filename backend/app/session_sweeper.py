@@ -0,0 +1,168 @@
+"""
+만료 세션 정리 (백그라운드)
+
+expires_at이 지난 세션에 ended_at을 일괄 기록하고 sessionEnded 이벤트를
+브로드캐스트합니다. 이벤트를 받은 각 워커는
+
+- 세션 소켓에 sessionEnded 프레임을 보낸 뒤 연결을 닫고 (ConnectionManager)
+- 활성 세션 캐시와 메시지 버퍼에서 세션을 제거합니다.
+
+ended_at이 기록되면 부분 고유 인덱스(idx_session_code_active)에서 빠지므로
+같은 세션 코드를 다시 쓸 수 있습니다.
+
+환경변수:
+    SESSION_SWEEP_INTERVAL: 정리 주기(초, 기본값 60, 0이면 비활성화)
+    SESSION_SWEEP_BATCH: UPDATE 한 번에 종료할 세션 수 (기본값 500)
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, update
+from .database import async_session, write_engine
+from .models import Session as SessionModel
+from .session_cache import session_cache
+from .websocket_manager import SESSION_ENDED, manager
+from .log import get_logger
+from .metrics import Counter, registry
+
+logger = get_logger("session_sweeper")
+
+sessions_ended = registry.register(Counter(
+    "classkit_sessions_ended_total", "Sessions ended by the expiry sweeper",
+))
+
+
+class SessionSweeper:
+    """주기적으로 만료 세션을 종료"""
+
+    def __init__(self, interval: float = 60.0, batch_size: int = 500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.ended = 0
+        self.last_sweep_at: Optional[datetime] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ 만료 세션 정리 실패: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """만료 세션을 배치 단위로 종료하고 종료한 세션 수 반환"""
+        now = now or datetime.now()
+        returning = write_engine.dialect.update_returning
+        # 다시 조회할 때 비교할 값이므로 초 단위로 맞춤 (MySQL DATETIME은 소수 초를 저장하지 않음)
+        stamp = now if returning else now.replace(microsecond=0)
+        total = 0
+        while True:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(SessionModel.id, SessionModel.code)
+                    .where(
+                        SessionModel.ended_at.is_(None),
+                        SessionModel.expires_at <= now
+                    )
+                    .order_by(SessionModel.expires_at)
+                    .limit(self.batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                # SELECT 이후 연장되었거나 교사가 이미 종료한 세션은 건너뜀
+                statement = (
+                    update(SessionModel)
+                    .where(
+                        SessionModel.id.in_([row.id for row in rows]),
+                        SessionModel.ended_at.is_(None),
+                        SessionModel.expires_at <= now
+                    )
+                    .values(ended_at=stamp)
+                    .execution_options(synchronize_session=False)
+                )
+                if returning:
+                    ended = (await db.execute(statement.returning(SessionModel.id, SessionModel.code))).all()
+                else:
+                    await db.execute(statement)
+                    # RETURNING이 없는 DB(MySQL): 이번 UPDATE가 기록한 ended_at으로 다시 조회
+                    ended = (await db.execute(
+                        select(SessionModel.id, SessionModel.code).where(
+                            SessionModel.id.in_([row.id for row in rows]),
+                            SessionModel.ended_at == stamp
+                        )
+                    )).all()
+                await db.commit()
+
+            # 실제로 종료한 세션만 알림 (중복 sessionEnded / 캐시 무효화 / 코드 반환 방지)
+            for row in ended:
+                await end_session(row.code, str(row.id), reason="expired")
+            total += len(ended)
+            if len(rows) < self.batch_size:
+                break
+
+        self.sweeps += 1
+        self.ended += total
+        self.last_sweep_at = now
+        if total:
+            sessions_ended.inc(amount=total)
+            logger.info("⏰ 만료 세션 %d개 종료", total)
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sweeps": self.sweeps,
+            "ended": self.ended,
+            "last_sweep_at": self.last_sweep_at.isoformat() if self.last_sweep_at else None,
+        }
+
+
+async def end_session(session_code: str, session_id: str, reason: str = "expired"):
+    """세션 종료 알림 (모든 워커가 소켓을 닫고 메모리 항목을 정리)"""
+    await manager.broadcast(session_code, {
+        "event": SESSION_ENDED,
+        "payload": {
+            "session_code": session_code,
+            "session_id": session_id,
+            "reason": reason
+        }
+    })
+
+
+def on_session_event(session_code: str, message: dict):
+    """ConnectionManager 리스너: 종료된 세션의 캐시 항목 제거"""
+    if message.get("event") == SESSION_ENDED:
+        session_cache.invalidate(session_code)
+
+
+manager.add_listener(on_session_event)
+
+# 전역 인스턴스
+session_sweeper = SessionSweeper(
+    interval=float(os.getenv("SESSION_SWEEP_INTERVAL", "60")),
+    batch_size=int(os.getenv("SESSION_SWEEP_BATCH", "500")),
+)
@@ -0,0 +1,194 @@
+"""
+카테고리별 발화 미리 생성 풀
+
+/api/generate-speech가 요청마다 GPT API를 호출하면 응답이 올 때까지
+요청이 지연되므로, 카테고리마다 발화를 미리 만들어 메모리에 보관합니다.
+
+- 엔드포인트는 항상 풀에서 즉시 꺼내 응답 (API 호출을 기다리지 않음)
+- 풀이 낮은 수위 아래로 내려가면 백그라운드에서 비동기 클라이언트로 보충
+- 같은 카테고리의 보충 요청은 하나로 합쳐짐 (동시 요청 coalescing)
+- 보충 호출에는 제한 시간 적용
+- 보충이 실패하면(잘못된 키, API 장애) 카테고리별로 지수 백오프 동안 보충하지 않음
+  (낮은 수위 아래의 take()마다 제한 시간을 다 기다리는 API 호출이 새로 시작되지 않도록)
+- openai 패키지(import에 수백 ms)는 첫 보충 때 스레드에서 불러옴 (서버 시작/첫 요청을 막지 않음)
+
+환경변수:
+    OPENAI_API_KEY: 없으면 풀을 사용하지 않음 (샘플 발화)
+    OPENAI_BASE_URL: 호환 API 주소 (로컬 가짜 서버 테스트용, benchmarks/fake_openai.py)
+    SPEECH_POOL_SIZE: 카테고리별 최대 보관 수 (기본값 10)
+    SPEECH_POOL_LOW_WATER: 보충 시작 수위 (기본값 3)
+    SPEECH_REFILL_TIMEOUT: 보충 API 호출 제한 시간(초, 기본값 10)
+    SPEECH_REFILL_BACKOFF: 첫 실패 후 보충 대기 시간(초, 기본값 2, 실패가 이어질 때마다 두 배)
+    SPEECH_REFILL_BACKOFF_MAX: 보충 대기 시간 상한(초, 기본값 300)
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .log import get_logger
+
+logger = get_logger("speech_pool")
+
+MODEL = "gpt-3.5-turbo"
+
+SYSTEM_PROMPT = "당신은 친구들을 응원하고 격려하는 따뜻한 초등학교 학생입니다. 항상 따뜻하고 긍정적인 말만 합니다."
+
+# 카테고리별 프롬프트 설정 (응원과 격려 중심)
+PROMPTS = {
+    "humor": "초등학생들을 응원하는 따뜻하고 긍정적인 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
+    "proverb": "초등학생들을 격려하는 속담이나 따뜻한 격려의 말을 한 문장으로 생성해주세요. 30자 이내로 작성해주세요.",
+    "encouragement": "친구들을 응원하는 따뜻하고 친근한 한 문장을 생성해주세요. 30자 이내로 작성해주세요.",
+    "weather": "오늘 날씨에 대해 친구들을 응원하는 따뜻한 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
+    "quote": "친구들을 격려하는 따뜻한 한 문장을 생성해주세요. 30자 이내로 작성해주세요.",
+    "math": "공부를 하는 친구들을 응원하는 따뜻한 한 문장을 생성해주세요. 25자 이내로 작성해주세요.",
+    "study": "열심히 공부하는 친구들을 응원하는 따뜻하고 격려하는 한 문장을 생성해주세요. 30자 이내로 작성해주세요."
+}
+
+
+class SpeechPool:
+    """카테고리별 GPT 발화 풀"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: Optional[str] = None,
+        size: int = 10,
+        low_water: int = 3,
+        timeout: float = 10.0,
+        backoff: float = 2.0,
+        backoff_max: float = 300.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.size = size
+        self.low_water = low_water
+        self.timeout = timeout
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.pools: Dict[str, Deque[str]] = {category: deque() for category in PROMPTS}
+        self._refills: Dict[str, asyncio.Task] = {}
+        # 카테고리별 연속 실패 수, 다음 보충 가능 시각 (time.monotonic)
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._client = None
+        self.api_calls = 0
+        self.api_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    @staticmethod
+    def normalize_category(category: str) -> str:
+        return category if category in PROMPTS else "humor"
+
+    async def _get_client(self):
+        if self._client is None:
+            openai = await asyncio.to_thread(importlib.import_module, "openai")
+            if self._client is None:
+                self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+
+    async def start(self):
+        """모든 카테고리를 미리 채움 (앱 시작 시 호출, 완료를 기다리지 않음)"""
+        if not self.enabled:
+            return
+        for category in PROMPTS:
+            self.refill(category)
+
+    async def stop(self):
+        for task in list(self._refills.values()):
+            task.cancel()
+        self._refills.clear()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def take(self, category: str) -> Optional[str]:
+        """풀에서 발화 하나 꺼내기 (없으면 None), 수위가 낮으면 보충 시작"""
+        category = self.normalize_category(category)
+        pool = self.pools[category]
+        text = pool.popleft() if pool else None
+        if self.enabled and len(pool) < self.low_water:
+            self.refill(category)
+        return text
+
+    def refill(self, category: str) -> Optional[asyncio.Task]:
+        """카테고리 보충 (이미 진행 중이면 같은 태스크 반환, 백오프 중이면 None)"""
+        task = self._refills.get(category)
+        if task is None or task.done():
+            if time.monotonic() < self._retry_at.get(category, 0.0):
+                return None
+            task = asyncio.create_task(self._refill(category))
+            self._refills[category] = task
+        return task
+
+    async def _refill(self, category: str):
+        pool = self.pools[category]
+        missing = self.size - len(pool)
+        if missing <= 0:
+            return
+        try:
+            texts = await asyncio.wait_for(self._generate(category, missing), timeout=self.timeout)
+        except Exception as e:
+            self.api_errors += 1
+            failures = self._failures[category] = self._failures.get(category, 0) + 1
+            delay = min(self.backoff_max, self.backoff * 2 ** (failures - 1))
+            self._retry_at[category] = time.monotonic() + delay
+            logger.warning("❌ GPT 발화 보충 실패 (%s, %d회 연속, %.0f초 후 재시도): %s", category, failures, delay, e)
+            return
+        self._failures.pop(category, None)
+        self._retry_at.pop(category, None)
+        for text in texts:
+            if len(pool) >= self.size:
+                break
+            pool.append(text)
+        logger.debug("🤖 GPT 발화 보충 (%s): %d개, 현재 %d개", category, len(texts), len(pool))
+
+    async def _generate(self, category: str, count: int) -> List[str]:
+        self.api_calls += 1
+        client = await self._get_client()
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": PROMPTS[category]}
+            ],
+            max_tokens=50,
+            temperature=0.8,
+            n=count
+        )
+        texts = []
+        for choice in response.choices:
+            content = (choice.message.content or "").strip()
+            if content:
+                texts.append(content)
+        return texts
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pooled": {category: len(pool) for category, pool in self.pools.items()},
+            "api_calls": self.api_calls,
+            "api_errors": self.api_errors,
+            "backoff": {
+                category: round(max(0.0, retry_at - time.monotonic()), 1)
+                for category, retry_at in self._retry_at.items()
+            },
+        }
+
+
+# 전역 인스턴스
+speech_pool = SpeechPool(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=os.getenv("OPENAI_BASE_URL") or None,
+    size=int(os.getenv("SPEECH_POOL_SIZE", "10")),
+    low_water=int(os.getenv("SPEECH_POOL_LOW_WATER", "3")),
+    timeout=float(os.getenv("SPEECH_REFILL_TIMEOUT", "10")),
+    backoff=float(os.getenv("SPEECH_REFILL_BACKOFF", "2")),
+    backoff_max=float(os.getenv("SPEECH_REFILL_BACKOFF_MAX", "300")),
+)
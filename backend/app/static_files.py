@@ -0,0 +1,298 @@
+"""
+정적 파일 서빙 (위젯 / 모바일 PWA)
+
+앱 시작 시 폴더를 한 번 훑어 자산 목록(manifest)을 만들고, 요청마다 디스크를
+stat/open하지 않고 목록에서 바로 응답합니다.
+
+- 강한 ETag(sha256) + If-None-Match → 304
+- 핑거프린트 경로(style.1a2b3c4d5e.css)는 1년 immutable 캐시, 일반 경로는 no-cache(ETag 재검증)
+- 텍스트 자산(JS/CSS/HTML/JSON/SVG)은 gzip, brotli로 미리 압축 (brotli 패키지가 없으면 gzip만)
+- 작은 파일은 메모리에 보관, 큰 파일(PNG 스프라이트 등)은 디스크에서 전송
+- HTML의 src/href 참조는 핑거프린트 경로로 바꿔서 제공
+- 목록에 없는 경로는 모두 404 (../ 경로 탈출, 폴더 밖 심볼릭 링크 차단)
+- HEAD 요청은 GET과 같은 헤더(ETag, Content-Length)만 응답 (헬스 체크, CDN 확인용)
+
+정적 파일을 수정했으면 서버를 재시작해야 반영됩니다.
+
+환경변수:
+    STATIC_MEMORY_MAX_KB: 메모리에 보관할 파일 최대 크기(KB, 기본값 256)
+"""
+
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from .log import get_logger
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 사용
+    brotli = None
+
+logger = get_logger("static")
+
+FINGERPRINT_LENGTH = 10
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+}
+SKIP_DIRS = {"node_modules", "__pycache__"}
+
+_FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % FINGERPRINT_LENGTH)
+_HTML_REF = re.compile(r'(?P<attr>\b(?:src|href))="(?P<url>[^"#]+)"')
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/javascript", ".mjs")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+
+
+@dataclass
+class StaticAsset:
+    path: Path
+    size: int
+    content_type: str
+    digest: str
+    body: Optional[bytes] = None
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+    @property
+    def fingerprint(self) -> str:
+        return self.digest[:FINGERPRINT_LENGTH]
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """강한 ETag (압축 변형마다 다른 값)"""
+        tag = self.digest[:32]
+        return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+    def variant(self, accept_encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Accept-Encoding에 맞는 미리 압축된 본문 선택 (brotli > gzip > 원본)"""
+        if self.br is not None and "br" in accept_encoding:
+            return self.br, "br"
+        if self.gzip is not None and "gzip" in accept_encoding:
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0]
+    return content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+
+
+def fingerprinted_name(rel_path: str, fingerprint: str) -> str:
+    """src/style.css -> src/style.<fingerprint>.css"""
+    head, dot, ext = rel_path.rpartition(".")
+    if not dot or "/" in ext:
+        return f"{rel_path}.{fingerprint}"
+    return f"{head}.{fingerprint}.{ext}"
+
+
+def _etag_matches(header: str, asset: StaticAsset) -> bool:
+    """If-None-Match 비교 (내용이 같으면 압축 변형 ETag도 일치로 취급)"""
+    if header.strip() == "*":
+        return True
+    tag = asset.digest[:32]
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"').split("-", 1)[0] == tag:
+            return True
+    return False
+
+
+class AssetStore:
+    """폴더 하나의 자산 목록 (앱 시작 시 build, 이후 읽기 전용)"""
+
+    def __init__(self, root: Path, url_prefix: str = "/", memory_max: int = 256 * 1024):
+        self.root = root.resolve()
+        self.url_prefix = url_prefix
+        self.memory_max = memory_max
+        self.assets: Dict[str, StaticAsset] = {}
+        self.memory_bytes = 0
+        self.hits = 0
+        self.not_modified = 0
+        self._build_task: Optional[asyncio.Future] = None
+
+    def _walk(self) -> Iterable[Path]:
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                if not filename.startswith("."):
+                    yield Path(dirpath) / filename
+
+    def start(self):
+        """스레드에서 목록 생성 시작 (서버 시작을 막지 않음, 완료 전 요청은 완료를 기다림)"""
+        self._build_task = asyncio.ensure_future(asyncio.to_thread(self.build))
+
+    def build(self):
+        """폴더를 훑어 목록 생성 (해시 계산, 작은 파일 메모리 보관, 텍스트 압축)"""
+        assets: Dict[str, StaticAsset] = {}
+        memory_bytes = 0
+        for path in self._walk():
+            resolved = path.resolve()
+            if not resolved.is_file() or not resolved.is_relative_to(self.root):
+                continue
+            rel_path = path.relative_to(self.root).as_posix()
+            size = resolved.stat().st_size
+            content_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+            if is_compressible(content_type) and "charset" not in content_type:
+                content_type += "; charset=utf-8"
+
+            if size <= self.memory_max:
+                body = resolved.read_bytes()
+                asset = StaticAsset(resolved, size, content_type, hashlib.sha256(body).hexdigest(), body=body)
+                if is_compressible(content_type) and size > 256:
+                    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+                    if len(compressed) < size * 0.9:
+                        asset.gzip = compressed
+                    if brotli is not None:
+                        compressed = brotli.compress(body, quality=11)
+                        if len(compressed) < size * 0.9:
+                            asset.br = compressed
+                memory_bytes += size + len(asset.gzip or b"") + len(asset.br or b"")
+            else:
+                digest = hashlib.sha256()
+                with open(resolved, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                asset = StaticAsset(resolved, size, content_type, digest.hexdigest())
+            assets[rel_path] = asset
+
+        # HTML 안의 자산 참조를 핑거프린트 경로로 교체 (참조 대상 해시가 모두 정해진 뒤)
+        for rel_path, asset in assets.items():
+            if asset.content_type.startswith("text/html") and asset.body is not None:
+                self._rewrite_html(rel_path, asset, assets)
+
+        self.assets = assets
+        self.memory_bytes = memory_bytes
+        logger.info(
+            "📦 정적 파일 목록 생성: %s (%d개, 메모리 %.1fMB%s)",
+            self.root, len(assets), memory_bytes / 1024 / 1024, "" if brotli else ", brotli 없음"
+        )
+
+    def _rewrite_html(self, rel_path: str, asset: StaticAsset, assets: Dict[str, StaticAsset]):
+        base = rel_path.rpartition("/")[0]
+
+        def replace(match: re.Match) -> str:
+            url = match.group("url")
+            target = self._resolve_reference(url, base)
+            if target is None or target not in assets:
+                return match.group(0)
+            return f'{match.group("attr")}="{self.url_for(target, assets)}"'
+
+        html = asset.body.decode("utf-8")
+        rewritten = _HTML_REF.sub(replace, html).encode("utf-8")
+        if rewritten == asset.body:
+            return
+        asset.body = rewritten
+        asset.size = len(rewritten)
+        asset.digest = hashlib.sha256(rewritten).hexdigest()
+        asset.gzip = gzip.compress(rewritten, compresslevel=9, mtime=0)
+        asset.br = brotli.compress(rewritten, quality=11) if brotli is not None else None
+
+    def _resolve_reference(self, url: str, base: str) -> Optional[str]:
+        """HTML 참조(./src/a.js, /mobile/app.js?v=6)를 목록 키로 변환 (외부 URL이면 None)"""
+        if "://" in url or url.startswith(("//", "data:", "mailto:")):
+            return None
+        url = url.split("?", 1)[0]
+        if url.startswith(self.url_prefix):
+            path = url[len(self.url_prefix):]
+        elif url.startswith("/"):
+            path = url.lstrip("/")
+        else:
+            path = f"{base}/{url}" if base else url
+        parts = []
+        for part in path.split("/"):
+            if part in ("", "."):
+                continue
+            if part == "..":
+                if not parts:
+                    return None
+                parts.pop()
+            else:
+                parts.append(part)
+        return "/".join(parts)
+
+    def url_for(self, rel_path: str, assets: Optional[Dict[str, StaticAsset]] = None) -> str:
+        """핑거프린트가 붙은 공개 URL"""
+        asset = (assets or self.assets)[rel_path]
+        return self.url_prefix + fingerprinted_name(rel_path, asset.fingerprint)
+
+    def manifest(self) -> Dict[str, str]:
+        return {rel_path: self.url_for(rel_path) for rel_path in self.assets}
+
+    def lookup(self, rel_path: str) -> Tuple[Optional[StaticAsset], bool]:
+        """(자산, 핑거프린트 경로 여부) 반환, 목록에 없으면 (None, False)"""
+        asset = self.assets.get(rel_path)
+        if asset is not None:
+            return asset, False
+        match = _FINGERPRINTED.match(rel_path)
+        if match:
+            asset = self.assets.get(match.group("stem") + match.group("ext"))
+            if asset is not None and asset.fingerprint == match.group("hash"):
+                return asset, True
+        return None, False
+
+    async def response(self, request: Request, rel_path: str, index: Optional[str] = None) -> Response:
+        """자산 응답 (없으면 404, index가 주어지면 폴더 경로에 index 파일 사용)"""
+        if self._build_task is not None and not self._build_task.done():
+            await asyncio.shield(self._build_task)
+        asset, fingerprinted = self.lookup(rel_path)
+        if asset is None and index is not None:
+            asset, fingerprinted = self.lookup(f"{rel_path.rstrip('/')}/{index}".lstrip("/"))
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return self.serve(request, asset, fingerprinted)
+
+    def serve(self, request: Request, asset: StaticAsset, fingerprinted: bool = False) -> Response:
+        self.hits += 1
+        body, encoding = asset.variant(request.headers.get("accept-encoding", ""))
+        headers = {
+            "Content-Type": asset.content_type,
+            "ETag": asset.etag(encoding),
+            "Cache-Control": IMMUTABLE_CACHE if fingerprinted else REVALIDATE_CACHE,
+        }
+        if asset.gzip is not None or asset.br is not None:
+            headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, asset):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if body is None:
+            # HEAD면 FileResponse가 헤더만 보냄
+            return FileResponse(asset.path, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            # 본문 없이 GET과 같은 헤더 (Content-Length는 GET 본문 크기)
+            headers["Content-Length"] = str(len(body))
+            return Response(headers=headers)
+        return Response(body, headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.assets),
+            "memory_bytes": self.memory_bytes,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+        }
+
+
+STATIC_MEMORY_MAX = int(os.getenv("STATIC_MEMORY_MAX_KB", "256")) * 1024
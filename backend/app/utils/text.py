@@ -0,0 +1,65 @@
+"""입력 문자열 정규화"""
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    학생 이름 비교용 정규화
+
+    - NFKC: 한글 자모 조합 차이(NFC/NFD)와 전각 문자(Ａ, １, 전각 공백)를 통일
+    - 앞뒤 공백 제거, 연속 공백은 하나로
+    - casefold: 영문 대소문자 무시
+    """
+    name = unicodedata.normalize("NFKC", name)
+    return _WHITESPACE.sub(" ", name).strip().casefold()
+
+
+def compile_roster(names: Iterable[str]) -> FrozenSet[str]:
+    """학생 명단을 정규화된 집합으로 변환 (빈 이름 제외)"""
+    return frozenset(key for key in (normalize_name(str(name)) for name in names) if key)
+
+
+def dedupe_names(names: Iterable[str]) -> Tuple[List[str], int]:
+    """정규화 기준 중복 제거 (처음 나온 표기 유지), (이름 목록, 제거된 수) 반환"""
+    seen = set()
+    result = []
+    removed = 0
+    for name in names:
+        display = unicodedata.normalize("NFC", str(name)).strip()
+        key = normalize_name(display)
+        if not key:
+            continue
+        if key in seen:
+            removed += 1
+            continue
+        seen.add(key)
+        result.append(display)
+    return result, removed
+
+
+def normalize_answer(answer: str) -> str:
+    """정답 비교용 정규화 (normalize_name과 같은 규칙: NFKC, 공백 정리, 대소문자 무시)"""
+    return normalize_name(answer)
+
+
+def compile_answers(answer: Optional[str], alternates: Any = None) -> FrozenSet[str]:
+    """정답과 복수 정답(alternates: 문자열 또는 목록)을 정규화된 집합으로 변환"""
+    if isinstance(alternates, str):
+        alternates = [alternates]
+    candidates = [answer] + list(alternates or [])
+    return frozenset(key for key in (normalize_answer(str(c)) for c in candidates if c is not None) if key)
+
+
+def compile_answer_map(problems: Optional[List[Dict[str, Any]]]) -> Dict[str, FrozenSet[str]]:
+    """세션 문제 목록을 problem_id -> 정답 집합 맵으로 변환 (id 없는 문제는 제외)"""
+    answers: Dict[str, FrozenSet[str]] = {}
+    for problem in problems or []:
+        problem_id = problem.get("id")
+        if problem_id is None or str(problem_id) in answers:
+            continue
+        answers[str(problem_id)] = compile_answers(problem.get("answer"), problem.get("alternates"))
+    return answers
@@ -1,56 +1,124 @@
 """JWT 토큰 생성 및 검증"""
 import jwt
+import base64
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 # 실제 배포 시에는 환경 변수로 관리해야 함
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 
-def create_answer_token(problem_id: str, session_code: str) -> str:
+# 발급 형식: jwt(기본값) | compact (검증은 두 형식 모두 지원)
+TOKEN_FORMAT = os.getenv("ANSWER_TOKEN_FORMAT", "jwt").lower()
+TOKEN_TTL = timedelta(minutes=10)  # 10분 유효
+
+# compact 형식: c1.<problem_id>.<session_code>.<exp>.<signature>
+COMPACT_PREFIX = "c1."
+_SECRET_BYTES = SECRET_KEY.encode()
+
+# 검증 성공한 토큰 캐시 (토큰 다이제스트 -> (payload, 만료 시각))
+VERIFIED_CACHE_SIZE = int(os.getenv("ANSWER_TOKEN_CACHE_SIZE", "4096"))
+_verified_cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+cache_stats = {"hits": 0, "misses": 0}
+
+def _sign(message: str) -> str:
+    digest = hmac.new(_SECRET_BYTES, message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def create_answer_token(problem_id: str, session_code: str, token_format: Optional[str] = None) -> str:
     """
     정답 검증 후 발급하는 토큰
     
     Args:
         problem_id: 문제 ID
         session_code: 세션 코드
-        
+        token_format: jwt | compact (생략 시 ANSWER_TOKEN_FORMAT)
+    
     Returns:
-        JWT 토큰 문자열
+        토큰 문자열
     """
+    if (token_format or TOKEN_FORMAT) == "compact":
+        exp = int(time.time() + TOKEN_TTL.total_seconds())
+        body = f"{COMPACT_PREFIX}{problem_id}.{session_code}.{exp}"
+        return f"{body}.{_sign(body)}"
+    
     payload = {
         "problem_id": problem_id,
         "session_code": session_code,
-        "exp": datetime.utcnow() + timedelta(minutes=10),  # 10분 유효
+        "exp": datetime.utcnow() + TOKEN_TTL,
         "iat": datetime.utcnow()
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+def _decode_compact(token: str) -> Optional[dict]:
+    """compact 토큰 서명/만료 검증"""
+    try:
+        body, signature = token.rsplit(".", 1)
+        problem_id, session_code, exp = body[len(COMPACT_PREFIX):].rsplit(".", 2)
+        exp = int(exp)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(body)):
+        return None
+    if exp <= time.time():
+        return None
+    return {"problem_id": problem_id, "session_code": session_code, "exp": exp}
+
+def _decode(token: str) -> Optional[dict]:
+    """형식에 맞게 서명/만료 검증 (캐시 미사용)"""
+    if token.startswith(COMPACT_PREFIX):
+        return _decode_compact(token)
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        # 토큰 만료
+        return None
+    except jwt.InvalidTokenError:
+        # 잘못된 토큰
+        return None
+
 def verify_answer_token(token: str, session_code: str) -> Optional[dict]:
     """
     정답 토큰 검증
     
+    한 학생이 같은 토큰으로 여러 번 메시지를 보내므로, 검증에 성공한 토큰은
+    만료 시각까지 캐시하여 서명 검증을 반복하지 않습니다.
+    
     Args:
-        token: JWT 토큰
+        token: JWT 또는 compact 토큰
         session_code: 현재 세션 코드
-        
+    
     Returns:
         검증 성공 시 payload, 실패 시 None
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # 세션 코드 일치 확인
-        if payload.get("session_code") != session_code:
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+    
+    cached = _verified_cache.get(key)
+    if cached is not None and cached[1] > now:
+        _verified_cache.move_to_end(key)
+        cache_stats["hits"] += 1
+        payload = cached[0]
+    else:
+        if cached is not None:
+            del _verified_cache[key]
+        cache_stats["misses"] += 1
+        payload = _decode(token)
+        if payload is None:
             return None
-            
-        return payload
-    except jwt.ExpiredSignatureError:
-        # 토큰 만료
-        return None
-    except jwt.InvalidTokenError:
-        # 잘못된 토큰
+        
+        if VERIFIED_CACHE_SIZE > 0:
+            _verified_cache[key] = (payload, float(payload["exp"]))
+            if len(_verified_cache) > VERIFIED_CACHE_SIZE:
+                _verified_cache.popitem(last=False)
+    
+    # 세션 코드 일치 확인
+    if payload.get("session_code") != session_code:
         return None
-
-
-
+    
+    return payload
@@ -1,81 +1,512 @@
-from typing import Dict, Set
+from typing import Callable, Dict, List, Optional, Tuple
 from fastapi import WebSocket
-import json
+import os
 import asyncio
+import time
+from .pubsub import PubSubBackend, create_backend
+from .ws_codec import JSON, MSGPACK, Frame, encode, encoding_for
+from .heartbeat import HeartbeatWheel
+from .event_log import EventLog
+from .log import get_logger
+from .metrics import broadcast_fanout_duration, broadcast_recipients, ws_evictions, ws_sessions, ws_sockets
+
+logger = get_logger("websocket")
+
+# 세션 종료 이벤트와 소켓 종료 코드 (4000번대: 애플리케이션 정의)
+SESSION_ENDED = "sessionEnded"
+SESSION_ENDED_CLOSE_CODE = 4000
+
+# 송신 큐에 넣으면 앞선 프레임을 모두 보낸 뒤 소켓을 닫음
+_CLOSE = object()
+
+# 묶음 프레임 이벤트 (payload: 이벤트 목록, ?batch=1로 연결한 클라이언트만 받음)
+BATCH = "batch"
+# 하트비트 이벤트 (클라이언트는 {"type": "pong"} 등 아무 프레임으로 응답)
+PING = "ping"
+STATS_UPDATE = "statsUpdate"
+# 응답 없는 소켓을 닫을 때의 종료 코드 (1001: Going Away)
+HEARTBEAT_CLOSE_CODE = 1001
+# ?since=로 이어 받을 수 없을 때 보내는 이벤트 (클라이언트는 HTTP로 상태를 다시 불러옴)
+RESYNC = "resync"
+
+# 한 묶음 구간 안에서 마지막 값만 보내는 이벤트 (payload 키별 최신 값으로 합침)
+COALESCED_EVENTS = {"statsUpdate"}
+
+
+def encode_frame(message: dict) -> str:
+    """브로드캐스트 메시지를 JSON 텍스트 프레임으로 한 번만 직렬화"""
+    return encode(message, JSON)
+
+
+def frame_size(frame: Frame) -> int:
+    """전송되는 바이트 수 (텍스트 프레임은 UTF-8 기준)"""
+    return len(frame) if isinstance(frame, bytes) else len(frame.encode("utf-8"))
+
+
+def coalesce_events(messages: List[dict]) -> List[dict]:
+    """COALESCED_EVENTS는 마지막 위치 하나로 합침 (payload 키별 최신 값, 나머지 순서 유지)"""
+    merged: Dict[str, dict] = {}
+    last_index: Dict[str, int] = {}
+    for index, message in enumerate(messages):
+        event = message.get("event")
+        if event in COALESCED_EVENTS:
+            payload = dict(merged[event]["payload"]) if event in merged else {}
+            payload.update(message.get("payload") or {})
+            merged[event] = {**message, "payload": payload}
+            last_index[event] = index
+    if not merged:
+        return messages
+    result = []
+    for index, message in enumerate(messages):
+        event = message.get("event")
+        if event not in merged:
+            result.append(message)
+        elif last_index[event] == index:
+            result.append(merged[event])
+    return result
+
+
+class ClientConnection:
+    """소켓별 송신 큐와 writer 태스크
+    
+    브로드캐스트는 큐에 프레임을 넣기만 하고, 실제 전송은 소켓마다 하나씩 있는
+    writer 태스크가 담당합니다. 느린 소켓이 다른 소켓의 전송을 막지 않습니다.
+    """
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        session_code: str,
+        manager: "ConnectionManager",
+        batching: bool = False,
+        encoding: str = JSON
+    ):
+        self.websocket = websocket
+        self.session_code = session_code
+        self.manager = manager
+        # True면 묶음 구간의 이벤트 여러 개를 batch 프레임 하나로 받음
+        self.batching = batching
+        # 전송 형식 (json: 텍스트 프레임, msgpack: 바이너리 프레임, ws_codec 참조)
+        self.encoding = encoding
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=manager.send_queue_size)
+        self.close_code = 1000
+        # 재연결 때 다시 보낸 마지막 seq (다음 묶음에서 이 seq까지는 건너뜀)
+        self.replayed_seq: Optional[int] = None
+        self.task = asyncio.create_task(self._writer())
+    
+    def enqueue(self, frame: Frame) -> bool:
+        """프레임을 송신 큐에 추가 (큐가 가득 차면 False)"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    def finish(self, code: int = 1000):
+        """대기 중인 프레임을 보낸 뒤 소켓 닫기 (큐가 가득 차면 바로 닫음)"""
+        self.close_code = code
+        try:
+            self.queue.put_nowait(_CLOSE)
+        except asyncio.QueueFull:
+            asyncio.create_task(self.close(code=code))
+    
+    async def _writer(self):
+        while True:
+            frame = await self.queue.get()
+            if frame is _CLOSE:
+                await self.close(code=self.close_code)
+                return
+            try:
+                send = self.websocket.send_bytes if isinstance(frame, bytes) else self.websocket.send_text
+                await asyncio.wait_for(send(frame), timeout=self.manager.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                self.manager.evict(self, "send timeout")
+                return
+            except Exception as e:
+                self.manager.evict(self, f"send error: {e}")
+                return
+    
+    async def close(self, code: int = 1000):
+        """writer 종료 후 소켓 닫기"""
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.manager.send_timeout)
+        except Exception:
+            pass
+
 
 class ConnectionManager:
-    """WebSocket 연결 관리"""
+    """WebSocket 연결 관리
+    
+    active_connections는 이 프로세스(워커)에 연결된 소켓만 보관합니다.
+    다른 워커의 소켓에는 pub/sub 백엔드를 통해 전달됩니다.
+    
+    환경변수:
+        WS_SEND_QUEUE_SIZE: 소켓별 송신 대기 프레임 수 (기본값 256, 초과 시 연결 해제)
+        WS_SEND_TIMEOUT: 프레임 하나의 전송 제한 시간(초, 기본값 5, 초과 시 연결 해제)
+        WS_BATCH_WINDOW_MS: 세션별 이벤트 묶음 구간(ms, 기본값 25, 0이면 바로 전송)
+        WS_HEARTBEAT_INTERVAL: 조용한 소켓에 ping을 보내는 주기(초, 기본값 25, 0이면 비활성화)
+        WS_HEARTBEAT_TIMEOUT: ping 후 응답을 기다리는 시간(초, 기본값 20, 초과 시 연결 해제)
+        WS_EVENT_LOG_SIZE, WS_EVENT_LOG_MAX_SESSIONS: 재연결용 세션 이벤트 로그 (event_log.py 참조)
     
-    def __init__(self):
-        # session_code -> Set[WebSocket]
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+    묶음 구간 동안 세션 이벤트를 모아 statsUpdate는 최신 값 하나로 합친 뒤 한 번에
+    전송합니다. ?batch=1로 연결한 클라이언트는 모인 이벤트를 batch 프레임 하나로,
+    나머지 클라이언트는 예전처럼 이벤트마다 프레임 하나씩 받습니다.
+    """
+    
+    def __init__(self, backend: Optional[PubSubBackend] = None):
+        # session_code -> {WebSocket: ClientConnection}
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
         self.max_connections_per_session = 50
+        self.send_queue_size = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.send_timeout = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+        self.batch_window = float(os.getenv("WS_BATCH_WINDOW_MS", "25")) / 1000
+        self.evicted_count = 0
+        # session_code -> 묶음 구간 동안 모인 이벤트
+        self._pending: Dict[str, List[dict]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self.events_in = 0
+        self.events_coalesced = 0
+        self.frames_out = 0
+        # 전송 형식별 보낸 바이트 (permessage-deflate 압축 전 크기)
+        self.bytes_out: Dict[str, int] = {}
+        self.backend = backend if backend is not None else create_backend()
+        # 반쯤 열린 소켓 정리 (heartbeat.py 참조)
+        self.heartbeat = HeartbeatWheel(
+            interval=float(os.getenv("WS_HEARTBEAT_INTERVAL", "25")),
+            timeout=float(os.getenv("WS_HEARTBEAT_TIMEOUT", "20")),
+        )
+        # 세션 이벤트 seq와 재연결 시 다시 보낼 최근 이벤트 (event_log.py 참조)
+        self.event_log = EventLog(
+            capacity=int(os.getenv("WS_EVENT_LOG_SIZE", "200")),
+            max_sessions=int(os.getenv("WS_EVENT_LOG_MAX_SESSIONS", "1000")),
+        )
+        self._ping_frames = {encoding: encode({"event": PING}, encoding) for encoding in (JSON, MSGPACK)}
+        # (session_code, message) -> None, 로컬/원격 모든 이벤트를 받음
+        self.listeners: List[Callable[[str, dict], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        """세션 이벤트 리스너 등록 (소켓 유무와 관계없이 모든 브로드캐스트 전달)"""
+        self.listeners.append(listener)
+    
+    async def start(self):
+        """pub/sub 백엔드 구독 시작 (앱 시작 시 호출)"""
+        await self.backend.start(self.deliver_local)
+        self.heartbeat.start(self._heartbeat_sweep)
     
-    async def connect(self, websocket: WebSocket, session_code: str) -> bool:
-        """WebSocket 연결"""
-        await websocket.accept()
+    async def stop(self):
+        """pub/sub 백엔드 연결 및 writer 태스크 정리 (앱 종료 시 호출)"""
+        await self.backend.stop()
+        await self.heartbeat.stop()
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        self._pending.clear()
+        for connections in list(self.active_connections.values()):
+            for client in list(connections.values()):
+                client.task.cancel()
+        self.active_connections.clear()
+    
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_code: str,
+        batching: bool = False,
+        subprotocol: Optional[str] = None,
+        since: Optional[int] = None,
+        log_id: Optional[str] = None
+    ) -> bool:
+        """WebSocket 연결 (batching=True면 batch 프레임 수신, subprotocol로 전송 형식 결정)
+        
+        since가 있으면 log_id 로그에서 since 이후 놓친 이벤트를 batch 프레임 하나로 다시 보내고,
+        이어 받을 수 없으면 resync 이벤트를 보냅니다.
+        """
+        await websocket.accept(subprotocol=subprotocol)
+        encoding = encoding_for(subprotocol)
         
         # 세션이 없으면 생성
         if session_code not in self.active_connections:
-            self.active_connections[session_code] = set()
+            self.active_connections[session_code] = {}
         
         # 연결 수 제한 체크
         if len(self.active_connections[session_code]) >= self.max_connections_per_session:
-            await websocket.send_json({
+            await self._send_now(websocket, {
                 "error": "SESSION_FULL",
                 "message": "세션이 가득 찼습니다 (최대 50명)"
-            })
+            }, encoding)
             await websocket.close()
+            if not self.active_connections[session_code]:
+                del self.active_connections[session_code]
             return False
         
+        # 연결 성공 메시지 (writer 태스크 시작 전 직접 전송)
+        payload = {
+            "session_code": session_code,
+            "user_count": len(self.active_connections[session_code]) + 1,
+            "batching": batching and self.batch_window > 0
+        }
+        if self.event_log.enabled:
+            log = self.event_log.get(session_code)
+            payload.update({"log": log.log_id, "seq": log.seq})
+        await self._send_now(websocket, {"event": "connected", "payload": payload}, encoding)
+        
         # 연결 추가
-        self.active_connections[session_code].add(websocket)
+        client = ClientConnection(websocket, session_code, self, batching=batching, encoding=encoding)
+        self.active_connections[session_code][websocket] = client
+        self.heartbeat.add(client, asyncio.get_running_loop().time())
         
-        # 연결 성공 메시지
-        await websocket.send_json({
-            "event": "connected",
-            "payload": {
-                "session_code": session_code,
-                "user_count": len(self.active_connections[session_code])
-            }
-        })
+        if since is not None and self.event_log.enabled:
+            self._resume(client, log_id, since)
         
         return True
     
-    def disconnect(self, websocket: WebSocket, session_code: str):
-        """WebSocket 연결 해제"""
+    def _resume(self, client: ClientConnection, log_id: Optional[str], since: int):
+        """놓친 이벤트를 batch 프레임 하나로 송신 큐 맨 앞에 넣음 (이어 받을 수 없으면 resync)"""
+        session_code = client.session_code
+        log = self.event_log.get(session_code)
+        events = self.event_log.replay(session_code, log_id, since)
+        if events is None:
+            message = {"event": RESYNC, "payload": {"log": log.log_id, "seq": log.seq}}
+        elif events:
+            message = {"event": BATCH, "payload": coalesce_events(events)}
+        else:
+            return
+        # 아직 묶음 구간에 남아 있는 이벤트도 로그에는 있으므로 다음 전송에서 중복되지 않게 표시
+        client.replayed_seq = log.seq
+        frame = encode(message, client.encoding)
+        if not client.enqueue(frame):
+            self.evict(client, "send queue full")
+            return
+        self._count_out(client.encoding, frame_size(frame))
+    
+    async def _send_now(self, websocket: WebSocket, message: dict, encoding: str):
+        """송신 큐 없이 바로 전송 (연결 직후 안내 메시지)"""
+        frame = encode(message, encoding)
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+    
+    def disconnect(self, websocket: WebSocket, session_code: str) -> bool:
+        """WebSocket 연결 해제 (목록에 있었으면 True)"""
+        client = None
         if session_code in self.active_connections:
-            self.active_connections[session_code].discard(websocket)
+            client = self.active_connections[session_code].pop(websocket, None)
+            if client is not None:
+                client.task.cancel()
+                self.heartbeat.remove(client)
             
             # 세션에 아무도 없으면 삭제
             if not self.active_connections[session_code]:
                 del self.active_connections[session_code]
+        return client is not None
     
-    async def broadcast(self, session_code: str, message: dict):
-        """특정 세션의 모든 클라이언트에게 메시지 전송"""
-        if session_code not in self.active_connections:
+    def touch(self, websocket: WebSocket, session_code: str):
+        """클라이언트 프레임 수신 기록 (하트비트 응답으로 간주)"""
+        client = self.active_connections.get(session_code, {}).get(websocket)
+        if client is not None:
+            client.last_seen = asyncio.get_running_loop().time()
+    
+    def send(self, websocket: WebSocket, session_code: str, message: dict) -> bool:
+        """소켓 하나에만 메시지 전송 (브로드캐스트와 같은 송신 큐라서 순서 유지)"""
+        client = self.active_connections.get(session_code, {}).get(websocket)
+        if client is None:
+            return False
+        frame = encode(message, client.encoding)
+        if not client.enqueue(frame):
+            self.evict(client, "send queue full")
+            return False
+        self._count_out(client.encoding, frame_size(frame))
+        return True
+    
+    def evict(self, client: ClientConnection, reason: str):
+        """느리거나 끊어진 소켓 제거"""
+        connections = self.active_connections.get(client.session_code)
+        if connections is None or connections.get(client.websocket) is not client:
             return
+        self.disconnect(client.websocket, client.session_code)
+        self.evicted_count += 1
+        ws_evictions.inc(reason.split(":", 1)[0])
+        logger.warning("⚠️ WebSocket 연결 해제 (%s): %s", client.session_code, reason)
+        # 1013: Try Again Later
+        asyncio.create_task(client.close(code=1013))
+        asyncio.create_task(self.broadcast_user_count(client.session_code))
+    
+    async def broadcast_user_count(self, session_code: str):
+        """세션 인원 변경 알림"""
+        await self.broadcast(session_code, {
+            "event": STATS_UPDATE,
+            "payload": {
+                "user_count": self.get_session_user_count(session_code)
+            }
+        })
+    
+    async def _heartbeat_sweep(self, to_ping: List[ClientConnection], dead: List[ClientConnection]):
+        """하트비트 tick 처리: ping 전송, 응답 없는 소켓 정리 후 세션별 인원 알림 한 번"""
+        for client in to_ping:
+            frame = self._ping_frames[client.encoding]
+            if client.enqueue(frame):
+                self._count_out(client.encoding, len(frame))
+            else:
+                dead.append(client)
+        
+        affected = set()
+        reaped = 0
+        for client in dead:
+            if not self.disconnect(client.websocket, client.session_code):
+                continue
+            asyncio.create_task(client.close(code=HEARTBEAT_CLOSE_CODE))
+            affected.add(client.session_code)
+            reaped += 1
+        if not reaped:
+            return
+        
+        self.evicted_count += reaped
+        ws_evictions.inc("heartbeat timeout", amount=reaped)
+        logger.info("💔 응답 없는 WebSocket %d개 정리 (세션 %d개)", reaped, len(affected))
+        for session_code in affected:
+            await self.broadcast_user_count(session_code)
+    
+    async def broadcast(self, session_code: str, message: dict):
+        """특정 세션의 모든 클라이언트에게 메시지 전송 (모든 워커)"""
+        await self.deliver_local(session_code, message)
+        
+        try:
+            await self.backend.publish(session_code, message)
+        except Exception as e:
+            # 버스 장애가 API 요청 실패로 이어지지 않도록 로컬 전송만 유지
+            logger.warning("⚠️ pub/sub 발행 실패 (%s): %s", self.backend.name, e)
+    
+    async def deliver_local(self, session_code: str, message: dict):
+        """이 워커에 연결된 세션 소켓에만 메시지 전송 (큐에 넣고 즉시 반환)"""
+        # 소켓이 없어도 기록 (모두 끊긴 동안의 이벤트가 재연결 때 필요)
+        message = self.event_log.append(session_code, message)
+        if message.get("event") == SESSION_ENDED:
+            self.event_log.drop(session_code)
         
-        # 비동기 병렬 전송
-        tasks = []
-        for websocket in self.active_connections[session_code].copy():
+        for listener in self.listeners:
             try:
-                tasks.append(websocket.send_json(message))
-            except Exception:
-                # 연결이 끊어진 소켓은 제거
-                self.active_connections[session_code].discard(websocket)
+                listener(session_code, message)
+            except Exception as e:
+                logger.exception("❌ 이벤트 리스너 오류: %s", e)
+        
+        if not self.active_connections.get(session_code):
+            return
+        
+        self.events_in += 1
+        if self.batch_window <= 0:
+            self._fanout(session_code, [message])
+            return
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        # 묶음 구간 시작 (첫 이벤트에서 타이머 등록, 세션 종료는 기다리지 않고 바로 전송)
+        pending = self._pending.get(session_code)
+        if pending is None:
+            pending = self._pending[session_code] = []
+            self._flush_handles[session_code] = asyncio.get_running_loop().call_later(
+                self.batch_window, self.flush, session_code
+            )
+        pending.append(message)
+        if message.get("event") == SESSION_ENDED:
+            self.flush(session_code)
+    
+    def flush(self, session_code: str):
+        """모인 이벤트를 합쳐서 세션 소켓에 전송"""
+        handle = self._flush_handles.pop(session_code, None)
+        if handle is not None:
+            handle.cancel()
+        messages = self._pending.pop(session_code, None)
+        if not messages:
+            return
+        coalesced = coalesce_events(messages)
+        self.events_coalesced += len(messages) - len(coalesced)
+        self._fanout(session_code, coalesced)
+    
+    def _fanout(self, session_code: str, messages: List[dict]):
+        connections = self.active_connections.get(session_code)
+        if not connections:
+            return
+        
+        # 전송 형식별로 한 번만 직렬화해서 모든 소켓에 같은 프레임 전달
+        started = time.perf_counter()
+        encoded: Dict[tuple, List[Tuple[Frame, int]]] = {}
+        recipients = list(connections.values())
+        for client in recipients:
+            client_messages = messages
+            if client.replayed_seq is not None:
+                # 재연결 때 이미 다시 보낸 이벤트는 제외
+                client_messages = [m for m in messages if m.get("seq", 0) > client.replayed_seq]
+                client.replayed_seq = None
+            if len(client_messages) < len(messages):
+                # 이 소켓만 따로 직렬화
+                client_frames = self._encode_frames(client_messages, client)
+            else:
+                key = (client.encoding, client.batching and len(messages) > 1)
+                client_frames = encoded.get(key)
+                if client_frames is None:
+                    client_frames = encoded[key] = self._encode_frames(messages, client)
+            for frame, size in client_frames:
+                if not client.enqueue(frame):
+                    self.evict(client, "send queue full")
+                    break
+                self._count_out(client.encoding, size)
+        broadcast_fanout_duration.observe(time.perf_counter() - started)
+        broadcast_recipients.observe(len(recipients))
+        
+        if any(message.get("event") == SESSION_ENDED for message in messages):
+            self.close_session(session_code)
+    
+    def _encode_frames(self, messages: List[dict], client: ClientConnection) -> List[Tuple[Frame, int]]:
+        """클라이언트 형식의 프레임 목록 (batching 클라이언트는 이벤트가 여럿이면 batch 프레임 하나)"""
+        if not messages:
+            return []
+        if client.batching and len(messages) > 1:
+            frames = [encode({"event": BATCH, "payload": messages}, client.encoding)]
+        else:
+            frames = [encode(message, client.encoding) for message in messages]
+        return [(frame, frame_size(frame)) for frame in frames]
+    
+    def close_session(self, session_code: str, code: int = SESSION_ENDED_CLOSE_CODE) -> int:
+        """세션의 모든 소켓을 (이미 큐에 있는 프레임 전송 후) 닫고 목록에서 제거"""
+        connections = self.active_connections.pop(session_code, None)
+        if not connections:
+            return 0
+        for client in connections.values():
+            self.heartbeat.remove(client)
+            client.finish(code)
+        return len(connections)
     
     def get_session_user_count(self, session_code: str) -> int:
-        """세션의 연결된 사용자 수"""
+        """세션의 연결된 사용자 수 (이 워커 기준)"""
         if session_code in self.active_connections:
             return len(self.active_connections[session_code])
         return 0
+    
+    def _count_out(self, encoding: str, size: int):
+        self.frames_out += 1
+        self.bytes_out[encoding] = self.bytes_out.get(encoding, 0) + size
+    
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.active_connections),
+            "sockets": self.socket_count(),
+            "batch_window_ms": self.batch_window * 1000,
+            "events_in": self.events_in,
+            "events_coalesced": self.events_coalesced,
+            "frames_out": self.frames_out,
+            "bytes_out": dict(self.bytes_out),
+            "evicted": self.evicted_count,
+            "heartbeat": self.heartbeat.stats(),
+            "event_log": self.event_log.stats(),
+        }
+    
+    def socket_count(self) -> int:
+        """이 워커에 연결된 전체 소켓 수"""
+        return sum(len(connections) for connections in self.active_connections.values())
 
 # 전역 인스턴스
 manager = ConnectionManager()
-
-
-
+ws_sessions.set_function(lambda: len(manager.active_connections))
+ws_sockets.set_function(manager.socket_count)
@@ -0,0 +1,103 @@
+"""
+WebSocket 전송 형식 (JSON / compact MessagePack)
+
+기본은 예전과 같은 JSON 텍스트 프레임입니다. 클라이언트가 WebSocket 서브프로토콜로
+classkit.msgpack.v1을 요청하면 서버→클라이언트 프레임을 MessagePack 바이너리로 보냅니다.
+
+- 자주 쓰는 키는 짧은 키로 바꿈 (event → e, payload → p, avatar_id → a ...)
+- ISO 시각 문자열(timestamp, created_at)은 epoch 밀리초 정수로 바꿈
+- 표에 없는 키와 이벤트 이름은 그대로 둠 (새 이벤트를 추가해도 디코더 수정 불필요)
+- 클라이언트→서버 요청 프레임은 두 형식 모두 JSON 텍스트 (ws_protocol 참조)
+
+브라우저는 요청한 서브프로토콜을 서버가 하나도 수락하지 않으면 연결을 끊으므로 클라이언트는
+[classkit.msgpack.v1, classkit.json.v1]을 함께 요청합니다. msgpack 패키지가 없으면 json.v1을 수락합니다.
+위젯 디코더: widget/src/compactCodec.js (키 표를 바꾸면 두 파일을 함께 수정)
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 JSON만 사용
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+MSGPACK_SUBPROTOCOL = "classkit.msgpack.v1"
+JSON_SUBPROTOCOL = "classkit.json.v1"
+
+# 긴 키 -> 짧은 키 (같은 짧은 키를 두 번 쓰지 않음)
+COMPACT_KEYS = {
+    "event": "e",
+    "payload": "p",
+    "id": "i",
+    "nickname": "n",
+    "avatar_id": "a",
+    "content": "c",
+    "timestamp": "t",
+    "created_at": "ca",
+    "user_count": "u",
+    "session_code": "s",
+    "session_id": "si",
+    "reason": "r",
+    "type": "ty",
+    "ok": "o",
+    "error": "er",
+    "code": "cd",
+    "message": "m",
+    "batching": "b",
+    "seq": "q",
+    "log": "l",
+}
+TIME_KEYS = {"timestamp", "created_at"}
+
+Frame = Union[str, bytes]
+
+
+def negotiate(subprotocols: Iterable[str]) -> Optional[str]:
+    """클라이언트가 요청한 서브프로토콜 중 수락할 것 (없으면 None = JSON)"""
+    if msgpack is not None and MSGPACK_SUBPROTOCOL in subprotocols:
+        return MSGPACK_SUBPROTOCOL
+    if JSON_SUBPROTOCOL in subprotocols:
+        return JSON_SUBPROTOCOL
+    return None
+
+
+def encoding_for(subprotocol: Optional[str]) -> str:
+    return MSGPACK if subprotocol == MSGPACK_SUBPROTOCOL else JSON
+
+
+def _epoch_ms(value: str):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        # 서버는 utcnow()로 기록하므로 시간대 없는 값은 UTC
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def compact(value):
+    """키를 짧게, 시각을 epoch 밀리초로 바꾼 사본"""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in TIME_KEYS and isinstance(item, str):
+                item = _epoch_ms(item)
+            elif isinstance(item, datetime):
+                item = _epoch_ms(item.isoformat())
+            result[COMPACT_KEYS.get(key, key)] = compact(item)
+        return result
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    return value
+
+
+def encode(message: dict, encoding: str = JSON) -> Frame:
+    """메시지를 전송 형식의 프레임으로 직렬화 (JSON은 str, msgpack은 bytes)"""
+    if encoding == MSGPACK:
+        return msgpack.packb(compact(message), use_bin_type=True, default=str)
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str)
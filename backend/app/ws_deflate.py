@@ -0,0 +1,72 @@
+"""
+WebSocket permessage-deflate 설정
+
+uvicorn(websockets 구현)은 permessage-deflate를 기본으로 켜지만 압축 수준과 창 크기는
+라이브러리 기본값으로 고정되어 있습니다. configure()가 uvicorn이 연결마다 만드는 확장 팩토리를
+환경변수 설정값으로 바꿉니다. 앱 import 시(uvicorn 워커마다) 한 번 호출합니다.
+
+압축 상태는 소켓마다 따로 잡히므로 소켓 수가 많을수록 창 크기/메모리 수준의 영향이 큽니다.
+대략 소켓당 메모리 = 2^(WINDOW_BITS+2) + 2^(MEM_LEVEL+9) 바이트 (기본값 약 144KB).
+
+환경변수:
+    WS_DEFLATE: false면 압축 끔 (uvicorn --ws-per-message-deflate false와 같음, 기본값 true)
+    WS_DEFLATE_LEVEL: zlib 압축 수준 1~9 (기본값 6)
+    WS_DEFLATE_MEM_LEVEL: zlib 메모리 수준 1~9 (기본값 5)
+    WS_DEFLATE_WINDOW_BITS: 서버 압축 창 크기 9~15 (기본값 15)
+    WS_DEFLATE_CONTEXT_TAKEOVER: false면 프레임마다 압축 사전 초기화 (메모리 절약, 압축률 하락, 기본값 true)
+
+uvicorn --ws wsproto 구현에는 적용되지 않습니다.
+"""
+
+import functools
+import os
+
+from .log import get_logger
+
+logger = get_logger("ws_deflate")
+
+WS_DEFLATE = os.getenv("WS_DEFLATE", "true").lower() == "true"
+WS_DEFLATE_LEVEL = int(os.getenv("WS_DEFLATE_LEVEL", "6"))
+WS_DEFLATE_MEM_LEVEL = int(os.getenv("WS_DEFLATE_MEM_LEVEL", "5"))
+WS_DEFLATE_WINDOW_BITS = int(os.getenv("WS_DEFLATE_WINDOW_BITS", "15"))
+WS_DEFLATE_CONTEXT_TAKEOVER = os.getenv("WS_DEFLATE_CONTEXT_TAKEOVER", "true").lower() == "true"
+
+
+def deflate_settings() -> dict:
+    """ServerPerMessageDeflateFactory 인자"""
+    return {
+        "server_no_context_takeover": not WS_DEFLATE_CONTEXT_TAKEOVER,
+        "server_max_window_bits": WS_DEFLATE_WINDOW_BITS if WS_DEFLATE_WINDOW_BITS < 15 else None,
+        "compress_settings": {"level": WS_DEFLATE_LEVEL, "memLevel": WS_DEFLATE_MEM_LEVEL},
+    }
+
+
+def configure() -> bool:
+    """uvicorn websockets 구현의 permessage-deflate 팩토리 교체 (적용했으면 True)"""
+    try:
+        from uvicorn.protocols.websockets import websockets_impl
+        from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+    except ImportError:
+        return False
+
+    if not WS_DEFLATE:
+        from websockets.exceptions import NegotiationError
+
+        class DisabledDeflateFactory(ServerPerMessageDeflateFactory):
+            """클라이언트가 요청해도 압축 확장을 수락하지 않음"""
+
+            def process_request_params(self, params, accepted_extensions):
+                raise NegotiationError("permessage-deflate disabled")
+
+        websockets_impl.ServerPerMessageDeflateFactory = DisabledDeflateFactory
+        logger.info("🗜️ WebSocket 압축 끔 (WS_DEFLATE=false)")
+        return True
+
+    websockets_impl.ServerPerMessageDeflateFactory = functools.partial(
+        ServerPerMessageDeflateFactory, **deflate_settings()
+    )
+    logger.debug(
+        "🗜️ WebSocket 압축: level=%d, memLevel=%d, window_bits=%d, context_takeover=%s",
+        WS_DEFLATE_LEVEL, WS_DEFLATE_MEM_LEVEL, WS_DEFLATE_WINDOW_BITS, WS_DEFLATE_CONTEXT_TAKEOVER
+    )
+    return True
@@ -0,0 +1,227 @@
+"""
+WebSocket 수신 프로토콜 (학생 → 서버)
+
+학생이 열어 둔 /ws/{session_code} 소켓 하나로 정답 확인 → 메시지 전송까지 처리할 수 있도록
+타입이 정해진 요청 프레임을 받습니다. 처리 로직은 REST 라우트와 같은 함수를 사용합니다
+(evaluate_answer, publish_message, pick_problem). 세션 코드는 소켓 경로의 코드를 사용합니다.
+
+요청 프레임 (JSON 텍스트):
+    {"v": 1, "type": "checkAnswer", "id": "r1", "payload": {"problem_id": "p1", "answer": "apple"}}
+
+    type: checkAnswer | postMessage | nextProblem | ping | pong
+    id: 클라이언트가 정하는 요청 ID (응답에 그대로 돌려줌, 생략 가능)
+
+응답 프레임 (요청한 소켓에만, 브로드캐스트와 같은 송신 큐로 전송):
+    {"event": "reply", "id": "r1", "type": "checkAnswer", "ok": true, "payload": {...}}
+    {"event": "reply", "id": "r1", "type": "checkAnswer", "ok": false,
+     "error": {"code": "RATE_LIMIT_EXCEEDED", "message": "...", "retry_after": 12}}
+
+pong은 서버 하트비트(ping 이벤트)에 대한 응답이며 응답 프레임을 보내지 않습니다.
+
+모르는 프레임을 세션 전체에 되돌려 보내지 않습니다 (예전 echo 이벤트 제거).
+"""
+
+import json
+import uuid
+from typing import Annotated, Literal, Optional, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from .database import async_session
+from .log import get_logger
+from .metrics import Counter, registry
+from .rate_limit import check_rate_limit, message_rate_limit, student_key
+from .routes.messages import MessageCreate, publish_message
+from .routes.problems import ProblemCheck, evaluate_answer, pick_problem
+
+logger = get_logger("ws_protocol")
+
+PROTOCOL_VERSION = 1
+MAX_FRAME_CHARS = 4096
+FRAME_TYPES = ("checkAnswer", "postMessage", "nextProblem", "ping", "pong")
+
+ws_frames = registry.register(Counter(
+    "classkit_ws_frames_total", "WebSocket request frames handled by type and result", ("type", "result"),
+))
+
+# HTTPException 상태 코드 -> 오류 코드 (API.md Error Codes)
+ERROR_CODES = {
+    400: "VALIDATION_ERROR",
+    403: "FORBIDDEN",
+    404: "NOT_FOUND",
+    422: "VALIDATION_ERROR",
+    429: "RATE_LIMIT_EXCEEDED",
+}
+
+
+class CheckAnswerPayload(BaseModel):
+    problem_id: str = Field(..., max_length=64)
+    answer: str = Field(..., max_length=200)
+
+
+class PostMessagePayload(BaseModel):
+    nickname: str = Field(..., min_length=1, max_length=20)
+    avatar_id: int = Field(..., ge=1, le=64)
+    content: str = Field(..., min_length=1, max_length=200)
+    answer_token: str = Field(..., max_length=512)
+
+
+class NextProblemPayload(BaseModel):
+    grade: Optional[str] = Field(None, max_length=10)
+    difficulty: int = Field(3, ge=1, le=5)
+    type: Optional[str] = Field(None, max_length=20)
+
+
+class _Frame(BaseModel):
+    v: int = PROTOCOL_VERSION
+    id: Optional[str] = Field(None, max_length=64)
+
+
+class CheckAnswerFrame(_Frame):
+    type: Literal["checkAnswer"]
+    payload: CheckAnswerPayload
+
+
+class PostMessageFrame(_Frame):
+    type: Literal["postMessage"]
+    payload: PostMessagePayload
+
+
+class NextProblemFrame(_Frame):
+    type: Literal["nextProblem"]
+    payload: NextProblemPayload = NextProblemPayload()
+
+
+class PingFrame(_Frame):
+    type: Literal["ping"]
+
+
+class PongFrame(_Frame):
+    type: Literal["pong"]
+
+
+Frame = Annotated[
+    Union[CheckAnswerFrame, PostMessageFrame, NextProblemFrame, PingFrame, PongFrame],
+    Field(discriminator="type"),
+]
+_frame_adapter = TypeAdapter(Frame)
+
+
+class ProtocolError(Exception):
+    """요청 프레임 오류 (응답 error로 변환)"""
+
+    def __init__(self, code: str, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+
+
+def parse_frame(text: str) -> Frame:
+    """텍스트 프레임을 요청 모델로 변환 (실패하면 ProtocolError)"""
+    if len(text) > MAX_FRAME_CHARS:
+        raise ProtocolError("VALIDATION_ERROR", f"프레임이 너무 큽니다 (최대 {MAX_FRAME_CHARS}자)")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        raise ProtocolError("VALIDATION_ERROR", "JSON 형식이 아닙니다")
+    if not isinstance(data, dict):
+        raise ProtocolError("VALIDATION_ERROR", "프레임은 JSON 객체여야 합니다")
+    if data.get("v", PROTOCOL_VERSION) != PROTOCOL_VERSION:
+        raise ProtocolError("UNSUPPORTED_VERSION", f"지원하지 않는 프로토콜 버전입니다 (v{PROTOCOL_VERSION})")
+    try:
+        return _frame_adapter.validate_python(data)
+    except ValidationError as e:
+        errors = e.errors()
+        location = ".".join(str(part) for part in errors[0]["loc"]) if errors else ""
+        raise ProtocolError("VALIDATION_ERROR", f"잘못된 요청입니다: {location}".rstrip(": "))
+
+
+def _request_meta(text: str) -> tuple:
+    """검증 전 프레임에서 응답용 (id, type) 추출 (오류 응답에도 요청 ID를 돌려주기 위함)"""
+    try:
+        data = json.loads(text) if len(text) <= MAX_FRAME_CHARS else None
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+    request_id, frame_type = data.get("id"), data.get("type")
+    return (
+        request_id[:64] if isinstance(request_id, str) else None,
+        frame_type if frame_type in FRAME_TYPES else None,
+    )
+
+
+class FrameHandler:
+    """소켓 하나의 요청 프레임 처리 (세션 코드와 요청 제한 키 보관)
+
+    요청 제한 키는 ?client_id=(기기별 ID)이고, 없으면 소켓마다 새 키를 씁니다.
+    IP로 묶으면 같은 공유기(NAT) 뒤의 반 전체가 학생 버킷 하나를 나눠 쓰게 됩니다.
+    """
+
+    def __init__(self, session_code: str, client_id: Optional[str] = None):
+        self.session_code = session_code
+        self.rate_key = student_key(client_id, None) if client_id else "ws:" + uuid.uuid4().hex[:16]
+
+    async def handle(self, text: str) -> Optional[dict]:
+        """프레임 하나 처리 후 응답 메시지 반환 (pong이면 None)"""
+        request_id, frame_type = _request_meta(text)
+        try:
+            frame = parse_frame(text)
+            if isinstance(frame, PongFrame):
+                return None
+            payload = await self._dispatch(frame)
+        except ProtocolError as e:
+            return self._error(request_id, frame_type, e)
+        except HTTPException as e:
+            retry_after = (e.headers or {}).get("Retry-After")
+            return self._error(request_id, frame_type, ProtocolError(
+                ERROR_CODES.get(e.status_code, "INTERNAL_ERROR"),
+                str(e.detail),
+                int(retry_after) if retry_after else None,
+            ))
+        except ValidationError:
+            return self._error(request_id, frame_type, ProtocolError("VALIDATION_ERROR", "잘못된 요청입니다"))
+        except Exception as e:
+            logger.exception("❌ WebSocket 요청 처리 오류 (%s, %s): %s", self.session_code, frame_type, e)
+            return self._error(request_id, frame_type, ProtocolError("INTERNAL_ERROR", "서버 오류가 발생했습니다"))
+
+        ws_frames.inc(frame.type, "ok")
+        return {"event": "reply", "id": frame.id, "type": frame.type, "ok": True, "payload": payload}
+
+    def reject_binary(self) -> dict:
+        """바이너리 프레임 응답 (요청은 두 전송 형식 모두 JSON 텍스트, ws_codec 참조)"""
+        return self._error(None, None, ProtocolError("VALIDATION_ERROR", "요청 프레임은 JSON 텍스트여야 합니다"))
+
+    def _error(self, request_id: Optional[str], frame_type: Optional[str], error: ProtocolError) -> dict:
+        ws_frames.inc(frame_type or "unknown", error.code)
+        body = {"code": error.code, "message": error.message}
+        if error.retry_after is not None:
+            body["retry_after"] = error.retry_after
+        return {"event": "reply", "id": request_id, "type": frame_type, "ok": False, "error": body}
+
+    async def _dispatch(self, frame: Frame) -> dict:
+        if isinstance(frame, PingFrame):
+            return {}
+
+        async with async_session() as db:
+            try:
+                if isinstance(frame, CheckAnswerFrame):
+                    check_rate_limit.check(self.session_code, self.rate_key)
+                    result = await evaluate_answer(db, ProblemCheck(
+                        session_code=self.session_code, **frame.payload.model_dump()
+                    ))
+                elif isinstance(frame, PostMessageFrame):
+                    message_rate_limit.check(self.session_code, self.rate_key)
+                    message = await publish_message(db, MessageCreate(
+                        code=self.session_code, **frame.payload.model_dump()
+                    ))
+                    result = message.model_dump(mode="json")
+                else:
+                    result = await pick_problem(db, self.session_code, **frame.payload.model_dump())
+                await db.commit()
+                return result
+            except Exception:
+                await db.rollback()
+                raise
@@ -0,0 +1,47 @@
+"""
+정답 토큰 검증 마이크로 벤치마크
+
+JWT(캐시 없음) / compact(캐시 없음) / 캐시 적중 경로의 검증 속도를 비교합니다.
+
+실행:
+    cd backend
+    python -m benchmarks.bench_token [--iterations 20000]
+"""
+
+import argparse
+import timeit
+
+from app.utils import token as token_module
+from app.utils.token import _decode, create_answer_token, verify_answer_token
+
+SESSION_CODE = "A23456"
+PROBLEM_ID = "2b0c6c4e-8f0e-4c4a-9d7e-4f7d1f0c9a11"
+
+
+def bench(label: str, func, iterations: int):
+    seconds = timeit.timeit(func, number=iterations)
+    per_call = seconds / iterations * 1_000_000
+    print(f"{label:<28} {per_call:8.2f} µs/회  {iterations / seconds:12,.0f} 회/초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정답 토큰 검증 벤치마크")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    jwt_token = create_answer_token(PROBLEM_ID, SESSION_CODE, token_format="jwt")
+    compact_token = create_answer_token(PROBLEM_ID, SESSION_CODE, token_format="compact")
+    assert verify_answer_token(jwt_token, SESSION_CODE)
+    assert verify_answer_token(compact_token, SESSION_CODE)
+
+    print(f"토큰 길이: jwt {len(jwt_token)}자, compact {len(compact_token)}자")
+    bench("jwt 발급", lambda: create_answer_token(PROBLEM_ID, SESSION_CODE, "jwt"), args.iterations)
+    bench("compact 발급", lambda: create_answer_token(PROBLEM_ID, SESSION_CODE, "compact"), args.iterations)
+    bench("jwt 검증 (캐시 없음)", lambda: _decode(jwt_token), args.iterations)
+    bench("compact 검증 (캐시 없음)", lambda: _decode(compact_token), args.iterations)
+    bench("캐시 적중 검증", lambda: verify_answer_token(jwt_token, SESSION_CODE), args.iterations)
+    print(f"캐시 통계: {token_module.cache_stats}")
+
+
+if __name__ == "__main__":
+    main()
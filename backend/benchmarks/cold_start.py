@@ -0,0 +1,70 @@
+"""
+콜드 스타트 시간 측정 (프로세스 시작 → 첫 요청 성공)
+
+uvicorn 프로세스를 새로 띄우고 GET /health가 200을 돌려줄 때까지 걸린 시간을
+측정합니다. 빈 DB(첫 배포)와 이미 스키마가 최신인 DB(재시작)를 각각 측정합니다.
+
+실행:
+    cd backend
+    python -m benchmarks.cold_start [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(database_url: str, timeout: float = 60) -> float:
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, LOG_LEVEL="warning")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("서버가 시작되지 않았습니다")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트 시간 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="classkit-coldstart-")
+    fresh, warm = [], []
+    for i in range(args.runs):
+        url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, f'run{i}.db')}"
+        fresh.append(time_to_first_request(url))  # 빈 DB: 스키마 생성
+        warm.append(time_to_first_request(url))   # 같은 DB 재시작: 스키마 최신
+
+    for label, values in (("빈 DB", fresh), ("최신 스키마 DB", warm)):
+        print(f"{label:<16} 중앙값 {statistics.median(values) * 1000:7.0f}ms  "
+              f"최소 {min(values) * 1000:7.0f}ms  최대 {max(values) * 1000:7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+로컬 가짜 OpenAI 서버 + 발화 풀 보충 확인 (OPENAI_BASE_URL)
+
+/v1/chat/completions만 흉내 내는 작은 서버입니다. 실제 API 키/요금 없이 발화 풀(speech_pool)의
+보충, 제한 시간, 실패 시 백오프를 확인할 수 있습니다.
+
+실행:
+    cd backend
+    # 정상 → 장애(모든 요청 실패) → 복구 순서로 풀 동작 확인 (백오프 있음/없음 비교)
+    python -m benchmarks.fake_openai [--takes 200] [--fail-status 401] [--delay 0.05]
+    # 서버만 띄워 실제 앱에 연결
+    python -m benchmarks.fake_openai --serve --port 8999
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8999/v1 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeOpenAI:
+    """가짜 API 상태 (응답 지연, 실패 상태 코드, 호출 수)"""
+
+    def __init__(self, delay: float = 0.05, fail_status: Optional[int] = None):
+        self.delay = delay
+        self.fail_status = fail_status
+        self.calls = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+
+    async def chat_completions(self, request: Request):
+        self.calls += 1
+        body = await request.json()
+        await asyncio.sleep(self.delay)
+        if self.fail_status:
+            return JSONResponse(status_code=self.fail_status, content={
+                "error": {"message": "fake outage", "type": "server_error", "code": None}
+            })
+        n = int(body.get("n") or 1)
+        return {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": f"가짜 응원 {self.calls}-{i + 1}"},
+                    "finish_reason": "stop",
+                }
+                for i in range(n)
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(fake: FakeOpenAI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=port, log_level="warning"))
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+async def take_for(pool, takes: int, seconds: float) -> int:
+    """seconds 동안 takes번 고르게 꺼내고 풀에서 받은 수 반환 (카테고리 순환)"""
+    from app.speech_pool import PROMPTS
+
+    categories = list(PROMPTS)
+    hits = 0
+    for i in range(takes):
+        if pool.take(categories[i % len(categories)]) is not None:
+            hits += 1
+        await asyncio.sleep(seconds / takes)
+    return hits
+
+
+async def scenario(fake: FakeOpenAI, base_url: str, args, backoff: float) -> dict:
+    from app.speech_pool import SpeechPool
+
+    pool = SpeechPool(api_key="fake", base_url=base_url, timeout=args.timeout, backoff=backoff)
+    result = {}
+    try:
+        fake.fail_status = None
+        fake.calls = 0
+        await pool.start()
+        await asyncio.gather(*pool._refills.values())
+        hits = await take_for(pool, args.takes, args.seconds)
+        result["정상"] = (hits, fake.calls)
+
+        fake.fail_status = args.fail_status
+        fake.calls = 0
+        hits = await take_for(pool, args.takes, args.seconds)
+        await asyncio.gather(*pool._refills.values(), return_exceptions=True)
+        result["장애"] = (hits, fake.calls)
+
+        # 복구: 백오프가 끝난 뒤 첫 take부터 다시 보충
+        fake.fail_status = None
+        fake.calls = 0
+        await asyncio.sleep(backoff)
+        hits = await take_for(pool, args.takes, args.seconds)
+        result["복구"] = (hits, fake.calls)
+        result["stats"] = pool.stats()
+    finally:
+        await pool.stop()
+    return result
+
+
+async def run(args):
+    fake = FakeOpenAI(delay=args.delay)
+    port = free_port()
+    server = await start_server(fake, port)
+    base_url = f"http://127.0.0.1:{port}/v1"
+    try:
+        print(f"가짜 OpenAI {base_url}, take {args.takes}회/{args.seconds}초, 장애 시 HTTP {args.fail_status}")
+        print(f"{'백오프':<10}{'구간':<8}{'풀 적중':>10}{'API 호출':>10}")
+        for backoff in (0.0, args.backoff):
+            result = await scenario(fake, base_url, args, backoff)
+            for phase in ("정상", "장애", "복구"):
+                hits, calls = result[phase]
+                print(f"{backoff:<10.1f}{phase:<8}{hits:>10}{calls:>10}")
+    finally:
+        server.should_exit = True
+        await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 OpenAI 서버로 발화 풀 보충/백오프 확인")
+    parser.add_argument("--serve", action="store_true", help="서버만 실행 (OPENAI_BASE_URL 대상)")
+    parser.add_argument("--port", type=int, default=8999, help="--serve 포트")
+    parser.add_argument("--delay", type=float, default=0.05, help="응답 지연(초)")
+    parser.add_argument("--fail-status", type=int, help="장애 구간 HTTP 상태 코드 (기본값 401 = 잘못된 키, --serve면 처음부터 실패)")
+    parser.add_argument("--takes", type=int, default=200, help="구간별 take 횟수")
+    parser.add_argument("--seconds", type=float, default=2.0, help="구간 길이(초)")
+    parser.add_argument("--timeout", type=float, default=1.0, help="보충 제한 시간(초)")
+    parser.add_argument("--backoff", type=float, default=2.0, help="비교할 첫 백오프(초)")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "error")
+
+    if args.serve:
+        fake = FakeOpenAI(delay=args.delay, fail_status=args.fail_status)
+        uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
+        return
+    args.fail_status = args.fail_status or 401
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
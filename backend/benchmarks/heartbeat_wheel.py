@@ -0,0 +1,109 @@
+"""
+하트비트 타이머 휠 벤치마크
+
+소켓 N개를 HeartbeatWheel에 등록하고 tick을 돌리며 tick당 처리 시간을 잽니다.
+일부 소켓은 응답하지 않도록 해서 정리 경로도 함께 측정합니다. 비교용으로 소켓마다
+asyncio 타이머를 두는 방식(call_later)의 등록 비용과 메모리도 출력합니다.
+
+실행:
+    cd backend
+    python -m benchmarks.heartbeat_wheel [--sockets 10000] [--interval 25] [--timeout 20] [--dead-ratio 0.05]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+
+from app.heartbeat import HeartbeatWheel
+
+
+class FakeClient:
+    __slots__ = ("alive", "last_seen", "ping_sent_at", "heartbeat_slot")
+
+    def __init__(self, alive: bool):
+        self.alive = alive
+
+
+def run_wheel(args) -> dict:
+    rng = random.Random(1)
+    wheel = HeartbeatWheel(interval=args.interval, timeout=args.timeout, tick=1.0)
+    clients = [FakeClient(rng.random() >= args.dead_ratio) for _ in range(args.sockets)]
+
+    # 접속을 한 주기 동안 고르게 분산 (워밍업, 측정에서 제외)
+    warmup = int(args.interval)
+    chunk = -(-len(clients) // warmup)
+    tracemalloc.start()
+    for now in range(warmup):
+        for client in clients[now * chunk:(now + 1) * chunk]:
+            wheel.add(client, float(now))
+        to_ping, _ = wheel.advance(float(now + 1))
+        for client in to_ping:
+            if client.alive:
+                client.last_seen = now + 1.0
+    wheel_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    durations = []
+    pings = reaped = 0
+    for now in range(warmup + 1, warmup + args.ticks + 1):
+        started = time.perf_counter()
+        to_ping, dead = wheel.advance(float(now))
+        durations.append(time.perf_counter() - started)
+        pings += len(to_ping)
+        reaped += len(dead)
+        for client in to_ping:
+            if client.alive:
+                client.last_seen = now + rng.random() * 0.5
+        # 일부 살아 있는 소켓은 중간에 요청 프레임을 보냄 (ping 없이 미뤄짐)
+        for client in rng.sample(clients, min(len(clients), 200)):
+            if client.alive:
+                client.last_seen = float(now)
+
+    durations.sort()
+    return {
+        "memory_kb": wheel_memory / 1024,
+        "p50_us": statistics.median(durations) * 1_000_000,
+        "max_us": durations[-1] * 1_000_000,
+        "pings": pings,
+        "reaped": reaped,
+        "expected_dead": sum(1 for client in clients if not client.alive),
+    }
+
+
+async def run_call_later(args) -> dict:
+    loop = asyncio.get_running_loop()
+    tracemalloc.start()
+    started = time.perf_counter()
+    handles = [loop.call_later(args.interval, lambda: None) for _ in range(args.sockets)]
+    elapsed = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for handle in handles:
+        handle.cancel()
+    return {"register_ms": elapsed * 1000, "memory_kb": memory / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="하트비트 타이머 휠 벤치마크")
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=25)
+    parser.add_argument("--timeout", type=float, default=20)
+    parser.add_argument("--ticks", type=int, default=120, help="측정할 tick 수 (1초 단위)")
+    parser.add_argument("--dead-ratio", type=float, default=0.05, help="응답하지 않는 소켓 비율")
+    args = parser.parse_args()
+
+    wheel = run_wheel(args)
+    timers = asyncio.run(run_call_later(args))
+    print(f"소켓 {args.sockets:,}개, interval {args.interval:.0f}초, timeout {args.timeout:.0f}초, {args.ticks} tick")
+    print(f"타이머 휠: tick p50 {wheel['p50_us']:.0f}µs, 최대 {wheel['max_us']:.0f}µs, "
+          f"ping {wheel['pings']:,}개, 정리 {wheel['reaped']:,}/{wheel['expected_dead']:,}개, "
+          f"등록 메모리 {wheel['memory_kb']:.0f}KB")
+    print(f"소켓별 call_later (등록만): {timers['register_ms']:.1f}ms, 메모리 {timers['memory_kb']:.0f}KB "
+          f"(주기마다 재등록/취소 필요)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+교실 단위 부하 테스트 (HTTP + WebSocket)
+
+세션 N개를 만들고, 세션마다 교사 위젯 WebSocket 1개(/ws/{code})와
+학생 M명(최대 50명)을 동시에 실행합니다. 학생은 실제 모바일 앱과 같은 순서로
+    GET /api/sessions/{code} → GET /api/problems/next → POST /api/problems/check
+    → POST /api/messages (rounds회)
+를 호출합니다.
+
+측정 항목:
+    - 라우트별 p50/p95/p99 지연 시간
+    - 메시지 POST 시작 → 교사 WebSocket 수신까지의 브로드캐스트 지연
+    - 오류율, 처리량 (429 요청 제한은 오류와 따로 집계)
+
+실행 방식:
+    cd backend
+    # 프로세스 내 ASGI 앱 (임시 SQLite)
+    python -m benchmarks.loadtest --sessions 10 --students 30
+    # 로컬 uvicorn을 띄워서 (임시 SQLite)
+    python -m benchmarks.loadtest --spawn --sessions 10 --students 30
+    # 이미 실행 중인 서버
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000
+    # 교사 소켓을 ?batch=1로 연결 (batch 프레임 경로)
+    python -m benchmarks.loadtest --batch
+
+--max-p95-ms / --max-error-rate를 지정하면 기준을 넘을 때 종료 코드 1로 끝나므로
+성능 회귀 검사에 사용할 수 있습니다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+DIGITS = "23456789"
+LOADTEST_PROBLEM = {"id": "loadtest-1", "type": "vocabulary", "question": "영어 단어: 사과", "answer": "apple"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """라우트별 지연/오류 기록"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # 429 (요청 제한): 서버 오류가 아니므로 오류율에서 제외하고 따로 집계
+        self.throttled: Dict[str, int] = defaultdict(int)
+        self.broadcast_delays: List[float] = []
+        self.sent_at: Dict[str, float] = {}
+        self.lost_broadcasts = 0
+
+    async def call(self, route: str, request) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except Exception:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code == 429:
+            self.throttled[route] += 1
+            return None
+        if response.status_code >= 400:
+            self.errors[route] += 1
+            return None
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        total_requests = 0
+        total_errors = 0
+        total_throttled = 0
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies[route]
+            count = len(values) + (self.errors[route] if not values else 0)
+            total_requests += len(values)
+            total_errors += self.errors[route]
+            total_throttled += self.throttled[route]
+            routes[route] = {
+                "count": count,
+                "errors": self.errors[route],
+                "throttled": self.throttled[route],
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total_requests,
+            "requests_per_s": round(total_requests / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(total_errors / max(1, total_requests), 4),
+            "throttled": total_throttled,
+            "routes": routes,
+            "broadcast": {
+                "received": len(self.broadcast_delays),
+                "lost": self.lost_broadcasts + len(self.sent_at),
+                "p50_ms": round(percentile(self.broadcast_delays, 50), 2),
+                "p95_ms": round(percentile(self.broadcast_delays, 95), 2),
+                "p99_ms": round(percentile(self.broadcast_delays, 99), 2),
+            },
+        }
+
+
+# ---------------------------------------------------------------------------
+# WebSocket 클라이언트 (프로세스 내 ASGI / 실제 네트워크)
+# ---------------------------------------------------------------------------
+
+class AsgiWebSocket:
+    """ASGI 앱에 직접 연결하는 최소 WebSocket 클라이언트"""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path, _, self.query = path.partition("?")
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": self.query.encode(),
+            "headers": [(b"host", b"loadtest")],
+            "subprotocols": [],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        self._task = asyncio.create_task(self.app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket 연결 거부: {message}")
+        return self
+
+    async def recv(self):
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError("WebSocket 연결 종료")
+        return message.get("text") if message.get("text") is not None else message.get("bytes")
+
+    async def close(self):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except Exception:
+                self._task.cancel()
+
+
+class NetworkWebSocket:
+    """실제 서버에 연결하는 WebSocket 클라이언트 (websockets 라이브러리)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._conn = None
+
+    async def connect(self):
+        import websockets
+        self._conn = await websockets.connect(self.url, max_size=None)
+        return self
+
+    async def recv(self):
+        return await self._conn.recv()
+
+    async def close(self):
+        await self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# 시나리오
+# ---------------------------------------------------------------------------
+
+class LoadTest:
+    def __init__(self, args, client: httpx.AsyncClient, ws_factory):
+        self.args = args
+        self.client = client
+        self.ws_factory = ws_factory
+        self.recorder = Recorder()
+
+    async def run_session(self, index: int):
+        rec = self.recorder
+        code = random.choice(LETTERS) + "".join(random.choices(DIGITS, k=5))
+        response = await rec.call("POST /api/sessions", self.client.post(
+            "/api/sessions", json={"code": code, "problems": [LOADTEST_PROBLEM]}
+        ))
+        if response is None:
+            return
+
+        try:
+            path = f"/ws/{code}?batch=1" if self.args.batch else f"/ws/{code}"
+            teacher = await self.ws_factory(path).connect()
+            await teacher.recv()  # connected
+        except Exception:
+            rec.errors["WS /ws/{code}"] += 1
+            return
+
+        listener = asyncio.create_task(self.listen(teacher, code))
+        await asyncio.gather(*(self.run_student(code, i) for i in range(self.args.students)))
+        # 마지막 브로드캐스트 도착 대기
+        await asyncio.sleep(self.args.drain)
+        listener.cancel()
+        await teacher.close()
+
+    async def listen(self, ws, code: str):
+        rec = self.recorder
+        try:
+            while True:
+                data = await ws.recv()
+                received = time.perf_counter()
+                try:
+                    frame = json.loads(data)
+                except (TypeError, ValueError):
+                    continue
+                if not isinstance(frame, dict):
+                    continue
+                # batch 프레임은 payload가 이벤트 목록
+                events = frame["payload"] if frame.get("event") == "batch" else [frame]
+                for event in events:
+                    if event.get("event") != "newMessage":
+                        continue
+                    key = (event.get("payload") or {}).get("content")
+                    sent = rec.sent_at.pop(key, None)
+                    if sent is not None:
+                        rec.broadcast_delays.append((received - sent) * 1000)
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        except Exception:
+            pass
+
+    async def run_student(self, code: str, index: int):
+        rec = self.recorder
+        # 학생들이 QR을 찍는 시점이 조금씩 다름
+        await asyncio.sleep(random.random() * self.args.ramp)
+        nickname = f"학생{index + 1}"
+
+        if await rec.call("GET /api/sessions/{code}", self.client.get(f"/api/sessions/{code}")) is None:
+            return
+        response = await rec.call("GET /api/problems/next", self.client.get(
+            "/api/problems/next", params={"code": code}
+        ))
+        if response is None:
+            return
+        problem = response.json()
+        response = await rec.call("POST /api/problems/check", self.client.post("/api/problems/check", json={
+            "problem_id": problem.get("id"),
+            "answer": problem.get("answer") or LOADTEST_PROBLEM["answer"],
+            "session_code": code,
+        }, headers={"X-Client-Id": f"lt-{code}-{index}"}))
+        if response is None:
+            return
+        token = response.json().get("answer_token")
+        if not token:
+            rec.errors["POST /api/problems/check"] += 1
+            return
+
+        for round_no in range(self.args.rounds):
+            content = f"lt-{code}-{index}-{round_no}"
+            rec.sent_at[content] = time.perf_counter()
+            response = await rec.call("POST /api/messages", self.client.post("/api/messages", json={
+                "code": code,
+                "nickname": nickname,
+                "avatar_id": index % 64 + 1,
+                "content": content,
+                "answer_token": token,
+            }, headers={"X-Client-Id": f"lt-{code}-{index}"}))
+            if response is None:
+                rec.sent_at.pop(content, None)
+            if self.args.think:
+                await asyncio.sleep(random.random() * self.args.think)
+
+    async def run(self) -> dict:
+        started = time.perf_counter()
+        await asyncio.gather(*(self.run_session(i) for i in range(self.args.sessions)))
+        return self.recorder.report(time.perf_counter() - started - self.args.drain)
+
+
+def print_report(report: dict):
+    print(f"\n소요 시간 {report['elapsed_s']}초, 요청 {report['requests']}개 "
+          f"({report['requests_per_s']}/초), 오류율 {report['error_rate'] * 100:.2f}%, "
+          f"요청 제한(429) {report['throttled']}개")
+    print(f"{'route':<30}{'count':>8}{'err':>6}{'429':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for route, stats in report["routes"].items():
+        print(f"{route:<30}{stats['count']:>8}{stats['errors']:>6}{stats['throttled']:>6}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    b = report["broadcast"]
+    print(f"{'broadcast (POST→WS 수신)':<30}{b['received']:>8}{b['lost']:>6}{'':>6}"
+          f"{b['p50_ms']:>10.2f}{b['p95_ms']:>10.2f}{b['p99_ms']:>10.2f}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+async def run_in_process(args) -> dict:
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+            test = LoadTest(args, client, lambda path: AsgiWebSocket(app, path))
+            return await test.run()
+    finally:
+        await app.router.shutdown()
+
+
+async def run_remote(args, base_url: str) -> dict:
+    ws_base = base_url.replace("http://", "ws://").replace("https://", "wss://")
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        test = LoadTest(args, client, lambda path: NetworkWebSocket(ws_base + path))
+        return await test.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="교실 부하 테스트 (HTTP + WebSocket)")
+    parser.add_argument("--sessions", type=int, default=5, help="동시 세션(교실) 수")
+    parser.add_argument("--students", type=int, default=30, help="세션당 학생 수 (최대 50)")
+    parser.add_argument("--rounds", type=int, default=2, help="학생당 메시지 수")
+    parser.add_argument("--ramp", type=float, default=1.0, help="학생 입장 분산 시간(초)")
+    parser.add_argument("--think", type=float, default=0.0, help="메시지 사이 최대 대기 시간(초)")
+    parser.add_argument("--drain", type=float, default=0.5, help="종료 전 브로드캐스트 대기 시간(초)")
+    parser.add_argument("--batch", action="store_true", help="교사 WebSocket을 ?batch=1로 연결 (batch 프레임 수신)")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (예: http://127.0.0.1:8000)")
+    parser.add_argument("--spawn", action="store_true", help="임시 SQLite로 로컬 uvicorn을 띄워서 테스트")
+    parser.add_argument("--workers", type=int, default=1, help="--spawn 시 uvicorn 워커 수")
+    parser.add_argument("--connections", type=int, default=200, help="원격 모드 HTTP 연결 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--max-p95-ms", type=float, help="라우트 p95가 이 값을 넘으면 실패")
+    parser.add_argument("--max-error-rate", type=float, help="오류율이 이 값을 넘으면 실패 (0~1)")
+    args = parser.parse_args()
+    args.students = min(args.students, 50)
+
+    tmpdir = tempfile.mkdtemp(prefix="classkit-loadtest-")
+    database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'loadtest.db')}"
+    server = None
+
+    if args.url:
+        report = asyncio.run(run_remote(args, args.url.rstrip("/")))
+    elif args.spawn:
+        port = free_port()
+        env = dict(os.environ, DATABASE_URL=database_url)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            asyncio.run(wait_until_ready(base_url))
+            report = asyncio.run(run_remote(args, base_url))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    else:
+        os.environ.setdefault("DATABASE_URL", database_url)
+        report = asyncio.run(run_in_process(args))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    failed = False
+    if args.max_p95_ms is not None:
+        for route, stats in report["routes"].items():
+            if stats["p95_ms"] > args.max_p95_ms:
+                print(f"❌ {route} p95 {stats['p95_ms']}ms > {args.max_p95_ms}ms")
+                failed = True
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"❌ 오류율 {report['error_rate']} > {args.max_error_rate}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
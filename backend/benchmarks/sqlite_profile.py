@@ -0,0 +1,141 @@
+"""
+SQLite 프로필 비교 (legacy vs production)
+
+같은 작업량(동시 클라이언트가 메시지 INSERT와 최근 메시지 조회를 섞어 실행)을
+SQLITE_PROFILE별로 새 프로세스에서 실행하고 처리량/지연/오류 수를 비교합니다.
+프로필은 app.database import 시점에 정해지므로 프로필마다 하위 프로세스를 띄웁니다.
+
+실행:
+    cd backend
+    python -m benchmarks.sqlite_profile [--clients 20] [--duration 5] [--write-ratio 0.3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = ("legacy", "production")
+
+
+async def run_workload(args) -> dict:
+    from sqlalchemy import select
+    from app.database import async_session, dispose_engines
+    from app.init_db import create_tables
+    from app.models import Class, Message, School, Session as SessionModel
+    from datetime import datetime, timedelta
+
+    await create_tables()
+    async with async_session() as db:
+        school = School(name="Bench School")
+        db.add(school)
+        await db.flush()
+        class_row = Class(school_id=school.id, grade="3", name="Bench Class")
+        db.add(class_row)
+        await db.flush()
+        sessions = [
+            SessionModel(class_id=class_row.id, code=f"B{i:05d}", expires_at=datetime.now() + timedelta(hours=4))
+            for i in range(args.sessions)
+        ]
+        db.add_all(sessions)
+        await db.commit()
+        session_ids = [s.id for s in sessions]
+
+    latencies = {"write": [], "read": []}
+    errors = {}
+    deadline = time.perf_counter() + args.duration
+
+    async def client(n: int):
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            session_id = rng.choice(session_ids)
+            kind = "write" if rng.random() < args.write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                async with async_session() as db:
+                    if kind == "write":
+                        db.add(Message(session_id=session_id, nickname=f"s{n}", avatar_id=1, content="hello"))
+                        await db.commit()
+                    else:
+                        result = await db.execute(
+                            select(Message)
+                            .where(Message.session_id == session_id)
+                            .order_by(Message.created_at.desc())
+                            .limit(50)
+                        )
+                        result.scalars().all()
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    await dispose_engines()
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] * 1000 if values else 0.0
+
+    return {
+        "ops_per_second": (len(latencies["write"]) + len(latencies["read"])) / elapsed,
+        "writes_per_second": len(latencies["write"]) / elapsed,
+        "reads_per_second": len(latencies["read"]) / elapsed,
+        "write_p50_ms": statistics.median(latencies["write"]) * 1000 if latencies["write"] else 0.0,
+        "write_p95_ms": p95(latencies["write"]),
+        "read_p95_ms": p95(latencies["read"]),
+        "errors": errors,
+    }
+
+
+def run_profile(profile: str, args) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix=f"classkit-sqlite-{profile}-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'bench.db')}",
+        SQLITE_PROFILE=profile,
+        LOG_LEVEL="warning",
+        METRICS_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.sqlite_profile", "--worker",
+         "--clients", str(args.clients), "--duration", str(args.duration),
+         "--write-ratio", str(args.write_ratio), "--sessions", str(args.sessions)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 프로필 처리량 비교")
+    parser.add_argument("--clients", type=int, default=20, help="동시 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=5, help="프로필별 측정 시간(초)")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="INSERT 비율 (0~1)")
+    parser.add_argument("--sessions", type=int, default=10, help="세션 수")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_workload(args))))
+        return
+
+    results = {profile: run_profile(profile, args) for profile in PROFILES}
+    print(f"클라이언트 {args.clients}, {args.duration:.0f}초, 쓰기 비율 {args.write_ratio:.0%}")
+    print(f"{'프로필':<12}{'ops/s':>10}{'쓰기/s':>10}{'읽기/s':>10}{'쓰기 p50':>10}{'쓰기 p95':>10}{'읽기 p95':>10}  오류")
+    for profile, r in results.items():
+        print(f"{profile:<12}{r['ops_per_second']:>10.0f}{r['writes_per_second']:>10.0f}{r['reads_per_second']:>10.0f}"
+              f"{r['write_p50_ms']:>9.1f}ms{r['write_p95_ms']:>8.1f}ms{r['read_p95_ms']:>8.1f}ms  {r['errors'] or '-'}")
+    base = results["legacy"]["ops_per_second"]
+    if base:
+        print(f"production / legacy 처리량: {results['production']['ops_per_second'] / base:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+브로드캐스트 묶음 전송 벤치마크 (WS_BATCH_WINDOW_MS)
+
+QR 코드를 한꺼번에 찍는 상황을 흉내 냅니다. 세션마다 학생 소켓이 짧은 시간에 연결/재연결하며
+statsUpdate를 보내고, 동시에 메시지가 몰립니다. 이 작업량을 묶음 구간별로 ConnectionManager에
+흘려 보내 소켓으로 나간 프레임 수, CPU 시간, 교사 소켓 기준 전달 지연을 비교합니다.
+
+소켓은 전송 내용만 기록하는 가짜 WebSocket이므로 네트워크/프레이밍 비용은 포함되지 않습니다
+(실제 서버에서는 프레임마다 드는 send 비용이 더해져 차이가 더 커집니다).
+
+실행:
+    cd backend
+    python -m benchmarks.ws_batching [--sessions 10] [--students 30] [--messages 2] [--burst 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+from app.pubsub import PubSubBackend
+from app.websocket_manager import ConnectionManager
+
+WINDOWS_MS = (0, 25, 50)
+
+
+class FakeWebSocket:
+    """보낸 프레임 수만 세는 WebSocket (observer면 newMessage 전달 지연도 기록)"""
+
+    def __init__(self, observer: Dict[str, float] = None, latencies: List[float] = None):
+        self.frames = 0
+        self.bytes = 0
+        self.observer = observer
+        self.latencies = latencies
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, frame: str):
+        if frame.startswith('{"event":"connected"'):
+            return
+        self.frames += 1
+        self.bytes += len(frame)
+        if self.observer is not None:
+            received = time.perf_counter()
+            message = json.loads(frame)
+            events = message["payload"] if message["event"] == "batch" else [message]
+            for event in events:
+                sent = self.observer.pop(event["payload"].get("id"), None)
+                if sent is not None:
+                    self.latencies.append(received - sent)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def run_case(window_ms: float, batching: bool, args) -> dict:
+    manager = ConnectionManager(backend=PubSubBackend())
+    manager.batch_window = window_ms / 1000
+    rng = random.Random(1)
+    sockets: List[FakeWebSocket] = []
+    sent_at: Dict[str, float] = {}
+    latencies: List[float] = []
+
+    async def session(index: int):
+        code = f"S{index:05d}"
+        teacher = FakeWebSocket(observer=sent_at, latencies=latencies)
+        sockets.append(teacher)
+        await manager.connect(teacher, code, batching=batching)
+        students = [FakeWebSocket() for _ in range(args.students)]
+        sockets.extend(students)
+
+        async def student(n: int, ws: FakeWebSocket):
+            # 연결 직후 끊겼다가 다시 연결 (QR 스캔 후 새로고침)
+            await asyncio.sleep(rng.random() * args.burst)
+            await manager.connect(ws, code, batching=batching)
+            await manager.broadcast(code, {
+                "event": "statsUpdate", "payload": {"user_count": manager.get_session_user_count(code)}
+            })
+            manager.disconnect(ws, code)
+            await manager.broadcast(code, {
+                "event": "statsUpdate", "payload": {"user_count": manager.get_session_user_count(code)}
+            })
+            await manager.connect(ws, code, batching=batching)
+            await manager.broadcast(code, {
+                "event": "statsUpdate", "payload": {"user_count": manager.get_session_user_count(code)}
+            })
+            for m in range(args.messages):
+                await asyncio.sleep(rng.random() * args.burst)
+                message_id = f"{code}-{n}-{m}"
+                sent_at[message_id] = time.perf_counter()
+                await manager.broadcast(code, {"event": "newMessage", "payload": {
+                    "id": message_id, "nickname": f"학생{n + 1}", "avatar_id": 1, "content": "안녕하세요!",
+                }})
+
+        await asyncio.gather(*(student(n, ws) for n, ws in enumerate(students)))
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    # 마지막 묶음과 송신 큐가 빌 때까지 대기
+    await asyncio.sleep(window_ms / 1000 + 0.05)
+    while any(not c.queue.empty() for conns in manager.active_connections.values() for c in conns.values()):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    await manager.stop()
+
+    latencies.sort()
+    return {
+        "frames": sum(ws.frames for ws in sockets),
+        "bytes": sum(ws.bytes for ws in sockets),
+        "events": manager.events_in,
+        "coalesced": manager.events_coalesced,
+        "frames_per_second": sum(ws.frames for ws in sockets) / elapsed,
+        "cpu_ms": cpu * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+    }
+
+
+async def run(args):
+    print(f"세션 {args.sessions}, 학생 {args.students}명, 학생당 메시지 {args.messages}개, 몰림 구간 {args.burst:.1f}초")
+    print(f"{'구간':>6}  {'클라이언트':<8}{'이벤트':>8}{'합침':>7}{'프레임':>9}{'프레임/초':>11}{'KB':>8}{'CPU':>9}{'p50':>8}{'p95':>8}")
+    baseline = None
+    for window_ms in WINDOWS_MS:
+        for batching in ((False,) if window_ms == 0 else (False, True)):
+            r = await run_case(window_ms, batching, args)
+            baseline = baseline or r
+            print(f"{window_ms:>4}ms  {'batch' if batching else 'legacy':<8}{r['events']:>8}{r['coalesced']:>7}"
+                  f"{r['frames']:>9}{r['frames_per_second']:>11.0f}{r['bytes'] / 1024:>8.0f}"
+                  f"{r['cpu_ms']:>7.0f}ms{r['p50_ms']:>6.1f}ms{r['p95_ms']:>6.1f}ms"
+                  f"  (프레임 {r['frames'] / baseline['frames']:.0%}, CPU {r['cpu_ms'] / baseline['cpu_ms']:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="브로드캐스트 묶음 전송 비교")
+    parser.add_argument("--sessions", type=int, default=10, help="세션 수")
+    parser.add_argument("--students", type=int, default=30, help="세션당 학생 수 (최대 49)")
+    parser.add_argument("--messages", type=int, default=2, help="학생당 메시지 수")
+    parser.add_argument("--burst", type=float, default=1.0, help="연결/메시지가 몰리는 구간(초)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
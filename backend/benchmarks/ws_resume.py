@@ -0,0 +1,150 @@
+"""
+재연결 폭주 비교: 기록 다시 불러오기(GET /api/messages) vs ?since= 이어 받기
+
+와이파이가 잠깐 끊겨 반 전체 소켓이 동시에 끊긴 동안 학생 메시지가 올라오고, 모든 소켓이 한꺼번에
+재연결하는 상황입니다. 예전 방식은 재연결한 클라이언트마다 GET /api/messages로 최근 메시지를
+다시 불러오고, 새 방식은 connected의 log와 마지막 seq로 재연결해 놓친 이벤트만 batch 프레임
+하나로 받습니다.
+
+앱은 프로세스 안에서 임시 SQLite로 실행하고, 소켓은 받은 프레임만 기록하는 가짜 WebSocket입니다.
+
+실행:
+    cd backend
+    python -m benchmarks.ws_resume [--sessions 10] [--students 30] [--missed 20] [--limit 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+DIGITS = "23456789"
+PROBLEM = {"id": "resume-1", "type": "vocabulary", "question": "영어 단어: 사과", "answer": "apple"}
+
+
+class FakeWebSocket:
+    """받은 프레임과 바이트 수를 기록하는 WebSocket"""
+
+    def __init__(self):
+        self.frames = []
+        self.bytes = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, frame: str):
+        self.bytes += len(frame.encode("utf-8"))
+        self.frames.append(json.loads(frame))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def reconnect_storm(manager, client: httpx.AsyncClient, codes, positions, resume: bool, limit: int) -> dict:
+    """모든 소켓을 동시에 재연결하고 전송량/요청 수/소요 시간 측정"""
+    sockets = []
+
+    async def reconnect(code: str, position: dict):
+        ws = FakeWebSocket()
+        sockets.append(ws)
+        if resume:
+            await manager.connect(ws, code, batching=True, since=position["seq"], log_id=position["log"])
+        else:
+            await manager.connect(ws, code, batching=True)
+            response = await client.get("/api/messages", params={"session_code": code, "limit": limit})
+            response.raise_for_status()
+            ws.bytes += len(response.content)
+        # 송신 큐에 넣은 replay 프레임이 나갈 때까지 대기
+        await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reconnect(code, position) for code in codes for position in positions[code]))
+    while any(not c.queue.empty() for conns in manager.active_connections.values() for c in conns.values()):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+
+    for code in codes:
+        manager.close_session(code)
+    return {
+        "sockets": len(sockets),
+        "http": 0 if resume else len(sockets),
+        "kb": sum(ws.bytes for ws in sockets) / 1024,
+        "ms": elapsed * 1000,
+        "resync": sum(1 for ws in sockets for f in ws.frames if f.get("event") == "resync"),
+    }
+
+
+async def run(args):
+    from app.main import app
+    from app.message_buffer import message_buffer
+    from app.websocket_manager import manager
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://resume", timeout=30) as client:
+            codes = []
+            for _ in range(args.sessions):
+                code = random.choice(LETTERS) + "".join(random.choices(DIGITS, k=5))
+                response = await client.post("/api/sessions", json={"code": code, "problems": [PROBLEM]})
+                response.raise_for_status()
+                codes.append(code)
+
+            async def connect_all():
+                positions = {code: [] for code in codes}
+                for code in codes:
+                    for _ in range(args.students):
+                        ws = FakeWebSocket()
+                        await manager.connect(ws, code, batching=True)
+                        payload = ws.frames[0]["payload"]
+                        positions[code].append({"log": payload["log"], "seq": payload["seq"]})
+                return positions
+
+            async def blip():
+                # 전원 끊김 → 끊긴 동안 메시지 게시
+                for code in codes:
+                    manager.close_session(code)
+                for code in codes:
+                    for n in range(args.missed):
+                        response = await client.post("/api/messages", json={
+                            "code": code, "nickname": f"학생{n + 1}", "avatar_id": n % 64 + 1,
+                            "content": f"끊긴 동안 메시지 {n}", "answer_token": f"sample-token-{n}",
+                        }, headers={"X-Client-Id": f"resume-{code}-{n}"})
+                        response.raise_for_status()
+                await asyncio.sleep(manager.batch_window + 0.01)
+
+            print(f"세션 {args.sessions}, 학생 {args.students}명, 끊긴 동안 세션당 메시지 {args.missed}개")
+            print(f"{'방식':<10}{'소켓':>6}{'HTTP':>7}{'DB 조회':>9}{'KB':>9}{'소요':>10}{'resync':>8}")
+            for resume in (False, True):
+                positions = await connect_all()
+                await blip()
+                db_reads = message_buffer.db_reads
+                r = await reconnect_storm(manager, client, codes, positions, resume, args.limit)
+                print(f"{'since' if resume else 'GET':<10}{r['sockets']:>6}{r['http']:>7}"
+                      f"{message_buffer.db_reads - db_reads:>9}{r['kb']:>9.1f}{r['ms']:>8.0f}ms{r['resync']:>8}")
+    finally:
+        await app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재연결 폭주 비교 (기록 다시 불러오기 vs 이어 받기)")
+    parser.add_argument("--sessions", type=int, default=10, help="세션 수")
+    parser.add_argument("--students", type=int, default=30, help="세션당 소켓 수 (최대 50)")
+    parser.add_argument("--missed", type=int, default=20, help="끊긴 동안 세션당 메시지 수")
+    parser.add_argument("--limit", type=int, default=50, help="GET /api/messages limit")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='classkit-resume-'), 'bench.db')}"
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
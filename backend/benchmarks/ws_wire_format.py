@@ -0,0 +1,94 @@
+"""
+WebSocket 전송 형식별 바이트 비교 (JSON / compact MessagePack × permessage-deflate)
+
+한 반(학생 N명 + 교사 위젯)의 수업 한 번 동안 나가는 브로드캐스트(입장/재연결 statsUpdate,
+학생 메시지, sessionEnded)를 만들어 형식별로 직렬화하고, 소켓 하나와 반 전체 기준 전송 바이트를
+계산합니다. permessage-deflate는 websockets와 같은 방식(raw deflate, Z_SYNC_FLUSH 후 끝 4바이트
+제거)으로 소켓마다 압축기를 하나씩 두고 계산합니다.
+
+실행:
+    cd backend
+    python -m benchmarks.ws_wire_format [--students 30] [--messages 5] [--window-bits 15] [--level 6]
+"""
+
+import argparse
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import List
+
+from app.ws_codec import JSON, MSGPACK, encode, msgpack
+
+CONTENTS = ["안녕하세요!", "정답 맞혔어요 ㅎㅎ", "오늘 수업 재밌어요", "apple 맞죠?", "선생님 최고!", "와아아"]
+
+
+def class_events(students: int, messages: int, seed: int = 1) -> List[dict]:
+    """수업 한 번의 세션 브로드캐스트 목록"""
+    rng = random.Random(seed)
+    started = datetime(2025, 10, 12, 9, 0, 0)
+    events = []
+    for n in range(students):
+        for user_count in (n + 1, n, n + 1):  # 입장 → 새로고침으로 끊김 → 재연결
+            events.append({"event": "statsUpdate", "payload": {"user_count": user_count + 1}})
+    for m in range(students * messages):
+        created_at = started + timedelta(seconds=m * 7.3)
+        events.append({"event": "newMessage", "payload": {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "nickname": f"학생{rng.randrange(students) + 1}",
+            "avatar_id": rng.randrange(1, 65),
+            "content": rng.choice(CONTENTS),
+            "timestamp": created_at.isoformat(),
+        }})
+    events.append({"event": "sessionEnded", "payload": {
+        "session_code": "A23456", "session_id": str(uuid.uuid4()), "reason": "expired",
+    }})
+    return events
+
+
+def deflated_size(frames: List[bytes], level: int, window_bits: int, context_takeover: bool) -> int:
+    """소켓 하나의 permessage-deflate 전송 바이트"""
+    total = 0
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -window_bits, 5)
+    for frame in frames:
+        if not context_takeover:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -window_bits, 5)
+        data = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(data[:-4]) if data.endswith(b"\x00\x00\xff\xff") else len(data)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 전송 형식별 바이트 비교")
+    parser.add_argument("--students", type=int, default=30, help="반 학생 수")
+    parser.add_argument("--messages", type=int, default=5, help="학생당 메시지 수")
+    parser.add_argument("--window-bits", type=int, default=15, help="WS_DEFLATE_WINDOW_BITS")
+    parser.add_argument("--level", type=int, default=6, help="WS_DEFLATE_LEVEL")
+    args = parser.parse_args()
+
+    events = class_events(args.students, args.messages)
+    sockets = args.students + 1
+    encodings = (JSON, MSGPACK) if msgpack is not None else (JSON,)
+    print(f"학생 {args.students}명 + 교사 1, 브로드캐스트 {len(events)}개, "
+          f"deflate level={args.level} window_bits={args.window_bits}")
+    print(f"{'형식':<10}{'압축':<22}{'소켓당 KB':>10}{'반 전체 KB':>12}{'프레임당 B':>12}{'직렬화 µs':>11}")
+
+    baseline = None
+    for encoding in encodings:
+        started = time.perf_counter()
+        frames = [encode(event, encoding) for event in events]
+        encode_us = (time.perf_counter() - started) / len(events) * 1_000_000
+        frames = [frame.encode("utf-8") if isinstance(frame, str) else frame for frame in frames]
+        for label, size in (
+            ("없음", sum(len(frame) for frame in frames)),
+            ("deflate", deflated_size(frames, args.level, args.window_bits, True)),
+            ("deflate (no takeover)", deflated_size(frames, args.level, args.window_bits, False)),
+        ):
+            baseline = baseline or size
+            print(f"{encoding:<10}{label:<22}{size / 1024:>10.1f}{size * sockets / 1024:>12.1f}"
+                  f"{size / len(frames):>12.1f}{encode_us:>11.1f}  ({size / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
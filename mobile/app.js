@@ -18,6 +18,24 @@ const getApiBase = () => {
 const API_BASE = getApiBase();
 console.log('🌐 API Base:', API_BASE);
 
+// 기기별 임의 ID (학교 와이파이는 IP를 공유하므로 서버 요청 제한을 학생별로 구분하는 용도)
+const getClientId = () => {
+  const newId = () => (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  try {
+    let id = localStorage.getItem('classkit-client-id');
+    if (!id) {
+      id = newId();
+      localStorage.setItem('classkit-client-id', id);
+    }
+    return id;
+  } catch (e) {
+    // 저장소를 쓸 수 없으면(사생활 보호 모드 등) 이번 페이지에서만 사용
+    return newId();
+  }
+};
+
+const API_HEADERS = { 'Content-Type': 'application/json', 'X-Client-Id': getClientId() };
+
 // 상태 관리
 let sessionCode = null;
 let currentProblem = null;
@@ -464,7 +482,7 @@ async function submitAnswer() {
     // API를 통한 정답 체크
     const response = await fetch(`${API_BASE}/problems/check`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: API_HEADERS,
       body: JSON.stringify({
         problem_id: currentProblem.id,
         answer: answer,
@@ -473,6 +491,10 @@ async function submitAnswer() {
     });
     
     if (!response.ok) {
+      if (response.status === 429) {
+        const retryAfter = response.headers.get('Retry-After') || '몇';
+        throw new Error(`너무 자주 제출했어요. ${retryAfter}초 후에 다시 시도해주세요.`);
+      }
       throw new Error('정답 확인 중 오류가 발생했습니다');
     }
     
@@ -543,7 +565,7 @@ async function sendMessage() {
     // API를 통한 메시지 전송 (샘플/일반 모두 동일)
     const response = await fetch(`${API_BASE}/messages`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: API_HEADERS,
       body: JSON.stringify({
         code: sessionCode,
         nickname: nickname,
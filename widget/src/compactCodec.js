@@ -0,0 +1,134 @@
+/**
+ * WebSocket compact 전송 형식 디코더 (서브프로토콜 classkit.msgpack.v1)
+ * 서버의 backend/app/ws_codec.py와 키 표가 같아야 합니다.
+ *
+ * - MessagePack 바이너리 → 객체
+ * - 짧은 키를 원래 키로 복원 (e → event, p → payload ...)
+ * - 시각(timestamp, created_at)은 epoch 밀리초 숫자 그대로 둠
+ */
+
+export const COMPACT_SUBPROTOCOL = 'classkit.msgpack.v1';
+export const JSON_SUBPROTOCOL = 'classkit.json.v1';
+
+// 짧은 키 -> 원래 키 (ws_codec.COMPACT_KEYS의 반대)
+const EXPANDED_KEYS = {
+  e: 'event',
+  p: 'payload',
+  i: 'id',
+  n: 'nickname',
+  a: 'avatar_id',
+  c: 'content',
+  t: 'timestamp',
+  ca: 'created_at',
+  u: 'user_count',
+  s: 'session_code',
+  si: 'session_id',
+  r: 'reason',
+  ty: 'type',
+  o: 'ok',
+  er: 'error',
+  cd: 'code',
+  m: 'message',
+  b: 'batching',
+  q: 'seq',
+  l: 'log',
+};
+
+const textDecoder = new TextDecoder();
+
+/**
+ * MessagePack 디코더 (서버가 보내는 타입만: nil/bool/int/float/str/bin/array/map)
+ */
+export function decodeMsgpack(buffer) {
+  const bytes = new Uint8Array(buffer);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let offset = 0;
+
+  const str = (length) => {
+    const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+    offset += length;
+    return value;
+  };
+  const bin = (length) => {
+    const value = bytes.slice(offset, offset + length);
+    offset += length;
+    return value;
+  };
+  const array = (length) => {
+    const value = new Array(length);
+    for (let i = 0; i < length; i++) value[i] = read();
+    return value;
+  };
+  const map = (length) => {
+    const value = {};
+    for (let i = 0; i < length; i++) {
+      const key = read();
+      value[key] = read();
+    }
+    return value;
+  };
+
+  function read() {
+    const type = bytes[offset++];
+    if (type <= 0x7f) return type;
+    if (type <= 0x8f) return map(type & 0x0f);
+    if (type <= 0x9f) return array(type & 0x0f);
+    if (type <= 0xbf) return str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+
+    let value;
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: value = bytes[offset]; offset += 1; return bin(value);
+      case 0xc5: value = view.getUint16(offset); offset += 2; return bin(value);
+      case 0xc6: value = view.getUint32(offset); offset += 4; return bin(value);
+      case 0xca: value = view.getFloat32(offset); offset += 4; return value;
+      case 0xcb: value = view.getFloat64(offset); offset += 8; return value;
+      case 0xcc: value = view.getUint8(offset); offset += 1; return value;
+      case 0xcd: value = view.getUint16(offset); offset += 2; return value;
+      case 0xce: value = view.getUint32(offset); offset += 4; return value;
+      case 0xcf: value = Number(view.getBigUint64(offset)); offset += 8; return value;
+      case 0xd0: value = view.getInt8(offset); offset += 1; return value;
+      case 0xd1: value = view.getInt16(offset); offset += 2; return value;
+      case 0xd2: value = view.getInt32(offset); offset += 4; return value;
+      case 0xd3: value = Number(view.getBigInt64(offset)); offset += 8; return value;
+      case 0xd9: value = bytes[offset]; offset += 1; return str(value);
+      case 0xda: value = view.getUint16(offset); offset += 2; return str(value);
+      case 0xdb: value = view.getUint32(offset); offset += 4; return str(value);
+      case 0xdc: value = view.getUint16(offset); offset += 2; return array(value);
+      case 0xdd: value = view.getUint32(offset); offset += 4; return array(value);
+      case 0xde: value = view.getUint16(offset); offset += 2; return map(value);
+      case 0xdf: value = view.getUint32(offset); offset += 4; return map(value);
+      default:
+        throw new Error(`지원하지 않는 MessagePack 타입: 0x${type.toString(16)}`);
+    }
+  }
+
+  return read();
+}
+
+/**
+ * 짧은 키를 원래 키로 복원 (표에 없는 키는 그대로)
+ */
+export function expandKeys(value) {
+  if (Array.isArray(value)) {
+    return value.map(expandKeys);
+  }
+  if (value && typeof value === 'object' && !(value instanceof Uint8Array)) {
+    const result = {};
+    for (const [key, item] of Object.entries(value)) {
+      result[EXPANDED_KEYS[key] || key] = expandKeys(item);
+    }
+    return result;
+  }
+  return value;
+}
+
+/**
+ * compact 프레임 → 서버 JSON 프레임과 같은 모양의 객체
+ */
+export function decodeCompact(buffer) {
+  return expandKeys(decodeMsgpack(buffer));
+}
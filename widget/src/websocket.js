@@ -3,6 +3,24 @@
  * 학생들의 메시지를 실시간으로 받아옵니다
  */
 
+import { COMPACT_SUBPROTOCOL, JSON_SUBPROTOCOL, decodeCompact } from './compactCodec.js';
+
+// 기기별 임의 ID (서버가 소켓 요청 프레임의 속도 제한을 IP 대신 기기별로 구분하는 용도)
+const getClientId = () => {
+  const newId = () => (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  try {
+    let id = localStorage.getItem('classkit-client-id');
+    if (!id) {
+      id = newId();
+      localStorage.setItem('classkit-client-id', id);
+    }
+    return id;
+  } catch (e) {
+    // 저장소를 쓸 수 없으면(사생활 보호 모드 등) 이번 페이지에서만 사용
+    return newId();
+  }
+};
+
 export class WebSocketManager {
   constructor(sessionCode, avatarRenderer, wsBase = 'ws://localhost:8000', apiBase = 'http://localhost:8000/api') {
     this.sessionCode = sessionCode;
@@ -13,6 +31,15 @@ export class WebSocketManager {
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 5;
     this.reconnectDelay = 3000;
+    this.sessionEnded = false; // 서버가 세션을 종료하면 재연결하지 않음
+    this.clientId = getClientId();
+    
+    // 재연결 시 놓친 이벤트만 받기 위한 서버 이벤트 로그 위치 (connected 이벤트의 log/seq)
+    this.eventLog = null;
+    this.lastSeq = null;
+    
+    // 수신 프레임 통계 (permessage-deflate 압축 전 크기)
+    this.wireStats = { frames: 0, bytes: 0, since: Date.now() };
     
     // 자동 발화 타이머
     this.autoSpeechTimer = null;
@@ -25,13 +52,21 @@ export class WebSocketManager {
 
   connect() {
     try {
-      const wsUrl = `${this.wsBase}/ws/${this.sessionCode}`;
+      // batch=1: 짧은 구간의 이벤트를 batch 프레임 하나로 받음
+      // 재연결이면 since/log로 끊긴 동안의 이벤트만 batch 프레임 하나로 다시 받음
+      // client_id: 요청 프레임 속도 제한용 기기 ID
+      let wsUrl = `${this.wsBase}/ws/${this.sessionCode}?batch=1&client_id=${encodeURIComponent(this.clientId)}`;
+      if (this.eventLog !== null && this.lastSeq !== null) {
+        wsUrl += `&since=${this.lastSeq}&log=${encodeURIComponent(this.eventLog)}`;
+      }
       console.log('🔌 WebSocket 연결 시도:', wsUrl);
       
-      this.ws = new WebSocket(wsUrl);
+      // compact 형식(MessagePack) 우선, 서버가 지원하지 않으면 JSON 서브프로토콜
+      this.ws = new WebSocket(wsUrl, [COMPACT_SUBPROTOCOL, JSON_SUBPROTOCOL]);
+      this.ws.binaryType = 'arraybuffer';
       
       this.ws.onopen = () => {
-        console.log('✅ WebSocket 연결 성공!');
+        console.log('✅ WebSocket 연결 성공!', this.ws.protocol || 'json');
         this.reconnectAttempts = 0;
         // 자동 발화 타이머 시작
         this.startAutoSpeech();
@@ -39,7 +74,14 @@ export class WebSocketManager {
       
       this.ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          let data;
+          if (typeof event.data === 'string') {
+            this.countFrame(new Blob([event.data]).size);
+            data = JSON.parse(event.data);
+          } else {
+            this.countFrame(event.data.byteLength);
+            data = decodeCompact(event.data);
+          }
           this.handleMessage(data);
         } catch (error) {
           console.error('❌ 메시지 파싱 오류:', error);
@@ -61,7 +103,59 @@ export class WebSocketManager {
     }
   }
 
+  countFrame(bytes) {
+    this.wireStats.frames += 1;
+    this.wireStats.bytes += bytes;
+  }
+
+  /**
+   * 연결 후 받은 프레임 수/바이트 (반 단위 전송량 측정용)
+   */
+  getWireStats() {
+    const minutes = Math.max((Date.now() - this.wireStats.since) / 60000, 1 / 60);
+    return {
+      protocol: this.ws ? this.ws.protocol || 'json' : null,
+      frames: this.wireStats.frames,
+      bytes: this.wireStats.bytes,
+      bytesPerMinute: Math.round(this.wireStats.bytes / minutes),
+    };
+  }
+
   handleMessage(data) {
+    // 묶음 프레임은 이벤트별로 나눠서 순서대로 처리
+    if (data.event === 'batch') {
+      data.payload.forEach((item) => this.handleMessage(item));
+      return;
+    }
+    
+    // 세션 이벤트 위치 기록 (다음 재연결의 since)
+    if (typeof data.seq === 'number') {
+      this.lastSeq = Math.max(this.lastSeq ?? 0, data.seq);
+    }
+    
+    if (data.event === 'connected') {
+      // 처음 연결이거나 서버 로그가 바뀌었으면(재시작 등) 현재 위치부터 시작
+      if (data.payload && data.payload.log !== undefined && data.payload.log !== this.eventLog) {
+        this.eventLog = data.payload.log;
+        this.lastSeq = data.payload.seq;
+      }
+    }
+    
+    if (data.event === 'resync') {
+      // 끊긴 동안의 이벤트를 이어 받을 수 없음: 현재 위치부터 다시 시작
+      // (위젯은 지난 메시지를 다시 그리지 않으므로 HTTP로 불러올 것이 없음)
+      console.log('🔁 이벤트 재동기화:', data.payload);
+      this.eventLog = data.payload.log;
+      this.lastSeq = data.payload.seq;
+      return;
+    }
+    
+    // 서버 하트비트: 응답하지 않으면 연결이 끊긴 것으로 보고 정리됨
+    if (data.event === 'ping') {
+      this.send({ type: 'pong' });
+      return;
+    }
+    
     console.log('📨 WebSocket 메시지:', data);
     
     if (data.event === 'newMessage') {
@@ -125,6 +219,16 @@ export class WebSocketManager {
       // 통계 업데이트
       console.log('📊 통계 업데이트:', data.payload);
     }
+    
+    if (data.event === 'sessionEnded') {
+      // 세션 만료: 서버가 곧 연결을 닫으므로 재연결하지 않음
+      console.log('⏰ 세션 종료:', data.payload);
+      this.sessionEnded = true;
+      if (this.autoSpeechTimer) {
+        clearTimeout(this.autoSpeechTimer);
+        this.autoSpeechTimer = null;
+      }
+    }
   }
 
   /**
@@ -178,6 +282,10 @@ export class WebSocketManager {
   }
 
   attemptReconnect() {
+    if (this.sessionEnded) {
+      return;
+    }
+    
     if (this.reconnectAttempts >= this.maxReconnectAttempts) {
       console.log('❌ WebSocket 재연결 포기 (최대 시도 횟수 초과)');
       return;